@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+iFdPacker SFX解混淆基准：逐字节循环与读取时按查找表translate
+
+用法:
+    python benchmarks/bench_sfx_deobf.py [大小MB，默认16]
+"""
+
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insyde_bios_core import BufferReader, InsydeIfdExtract
+
+# py7zr每次读取的大小在数十KB到数MB之间
+READ_SIZE = 0x100000
+
+
+def legacy_deobf(data):
+    """改写前的逐字节解混淆循环"""
+    sfx_data = bytearray(data)
+
+    for index, byte in enumerate(sfx_data):
+        sfx_data[index] = byte // 2 + (128 if byte % 2 else 0)
+
+    return bytes(sfx_data)
+
+
+def table_deobf(data):
+    """解压后端读取混淆归档的方式：BufferReader按查找表转换每次读出的数据"""
+    out_file = io.BytesIO()
+
+    with BufferReader(data, table=InsydeIfdExtract.INS_SFX_DEOBF) as reader:
+        for chunk_data in iter(lambda: reader.read(READ_SIZE), b''):
+            out_file.write(chunk_data)
+
+    return out_file.getvalue()
+
+
+def measure(func, data):
+    start_time = time.perf_counter()
+    result = func(data)
+    return time.perf_counter() - start_time, result
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    data = os.urandom(size_mb * 1024 * 1024)
+
+    legacy_time, legacy_result = measure(legacy_deobf, data)
+    table_time, table_result = measure(table_deobf, data)
+
+    assert legacy_result == table_result
+
+    print(f"数据大小: {size_mb} MB")
+    print(f"逐字节循环: {legacy_time:.3f} s ({size_mb / legacy_time:.1f} MB/s)")
+    print(f"读取时查找表translate: {table_time:.3f} s ({size_mb / table_time:.1f} MB/s)")
+    print(f"加速比: {legacy_time / table_time:.0f}x")
+
+
+if __name__ == '__main__':
+    main()
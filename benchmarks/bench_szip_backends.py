@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+7-Zip解压后端基准：在合成的加密（含头部加密）7z归档上比较py7zr与外部7-Zip
+
+归档从缓冲区中的偏移处以只读视图读取，与iFdPacker SFX未混淆时的解压路径一致。
+
+用法:
+    python benchmarks/bench_szip_backends.py [大小MB，默认16]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from insyde_bios_core import SZIP_BACKENDS, BufferReader, InsydeIfdExtract
+
+
+def make_archive(size_mb):
+    """生成加密的合成归档：一半随机数据、一半可压缩的填充，接近真实固件的组成"""
+    import py7zr
+
+    half_size = size_mb * 1024 * 1024 // 2
+    payload = os.urandom(half_size) + b'\xFF' * half_size
+
+    archive_stream = io.BytesIO()
+
+    with py7zr.SevenZipFile(archive_stream, mode='w', password=InsydeIfdExtract.INS_SFX_PWD,
+                            header_encryption=True) as archive:
+        archive.writestr(payload, 'bios.bin')
+
+    return archive_stream.getvalue(), payload
+
+
+def measure(backend_extract, sfx_buffer, payload):
+    with tempfile.TemporaryDirectory() as out_path:
+        start_time = time.perf_counter()
+
+        with BufferReader(sfx_buffer, offset=0x1000) as sfx_stream:
+            extract_ok = backend_extract(sfx_stream, out_path, InsydeIfdExtract.INS_SFX_PWD)
+
+        elapsed = time.perf_counter() - start_time
+
+        with open(os.path.join(out_path, 'bios.bin'), 'rb') as out_file:
+            assert extract_ok and out_file.read() == payload
+
+    return elapsed
+
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+
+    try:
+        archive_data, payload = make_archive(size_mb)
+    except ImportError:
+        print("需要py7zr生成合成归档: pip install py7zr")
+        return
+
+    # 归档前放置一段SFX存根，模拟在整个镜像缓冲区中定位
+    sfx_buffer = b'\x00' * 0x1000 + archive_data
+
+    print(f"数据大小: {size_mb} MB，归档大小: {len(archive_data) / (1024 * 1024):.1f} MB")
+
+    for backend_name, backend_check, backend_extract in SZIP_BACKENDS:
+        if not backend_check():
+            print(f"{backend_name}: 不可用，跳过")
+            continue
+
+        elapsed = measure(backend_extract, sfx_buffer, payload)
+
+        print(f"{backend_name}: {elapsed:.3f} s ({size_mb / elapsed:.1f} MB/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -13,8 +13,9 @@ Item {
     // 属性
     property string selectedFirmwareFile: ""
     property bool isExtracting: false
+    property bool isQueued: false
     property bool extractionSuccessful: false
-    property var extractedFiles: []
+    property int extractedFileCount: backend.extractedFilesModel.count
     property string selectedFilePath: ""
     
     // 处理提取结果
@@ -23,40 +24,38 @@ Item {
         extractFirmwarePage.extractionSuccessful = success
         
         if (success) {
-            extractFirmwarePage.extractedFiles = files
             console.log("BIOS固件提取成功，获取到文件列表")
             
-            // 更新ListModel
-            extractedFilesModel.clear()
-            for(var i = 0; i < files.length; i++) {
-                extractedFilesModel.append(files[i])
-            }
+            // 由后端模型显示本次提取的文件
+            backend.showExtractResult()
         } else {
             errorDialog.message = message
             errorDialog.open()
         }
     }
     
+    // 提取或解析作业在调度器中排队时显示等待状态
+    function handleJobStatus(job, state) {
+        if (job === "dump" || job.indexOf("parse:") === 0) {
+            extractFirmwarePage.isQueued = (state === "queued")
+        }
+    }
+    
     // 组件加载时自动加载BIOS备份文件
     Component.onCompleted: {
         // 连接后端信号
         backend.extractResultSignal.connect(handleExtractResult)
+        backend.jobStatusSignal.connect(handleJobStatus)
         // 加载现有BIOS备份
         loadBiosBackups()
     }
     
     // 加载BIOS备份文件
     function loadBiosBackups() {
-        var files = backend.getExtractedBiosFiles()
-        if(files && files.length > 0) {
-            extractFirmwarePage.extractedFiles = files
+        // 后端模型只对变化的文件增量更新，并在滚动时按需加载
+        backend.showExtractedBiosFiles()
+        if(extractFirmwarePage.extractedFileCount > 0) {
             extractFirmwarePage.extractionSuccessful = true
-            
-            // 更新ListModel
-            extractedFilesModel.clear()
-            for(var i = 0; i < files.length; i++) {
-                extractedFilesModel.append(files[i])
-            }
         }
     }
     
@@ -333,7 +332,7 @@ Item {
                         Layout.preferredHeight: 30
                         
                         Text {
-                            text: isExtracting ? "正在提取BIOS..." : (extractedFiles.length > 0 ? "提取的文件:" : "尚无提取文件")
+                            text: isExtracting ? (isQueued ? "等待其他作业完成..." : "正在提取BIOS...") : (extractedFileCount > 0 ? "提取的文件:" : "尚无提取文件")
                             color: "#FFFFFF"
                             font.pixelSize: 16
                             font.bold: true
@@ -385,8 +384,8 @@ Item {
                             id: fileListView
                             anchors.fill: parent
                             anchors.margins: 5
-                            model: ListModel { id: extractedFilesModel }
-                            visible: extractedFiles.length > 0 && !isExtracting
+                            model: backend.extractedFilesModel
+                            visible: extractedFileCount > 0 && !isExtracting
                             spacing: 5
                             clip: true
                             
@@ -544,7 +543,7 @@ Item {
                             anchors.centerIn: parent
                             text: "尚未提取任何BIOS数据"
                             color: "#888888"
-                            visible: extractedFiles.length === 0 && !isExtracting
+                            visible: extractedFileCount === 0 && !isExtracting
                         }
                         
                         // 进度指示器 - 仅在提取时显示
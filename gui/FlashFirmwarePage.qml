@@ -14,6 +14,63 @@ Item {
     property string selectedFilePath: ""
     property bool flashing: false
     property bool flashSuccessful: false
+    property string deltaSummary: ""
+    property string flashEstimate: ""
+    property real flashPercent: 0
+    property string flashPhase: ""
+    property real flashEta: -1
+    
+    // 选择固件后与最近一次系统BIOS备份比较，显示将发生变化的数据量
+    onSelectedFilePathChanged: {
+        updateFlashEstimate()
+        
+        if (selectedFilePath === "") {
+            deltaSummary = ""
+            return
+        }
+        
+        var delta = backend.compareWithBiosBackup(selectedFilePath)
+        deltaSummary = delta.message
+    }
+    
+    // 连接后端信号
+    Component.onCompleted: {
+        backend.flashResultSignal.connect(handleFlashResult)
+        backend.flashProgressSignal.connect(handleFlashProgress)
+    }
+    
+    // 按本机刷写记录估算耗时
+    function updateFlashEstimate() {
+        if (selectedFilePath === "") {
+            flashEstimate = ""
+            return
+        }
+        
+        var params = {
+            filePath: selectedFilePath,
+            deltaOnly: deltaCheckBox.checked
+        }
+        
+        flashEstimate = backend.estimateFlashTime(JSON.stringify(params)).message
+    }
+    
+    // 后端按FPT输出的阶段换算的整体进度和剩余秒数
+    function handleFlashProgress(phase, percent, eta) {
+        flashPhase = phase
+        flashPercent = percent
+        flashEta = eta
+    }
+    
+    function phaseName(phase) {
+        var names = {"erase": "擦除", "program": "写入", "verify": "校验", "read": "读取"}
+        return names[phase] !== undefined ? names[phase] : "刷写"
+    }
+    
+    function formatEta(seconds) {
+        var total = Math.round(seconds)
+        var minutes = Math.floor(total / 60)
+        return minutes > 0 ? minutes + " 分 " + (total % 60) + " 秒" : total + " 秒"
+    }
     
     // 顶部导航栏
     Rectangle {
@@ -386,7 +443,7 @@ Item {
             // 选项区域
             Rectangle {
                 width: parent.width
-                height: 80
+                height: 150
                 color: "#252525"
                 radius: 5
                 
@@ -416,13 +473,45 @@ Item {
                             leftPadding: rebootCheckBox.indicator.width + 5
                         }
                     }
+                    
+                    // 增量刷写选项
+                    CheckBox {
+                        id: deltaCheckBox
+                        text: "仅擦写与当前BIOS不同的块（增量刷写）"
+                        checked: false
+                        onCheckedChanged: updateFlashEstimate()
+                        
+                        contentItem: Text {
+                            text: deltaCheckBox.text
+                            font.pixelSize: 14
+                            color: "#FFFFFF"
+                            verticalAlignment: Text.AlignVCenter
+                            leftPadding: deltaCheckBox.indicator.width + 5
+                        }
+                    }
+                    
+                    // 演练选项，只生成增量刷写计划而不写入
+                    CheckBox {
+                        id: dryRunCheckBox
+                        text: "演练模式（只显示刷写计划，不写入）"
+                        checked: false
+                        enabled: deltaCheckBox.checked
+                        
+                        contentItem: Text {
+                            text: dryRunCheckBox.text
+                            font.pixelSize: 14
+                            color: dryRunCheckBox.enabled ? "#FFFFFF" : "#777777"
+                            verticalAlignment: Text.AlignVCenter
+                            leftPadding: dryRunCheckBox.indicator.width + 5
+                        }
+                    }
                 }
             }
             
             // 命令预览区域
             Rectangle {
                 width: parent.width
-                height: 80
+                height: 80 + (deltaSummary !== "" ? 25 : 0) + (flashEstimate !== "" ? 25 : 0)
                 color: "#252525"
                 radius: 5
                 visible: selectedFilePath !== ""
@@ -456,6 +545,20 @@ Item {
                             verticalAlignment: Text.AlignVCenter
                         }
                     }
+                    
+                    Text {
+                        text: deltaSummary
+                        color: "#AAAAAA"
+                        font.pixelSize: 13
+                        visible: deltaSummary !== ""
+                    }
+                    
+                    Text {
+                        text: flashEstimate
+                        color: "#AAAAAA"
+                        font.pixelSize: 13
+                        visible: flashEstimate !== ""
+                    }
                 }
             }
             
@@ -470,7 +573,12 @@ Item {
                 
                 Text {
                     anchors.centerIn: parent
-                    text: flashSuccessful ? "BIOS刷写成功！" : "正在刷写BIOS，请勿关闭程序或断电..."
+                    text: {
+                        if (flashSuccessful) return "BIOS刷写成功！"
+                        if (flashPhase === "") return "正在刷写BIOS，请勿关闭程序或断电..."
+                        return "正在" + phaseName(flashPhase) + " " + flashPercent.toFixed(0) + "%" +
+                               (flashEta >= 0 ? "，剩余约 " + formatEta(flashEta) : "") + "，请勿关闭程序或断电..."
+                    }
                     color: "#FFFFFF"
                     font.bold: true
                     font.pixelSize: 16
@@ -480,7 +588,7 @@ Item {
                 Rectangle {
                     anchors.bottom: parent.bottom
                     height: 3
-                    width: parent.width * flashProgress.progress
+                    width: parent.width * flashPercent / 100
                     color: "#00AAFF"
                     visible: flashing && !flashSuccessful
                     
@@ -488,20 +596,6 @@ Item {
                         NumberAnimation { duration: 300 }
                     }
                 }
-                
-                Timer {
-                    id: flashProgress
-                    property double progress: 0
-                    interval: 500
-                    running: flashing && !flashSuccessful
-                    repeat: true
-                    onTriggered: {
-                        progress += 0.05
-                        if (progress >= 1) {
-                            stop()
-                        }
-                    }
-                }
             }
             
             // 刷写按钮
@@ -582,13 +676,17 @@ Item {
         
         onYes: {
             flashing = true
-            flashProgress.progress = 0
-            flashProgress.start()
+            flashSuccessful = false
+            flashPercent = 0
+            flashPhase = ""
+            flashEta = -1
             
             // 调用后端进行实际的刷写
             var params = {
                 filePath: selectedFilePath,
-                rebootAfter: rebootCheckBox.checked
+                rebootAfter: rebootCheckBox.checked && !(deltaCheckBox.checked && dryRunCheckBox.checked),
+                deltaOnly: deltaCheckBox.checked,
+                dryRun: deltaCheckBox.checked && dryRunCheckBox.checked
             }
             
             backend.flashFirmware(JSON.stringify(params))
@@ -601,7 +699,8 @@ Item {
         flashSuccessful = success
         
         if (success) {
-            if (rebootCheckBox.checked) {
+            // 演练模式不写入闪存，不会重启
+            if (rebootCheckBox.checked && !(deltaCheckBox.checked && dryRunCheckBox.checked)) {
                 rebootDialog.open()
             } else {
                 flashSuccessDialog.message = message
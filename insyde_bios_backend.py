@@ -0,0 +1,1304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Insyde BIOS工具箱的QML后端：界面调用的槽函数、信号和文件列表模型，由insyde_bios_toolbox.main在启动时导入"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+import tempfile
+from datetime import datetime
+from PyQt5.QtCore import QObject, QUrl, pyqtSignal, pyqtSlot, pyqtProperty, Qt, QMetaObject, QSettings, Q_ARG, \
+    QFileSystemWatcher, QAbstractListModel, QModelIndex
+from urllib.parse import quote, unquote
+import logging
+
+from insyde_bios_core import is_admin, log_job_output, ToolRegistry, InsydePaths, BiosExtractor, FirmwareDelta, \
+    FlashPlanner, FlashThroughput, FlashProgress, FptSpiDevice, PartialFlashError, JobRunner, JobScheduler, UveSettingStore, \
+    UveSettingDiff, FileIndex, MicrocodeIndex, \
+    CONSOLE_EXE, GUI_EXE, EZE_EXE, FPT_EXE, BACKUP_DIR, EXTRACT_DIR, BIOS_BACKUP_DIR, TOOL_TIMEOUTS
+
+
+def path_to_url(path):
+    """将本地路径转换为URL，处理中文路径问题"""
+    path = os.path.abspath(path)
+    if sys.platform == 'win32':
+        path = path.replace('\\', '/')
+        if not path.startswith('/'):
+            path = '/' + path
+    # 确保中文路径正确编码
+    path = quote(path)
+    return QUrl.fromLocalFile(path)
+
+class BiosFileListModel(QAbstractListModel):
+    """BIOS固件文件列表模型，按需分批向QML提供行，排序与过滤在Python端完成"""
+    
+    NameRole = Qt.UserRole + 1
+    PathRole = Qt.UserRole + 2
+    SizeRole = Qt.UserRole + 3
+    TimeRole = Qt.UserRole + 4
+    
+    # 每次向视图追加的行数
+    FETCH_BATCH = 100
+    
+    # 可用的排序字段：行元组为(路径, 文件名, 大小, 修改时间)
+    SORT_KEYS = {
+        "time": lambda row: row[3],
+        "name": lambda row: row[1].lower(),
+        "size": lambda row: row[2]
+    }
+    
+    countChanged = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        
+        # 行数据来源，返回[(路径, 文件名, 大小, 修改时间)]
+        self._source = list
+        self._rows = []
+        self._loaded = 0
+        self._filter = ""
+        self._sort_key = "time"
+        self._sort_desc = True
+    
+    def roleNames(self):
+        return {
+            self.NameRole: b"name",
+            self.PathRole: b"path",
+            self.SizeRole: b"size",
+            self.TimeRole: b"time"
+        }
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < self._loaded:
+            return None
+        
+        file_path, file_name, size, mod_time = self._rows[index.row()]
+        
+        if role in (self.NameRole, Qt.DisplayRole):
+            return file_name
+        if role == self.PathRole:
+            return file_path
+        if role == self.SizeRole:
+            if size < 1024:
+                return f"{size} B"
+            elif size < 1024 * 1024:
+                return f"{size/1024:.1f} KB"
+            else:
+                return f"{size/(1024*1024):.1f} MB"
+        if role == self.TimeRole:
+            return datetime.fromtimestamp(mod_time).strftime("%Y-%m-%d %H:%M:%S")
+        
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+    
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        
+        fetch_count = min(self.FETCH_BATCH, len(self._rows) - self._loaded)
+        
+        if fetch_count <= 0:
+            return
+        
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + fetch_count - 1)
+        self._loaded += fetch_count
+        self.endInsertRows()
+    
+    @pyqtProperty(int, notify=countChanged)
+    def count(self):
+        """排序过滤后的总行数（包括尚未加载到视图的行）"""
+        return len(self._rows)
+    
+    def set_source(self, source):
+        """更换行数据来源并重置模型，来源未变时只做增量刷新"""
+        if source == self._source:
+            self.refresh()
+            return
+        
+        self._source = source
+        self._reset()
+    
+    @pyqtSlot(str)
+    def setFilter(self, filter_text):
+        """按文件名过滤（不区分大小写）"""
+        self._filter = filter_text.strip().lower()
+        self._reset()
+    
+    @pyqtSlot(str, bool)
+    def setSort(self, sort_key, descending):
+        """设置排序字段(time/name/size)与方向"""
+        if sort_key in self.SORT_KEYS:
+            self._sort_key = sort_key
+            self._sort_desc = descending
+            self._reset()
+    
+    @pyqtSlot()
+    def refresh(self):
+        """重新读取数据来源，只对新增和消失的行发出插入/删除信号"""
+        new_rows = self._collect()
+        new_set = set(new_rows)
+        old_count = len(self._rows)
+        
+        # 先删除已不存在的行（大小或修改时间变化的行视为删除后重新插入）
+        for row_index in range(len(self._rows) - 1, -1, -1):
+            if self._rows[row_index] in new_set:
+                continue
+            
+            if row_index < self._loaded:
+                self.beginRemoveRows(QModelIndex(), row_index, row_index)
+                del self._rows[row_index]
+                self._loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self._rows[row_index]
+        
+        # 剩余行与新行排序规则相同，按新行顺序在对应位置插入新增的行
+        kept_set = set(self._rows)
+        
+        for row_index, row in enumerate(new_rows):
+            if row in kept_set:
+                continue
+            
+            if row_index < self._loaded or self._loaded == len(self._rows):
+                self.beginInsertRows(QModelIndex(), row_index, row_index)
+                self._rows.insert(row_index, row)
+                self._loaded += 1
+                self.endInsertRows()
+            else:
+                self._rows.insert(row_index, row)
+        
+        if len(self._rows) != old_count:
+            self.countChanged.emit()
+    
+    def _collect(self):
+        """从数据来源获取行，并完成过滤和排序"""
+        rows = self._source()
+        
+        if self._filter:
+            rows = [row for row in rows if self._filter in row[1].lower()]
+        
+        sort_key = self.SORT_KEYS[self._sort_key]
+        rows.sort(key=lambda row: (sort_key(row), row[0]), reverse=self._sort_desc)
+        
+        return rows
+    
+    def _reset(self):
+        """整体重建模型，只加载第一批行"""
+        self.beginResetModel()
+        self._rows = self._collect()
+        self._loaded = min(self.FETCH_BATCH, len(self._rows))
+        self.endResetModel()
+        
+        self.countChanged.emit()
+
+class BiosToolBackend(QObject):
+    """与QML界面交互的后端类"""
+    # 定义信号
+    flashResultSignal = pyqtSignal(bool, str, arguments=['success', 'message'])
+    backupResultSignal = pyqtSignal(bool, str, arguments=['success', 'message'])
+    writeResultSignal = pyqtSignal(bool, str, arguments=['success', 'message'])
+    extractResultSignal = pyqtSignal(bool, str, list, arguments=['success', 'message', 'files'])
+    settingsDiffChunkSignal = pyqtSignal(list, arguments=['changes'])
+    settingsDiffResultSignal = pyqtSignal(bool, str, arguments=['success', 'message'])
+    jobOutputSignal = pyqtSignal(str, str, arguments=['job', 'line'])
+    jobProgressSignal = pyqtSignal(str, str, float, arguments=['job', 'phase', 'percent'])
+    jobStatusSignal = pyqtSignal(str, str, arguments=['job', 'state'])
+    jobQueueSignal = pyqtSignal(list, arguments=['jobs'])
+    flashProgressSignal = pyqtSignal(str, float, float, arguments=['phase', 'percent', 'eta'])
+    
+    # 中途结束会损坏闪存内容或使变量存储只更新一部分的作业，不允许取消；只有只读作业可以取消
+    UNCANCELLABLE_JOBS = ('flash', 'write')
+    
+    # 备份比较结果每次发送给QML的条数
+    DIFF_CHUNK = 200
+    
+    # 增量刷写的比较粒度；每次调用FPT都有固定开销，间隔不超过64 KB的范围合并为一次写入
+    DELTA_ERASE_BLOCK = 0x1000
+    DELTA_MERGE_GAP = 0x10000
+    
+    def __init__(self):
+        super().__init__()
+        # 确保必要目录存在
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        os.makedirs(EXTRACT_DIR, exist_ok=True)
+        os.makedirs(BIOS_BACKUP_DIR, exist_ok=True)
+        
+        # 初始化BIOS提取器
+        self.bios_extractor = BiosExtractor()
+        
+        # 建立数据目录的文件索引，文件列表刷新时不再重新遍历目录树
+        self.file_index = FileIndex()
+        self._file_lists = {}
+        
+        for directory in [BACKUP_DIR, EXTRACT_DIR, BIOS_BACKUP_DIR]:
+            self.file_index.scan_tree(directory)
+        
+        # 只监视三个顶层数据目录，捕获程序外部的增删；程序自身的改动由各操作直接更新索引。
+        # 不监视子目录，因为Windows上被监视的目录会被占用，无法删除或重建提取目录
+        self.fs_watcher = QFileSystemWatcher([BACKUP_DIR, EXTRACT_DIR, BIOS_BACKUP_DIR], self)
+        self.fs_watcher.directoryChanged.connect(self._on_directory_changed)
+        
+        # 提取页面的文件列表模型，以及最近一次提取/解析得到的文件
+        self._extracted_files_model = BiosFileListModel(self)
+        self._last_extract_paths = []
+        
+        # 外部工具作业在共享的后台事件循环中运行，输出和进度逐行转发给QML
+        self.job_runner = JobRunner.shared()
+        
+        # 本机各刷写阶段的实测吞吐量，用于刷写前估算耗时和刷写中推算剩余时间
+        self.flash_throughput = FlashThroughput()
+        
+        # 所有后台操作都经调度器运行：刷写和写入独占，提取和备份互斥，解析和比较有并行上限
+        self.scheduler = JobScheduler(on_change=self._on_job_change)
+        
+        # 每次开始新的备份比较时递增，旧的比较线程据此提前结束
+        self._diff_generation = 0
+        
+        # 备份设置项的SQLite索引，启动时在后台建立，之后检索和备份时按文件索引增量同步
+        self.setting_store = UveSettingStore()
+        
+        self._schedule_job(JobScheduler.PARALLEL, self._sync_setting_store, 'sync')
+        
+        # 提取和备份镜像中微码的SQLite索引，启动时在后台建立，之后提取完成时按文件索引增量同步
+        self.microcode_index = MicrocodeIndex()
+        
+        self._schedule_job(JobScheduler.PARALLEL, self._sync_microcode_index, 'sync_microcode')
+    
+    @pyqtProperty(QObject, constant=True)
+    def extractedFilesModel(self):
+        """提取页面使用的文件列表模型"""
+        return self._extracted_files_model
+    
+    @pyqtSlot()
+    def showExtractedBiosFiles(self):
+        """在列表模型中显示所有提取及备份的BIOS固件文件"""
+        self._extracted_files_model.set_source(self._indexed_bios_files)
+    
+    @pyqtSlot()
+    def showExtractResult(self):
+        """在列表模型中显示最近一次提取/解析得到的文件"""
+        result_paths = list(self._last_extract_paths)
+        
+        self._extracted_files_model.set_source(
+            lambda: [file_info for file_info in map(self.file_index.file_info, result_paths) if file_info])
+    
+    def _indexed_bios_files(self):
+        """从文件索引获取EXTRACT_DIR目录树及BIOS_BACKUP_DIR目录中的.bin、.fd和.rom文件"""
+        indexed_files = self.file_index.files(EXTRACT_DIR) + self.file_index.files(BIOS_BACKUP_DIR, recursive=False)
+        
+        return [indexed_file for indexed_file in indexed_files if indexed_file[1].endswith(('.bin', '.fd', '.rom'))]
+        
+    @pyqtSlot(str)
+    def handle_menu_item_clicked(self, item_id):
+        """处理菜单项点击事件"""
+        print(f"菜单项 {item_id} 被点击")
+        
+        # 基于ID执行相应操作
+        if item_id == "extract_firmware":
+            print("启动BIOS固件提取功能")
+        elif item_id == "backup_firmware":
+            print("启动BIOS固件备份功能")
+        elif item_id == "flash_firmware":
+            print("启动BIOS固件刷写功能")
+        elif item_id == "h2ouve_editor":
+            print("启动H2OUVE编辑器")
+            self.launch_h2ouve()
+        elif item_id == "h2oeze_editor":
+            print("启动H2OEZE编辑器")
+            self.launch_h2oeze()
+    
+    def launch_h2ouve(self):
+        """启动H2OUVE编辑器"""
+        try:
+            gui_tool = ToolRegistry.shared().resolve(GUI_EXE)
+            gui_exe_path = gui_tool.path
+            logging.debug(f"尝试启动H2OUVE编辑器: {gui_exe_path}")
+            
+            if not gui_tool.available:
+                logging.error(f"H2OUVE GUI程序不存在: {gui_exe_path}")
+                return
+                
+            # 启动编辑器
+            subprocess.Popen([gui_exe_path], shell=True)
+            logging.info("成功启动H2OUVE编辑器")
+        except Exception as e:
+            logging.exception(f"启动H2OUVE编辑器失败: {e}")
+    
+    def launch_h2oeze(self):
+        """启动H2OEZE编辑器"""
+        try:
+            eze_tool = ToolRegistry.shared().resolve(EZE_EXE)
+            eze_exe_path = eze_tool.path
+            logging.debug(f"尝试启动H2OEZE编辑器: {eze_exe_path}")
+            
+            if not eze_tool.available:
+                logging.error(f"H2OEZE程序不存在: {eze_exe_path}")
+                return
+                
+            # 启动编辑器
+            subprocess.Popen([eze_exe_path], shell=True)
+            logging.info("成功启动H2OEZE编辑器")
+        except Exception as e:
+            logging.exception(f"启动H2OEZE编辑器失败: {e}")
+    
+    def _schedule_job(self, job_class, target, job_kind, *args):
+        """将操作提交给调度器，作业键由操作类型和参数组成，相同请求正在进行时忽略"""
+        job_key = ':'.join([job_kind] + [str(arg) for arg in args])
+        
+        _, is_new = self.scheduler.submit(job_key, job_class, target, args)
+        
+        if not is_new:
+            logging.info(f"相同的作业正在进行，忽略重复请求: {job_key}")
+            QMetaObject.invokeMethod(self, "jobStatusSignal", Qt.QueuedConnection,
+                                     Q_ARG(str, job_key), Q_ARG(str, 'duplicate'))
+        
+        return is_new
+    
+    def _on_job_change(self, job_key, job_state):
+        """调度器状态变化时通知QML"""
+        logging.debug(f"后台作业 {job_key}: {job_state}")
+        
+        QMetaObject.invokeMethod(self, "jobStatusSignal", Qt.QueuedConnection,
+                                 Q_ARG(str, job_key), Q_ARG(str, job_state))
+        QMetaObject.invokeMethod(self, "jobQueueSignal", Qt.QueuedConnection,
+                                 Q_ARG(list, self.scheduler.snapshot()))
+    
+    @pyqtSlot(result=list)
+    def getJobQueue(self):
+        """获取排队和运行中的后台作业"""
+        return self.scheduler.snapshot()
+    
+    @pyqtSlot(result=list)
+    def getToolStatus(self):
+        """获取外部工具的路径、版本和可用性，使用启动时解析的缓存结果"""
+        return ToolRegistry.shared().snapshot()
+    
+    @pyqtSlot()
+    def extractSystemBios(self):
+        """提取系统BIOS固件"""
+        # 在调度器中执行提取操作，避免UI卡顿
+        self._schedule_job(JobScheduler.DEVICE, self._do_extract_system_bios, 'dump')
+    
+    def _job_callbacks(self, job_name):
+        """生成将作业的输出行和进度转发为QML信号的回调"""
+        def on_line(line):
+            QMetaObject.invokeMethod(self, "jobOutputSignal", Qt.QueuedConnection,
+                                     Q_ARG(str, job_name), Q_ARG(str, line))
+        
+        def on_progress(progress):
+            QMetaObject.invokeMethod(self, "jobProgressSignal", Qt.QueuedConnection,
+                                     Q_ARG(str, job_name), Q_ARG(str, progress['phase']),
+                                     Q_ARG(float, progress['percent']))
+        
+        return {'on_line': on_line, 'on_progress': on_progress}
+    
+    @pyqtSlot(str, result=bool)
+    def cancelJob(self, job_name):
+        """取消正在运行的只读外部工具作业（dump、backup），刷写和写入配置作业不可取消"""
+        if job_name in self.UNCANCELLABLE_JOBS:
+            logging.warning(f"作业不可取消: {job_name}")
+            return False
+        
+        return self.job_runner.cancel(job_name)
+    
+    def _do_extract_system_bios(self):
+        """执行系统BIOS提取的实际操作"""
+        success, message, files = self.bios_extractor.extract_system_bios(**self._job_callbacks('dump'))
+        
+        for file_info in files:
+            self.file_index.update_file(file_info["path"])
+        
+        self._sync_microcode_index()
+        
+        self._emit_extract_result(success, message, files)
+    
+    @pyqtSlot(str)
+    def extractBiosFile(self, file_path):
+        """解析BIOS固件文件"""
+        # 在调度器中执行解析操作，避免UI卡顿；同一文件的解析正在进行时不重复解析
+        self._schedule_job(JobScheduler.PARALLEL, self._do_extract_bios_file, 'parse', file_path)
+    
+    def _do_extract_bios_file(self, file_path):
+        """执行BIOS固件解析的实际操作"""
+        success, message, files = self.bios_extractor.parse_bios_file(file_path)
+        
+        # 重新扫描本次提取目录，顶层目录的扫描同时反映缓存淘汰删除的旧提取目录
+        self.file_index.scan_tree(self.bios_extractor.get_extract_path(file_path))
+        self.file_index.rescan_dir(EXTRACT_DIR)
+        
+        self._sync_microcode_index()
+        
+        self._emit_extract_result(success, message, files)
+    
+    def _emit_extract_result(self, success, message, files):
+        """发射提取结果信号"""
+        if success:
+            self._last_extract_paths = [file_info["path"] for file_info in files]
+        
+        # 使用QMetaObject.invokeMethod确保信号在主线程发射
+        QMetaObject.invokeMethod(
+            self, 
+            "extractResultSignal", 
+            Qt.QueuedConnection,
+            Q_ARG(bool, success),
+            Q_ARG(str, message),
+            Q_ARG(list, files)
+        )
+    
+    @pyqtSlot(str)
+    def openFileLocation(self, file_path):
+        """打开文件所在的位置"""
+        try:
+            # 解码URL编码的路径
+            file_path = unquote(file_path)
+            
+            if os.path.exists(file_path):
+                # 使用系统默认方式打开文件所在文件夹
+                if sys.platform == 'win32':
+                    subprocess.Popen(f'explorer /select,"{file_path}"', shell=True)
+                else:
+                    subprocess.Popen(['xdg-open', os.path.dirname(file_path)])
+            else:
+                print(f"路径不存在: {file_path}")
+        except Exception as e:
+            print(f"打开文件位置失败: {e}")
+    
+    @pyqtSlot(str)
+    def flashFirmware(self, params_str):
+        """刷写BIOS固件"""
+        # 解析参数
+        params = json.loads(params_str)
+        file_path = params.get('filePath', '')
+        reboot_after = params.get('rebootAfter', True)
+        delta_only = params.get('deltaOnly', False)
+        dry_run = params.get('dryRun', False)
+        
+        print(f"准备刷写BIOS固件: {file_path}")
+        print(f"完成后重启: {reboot_after}")
+        
+        # 在调度器中执行刷写操作，刷写期间不运行任何其他作业
+        self._schedule_job(JobScheduler.EXCLUSIVE, self._do_flash_firmware, 'flash',
+                           file_path, reboot_after, delta_only, dry_run)
+    
+    def _latest_bios_backup(self):
+        """从文件索引获取最近一次的系统BIOS备份，没有时返回None"""
+        bios_backups = [backup_file for backup_file in self.file_index.files(BIOS_BACKUP_DIR, recursive=False)
+                        if backup_file[1].startswith('BIOS_Backup_') and backup_file[1].endswith('.bin')]
+        
+        if not bios_backups:
+            return None
+        
+        return max(bios_backups, key=lambda backup_file: backup_file[3])[0]
+    
+    @pyqtSlot(str, result='QVariant')
+    def compareWithBiosBackup(self, file_path):
+        """比较待刷写的固件与最近一次系统BIOS备份，返回变化的字节数、区域数和地址范围"""
+        try:
+            # 解码URL编码的路径
+            file_path = unquote(file_path)
+            
+            backup_path = self._latest_bios_backup()
+            
+            if backup_path is None:
+                return {"success": False, "message": "没有可供比较的系统BIOS备份"}
+            
+            if not os.path.exists(file_path):
+                return {"success": False, "message": f"文件不存在: {file_path}"}
+            
+            delta = FirmwareDelta(backup_path, file_path).compare()
+            
+            changed_kb = (delta['changed_bytes'] + 1023) // 1024
+            backup_name = os.path.basename(backup_path)
+            
+            if not delta['changed_bytes']:
+                message = f"与 {backup_name} 内容相同"
+            else:
+                message = f"与 {backup_name} 相比，{changed_kb} KB 将发生变化，分布在 {len(delta['regions'])} 个区域"
+            
+            if delta['old_size'] != delta['new_size']:
+                message += f"（大小不同: {delta['old_size']:,} / {delta['new_size']:,} 字节）"
+            
+            return {
+                "success": True,
+                "message": message,
+                "backupFile": backup_name,
+                "changedBytes": delta['changed_bytes'],
+                "regions": [{"name": region['name'], "changedBytes": region['changed_bytes']}
+                            for region in delta['regions']],
+                "ranges": [{"start": range_bgn, "end": range_end} for range_bgn, range_end in delta['ranges']]
+            }
+            
+        except Exception as e:
+            logging.exception(f"比较固件出错: {str(e)}")
+            return {"success": False, "message": f"比较固件出错: {str(e)}"}
+    
+    @pyqtSlot(str, result='QVariant')
+    def estimateFlashTime(self, params_str):
+        """按本机历史吞吐量估算刷写耗时；增量刷写按与最近一次系统BIOS备份的差异估算"""
+        try:
+            params = json.loads(params_str)
+            file_path = unquote(params.get('filePath', ''))
+            
+            if not os.path.exists(file_path):
+                return {"success": False, "message": f"文件不存在: {file_path}"}
+            
+            file_size = os.path.getsize(file_path)
+            backup_path = self._latest_bios_backup() if params.get('deltaOnly', False) else None
+            
+            if backup_path is not None and os.path.getsize(backup_path) == file_size:
+                firmware_delta = FirmwareDelta(backup_path, file_path, block_size=self.DELTA_ERASE_BLOCK)
+                changed_ranges = firmware_delta.compare()['ranges']
+                flash_plan = FlashPlanner.merge_gaps(changed_ranges, self.DELTA_MERGE_GAP)
+                
+                steps, calls = FlashProgress.delta_flash_steps(flash_plan)
+                steps.insert(0, ('read', file_size))
+                calls += 1
+            else:
+                steps, calls = FlashProgress.full_flash_steps(file_size)
+            
+            seconds, measured = self.flash_throughput.estimate(steps, calls)
+            
+            minutes, secs = divmod(int(seconds + 0.5), 60)
+            duration_text = f"{minutes} 分 {secs} 秒" if minutes else f"{secs} 秒"
+            basis_text = "按本机刷写记录估算" if measured else "按典型闪存速度估算"
+            
+            return {
+                "success": True,
+                "seconds": seconds,
+                "measured": measured,
+                "message": f"预计刷写耗时约 {duration_text}（{basis_text}）"
+            }
+            
+        except Exception as e:
+            logging.exception(f"估算刷写耗时出错: {str(e)}")
+            return {"success": False, "message": f"估算刷写耗时出错: {str(e)}"}
+    
+    def _flash_callbacks(self, flash_progress):
+        """刷写作业的回调：输出行和阶段进度照常转发，同时由flash_progress换算整体进度和剩余时间"""
+        job_callbacks = self._job_callbacks('flash')
+        
+        def on_progress(progress):
+            job_callbacks['on_progress'](progress)
+            flash_progress.on_progress(progress)
+        
+        return {'on_line': job_callbacks['on_line'], 'on_progress': on_progress}
+    
+    def _emit_flash_progress(self, phase, percent, eta):
+        """发射刷写整体进度信号"""
+        QMetaObject.invokeMethod(self, "flashProgressSignal", Qt.QueuedConnection,
+                                 Q_ARG(str, phase), Q_ARG(float, percent), Q_ARG(float, eta))
+    
+    def _do_delta_flash(self, fpt_exe_path, file_path, dry_run):
+        """读出当前BIOS区域并与目标固件按擦除块比较，只擦写发生变化的范围，返回(是否成功, 消息)"""
+        flash_progress = FlashProgress([('read', os.path.getsize(file_path))], self.flash_throughput,
+                                       on_update=self._emit_flash_progress)
+        
+        spi_device = FptSpiDevice(fpt_exe_path, on_progress=self._flash_callbacks(flash_progress)['on_progress'],
+                                  on_call=flash_progress.call_done)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            current_path = os.path.join(tmp_dir, 'current_bios.bin')
+            
+            logging.debug("读出当前BIOS区域用于比较")
+            spi_device.dump(current_path)
+            
+            flash_planner = FlashPlanner(current_path, file_path, erase_block=self.DELTA_ERASE_BLOCK,
+                                         merge_gap=self.DELTA_MERGE_GAP)
+            flash_plan = flash_planner.plan()
+            
+            if flash_plan is None:
+                return False, "固件大小与当前BIOS区域不一致，无法增量刷写"
+            
+            if not flash_plan:
+                return True, "固件与当前BIOS内容相同，无需刷写"
+            
+            if not dry_run:
+                flash_progress.add_steps(*FlashProgress.delta_flash_steps(flash_plan))
+            
+            try:
+                written_bytes = flash_planner.execute(spi_device, flash_plan, dry_run=dry_run)
+            except PartialFlashError as e:
+                if e.recovered:
+                    return True, f"{e}\n已改为整体刷写BIOS区域并成功"
+                
+                written_text = '\n'.join(f"0x{range_bgn:08X} - 0x{range_end:08X}"
+                                          for range_bgn, range_end in e.written_ranges) or "无"
+                
+                return False, (f"警告：{e}\n"
+                               f"{'刷写已取消，未自动恢复' if e.cancelled else '整体刷写恢复也失败'}。"
+                               f"请勿重启或关机，重新执行整体刷写（不勾选增量刷写）以恢复BIOS\n"
+                               f"已写入的范围:\n{written_text}")
+            
+            plan_text = '\n'.join(f"0x{range_bgn:08X} - 0x{range_end:08X}" for range_bgn, range_end in flash_plan)
+            
+            if dry_run:
+                return True, (f"演练模式：将擦写 {len(flash_plan)} 个范围，共 {(written_bytes + 1023) // 1024} KB\n"
+                              f"{plan_text}")
+            
+            return True, f"BIOS固件增量刷写成功，共擦写 {len(flash_plan)} 个范围 {(written_bytes + 1023) // 1024} KB"
+    
+    def _do_flash_firmware(self, file_path, reboot_after, delta_only=False, dry_run=False):
+        """执行固件刷写的实际操作"""
+        try:
+            # 检查管理员权限
+            if not is_admin():
+                self._emit_flash_result(False, "刷写BIOS需要管理员权限，请以管理员身份运行程序")
+                return
+            
+            # 解码URL编码的路径
+            file_path = unquote(file_path)
+            logging.debug(f"BIOS固件文件路径: {file_path}")
+                
+            if not os.path.exists(file_path):
+                error_msg = f"文件不存在: {file_path}"
+                logging.error(error_msg)
+                self._emit_flash_result(False, error_msg)
+                return
+            
+            # 获取文件大小信息
+            file_size = os.path.getsize(file_path)
+            logging.debug(f"BIOS固件文件大小: {file_size} 字节")
+            
+            # 获取FPT工具路径
+            fpt_tool = ToolRegistry.shared().resolve(FPT_EXE)
+            fpt_exe_path = fpt_tool.path
+            
+            if not fpt_tool.available:
+                error_msg = f"FPT工具不存在: {fpt_exe_path}"
+                logging.error(error_msg)
+                self._emit_flash_result(False, error_msg)
+                return
+            
+            # 增量刷写：只擦写与当前闪存内容不同的块
+            if delta_only:
+                success, message = self._do_delta_flash(fpt_exe_path, file_path, dry_run)
+                
+                if success and not dry_run:
+                    self._finish_flash(message, reboot_after)
+                else:
+                    logging.info(message)
+                    self._emit_flash_result(success, message)
+                return
+                
+            # 构建命令，始终使用-bios参数
+            cmd_args = [fpt_exe_path, '-f', file_path, '-bios']
+            logging.debug(f"执行FPT命令: {' '.join(cmd_args)}")
+            
+            # 按FPT输出的擦除、写入、校验阶段换算整体进度，结束后记录本机的实测吞吐量
+            flash_steps, flash_calls = FlashProgress.full_flash_steps(file_size)
+            flash_progress = FlashProgress(flash_steps, self.flash_throughput, calls=flash_calls,
+                                           on_update=self._emit_flash_progress)
+            
+            # 执行刷写命令
+            logging.debug("开始执行刷写命令")
+            try:
+                call_bgn = time.perf_counter()
+                process = self.job_runner.run(cmd_args, job_name='flash', timeout=TOOL_TIMEOUTS['flash'],
+                                              **self._flash_callbacks(flash_progress))
+                flash_progress.call_done(time.perf_counter() - call_bgn)
+                log_job_output('flash', process)
+            except Exception as e:
+                error_msg = f"执行刷写命令异常: {str(e)}"
+                logging.exception(error_msg)
+                self._emit_flash_result(False, error_msg)
+                return
+            
+            if process.returncode == 0:
+                self._finish_flash("BIOS固件刷写成功", reboot_after)
+            else:
+                error_msg = process.stderr if process.stderr else process.stdout if process.stdout else "未知错误"
+                
+                # 检查是否是权限相关错误
+                if "administrator" in error_msg or "privileged" in error_msg or "permission" in error_msg:
+                    error_msg = "刷写BIOS需要管理员权限，请以管理员身份运行程序"
+                    logging.error(error_msg)
+                    self._emit_flash_result(False, error_msg)
+                elif "Failed to communicate with CSME" in error_msg:
+                    error_msg = "无法与芯片组管理引擎通信，请确保您以管理员身份运行程序并且硬件支持该操作"
+                    logging.error(error_msg)
+                    self._emit_flash_result(False, error_msg)
+                else:
+                    error_msg = f"固件刷写失败: {error_msg}"
+                    logging.error(error_msg)
+                    self._emit_flash_result(False, error_msg)
+                
+        except Exception as e:
+            error_msg = f"操作出错: {str(e)}"
+            logging.exception(error_msg)
+            self._emit_flash_result(False, error_msg)
+    
+    def _finish_flash(self, message, reboot_after):
+        """发射刷写成功结果，需要时10秒后重启系统"""
+        if reboot_after:
+            message += "，系统将在10秒后重启..."
+        
+        logging.info(message)
+        self._emit_flash_result(True, message)
+        
+        # 如果需要重启，等待10秒后重启
+        if reboot_after:
+            logging.info("准备在10秒后重启系统...")
+            time.sleep(10)
+            # 创建重启命令
+            logging.info("执行系统重启命令")
+            subprocess.Popen(['shutdown', '-r', '-t', '0'], shell=True)
+    
+    def _emit_flash_result(self, success, message):
+        """发射刷写结果信号"""
+        # 使用QMetaObject.invokeMethod确保信号在主线程发射
+        QMetaObject.invokeMethod(
+            self, 
+            "flashResultSignal", 
+            Qt.QueuedConnection,
+            Q_ARG(bool, success),
+            Q_ARG(str, message)
+        )
+        
+    @pyqtSlot(str)
+    def backupBiosConfig(self, params_str):
+        """备份BIOS配置"""
+        # 解析参数
+        params = json.loads(params_str)
+        file_name = params.get('fileName', '')
+        
+        print(f"准备备份BIOS配置到文件: {file_name}")
+        
+        # 在调度器中执行备份操作，避免与刷写或写入同时访问硬件
+        self._schedule_job(JobScheduler.DEVICE, self._do_backup_config, 'backup', file_name)
+    
+    def _do_backup_config(self, file_name):
+        """执行BIOS配置备份的实际操作"""
+        try:
+            # 记录备份开始
+            logging.debug(f"开始备份BIOS配置到文件: {file_name}")
+            
+            # 确保备份目录存在
+            logging.debug(f"确保备份目录存在: {BACKUP_DIR}")
+            if not os.path.exists(BACKUP_DIR):
+                logging.debug(f"创建备份目录: {BACKUP_DIR}")
+            os.makedirs(BACKUP_DIR, exist_ok=True)
+            
+            # 构建完整的文件路径
+            file_path = os.path.join(BACKUP_DIR, file_name)
+            logging.debug(f"备份文件完整路径: {file_path}")
+            
+            # 检查H2OUVE程序是否存在
+            console_tool = ToolRegistry.shared().resolve(CONSOLE_EXE)
+            console_exe_path = console_tool.path
+            if not console_tool.available:
+                error_msg = f"H2OUVE控制台程序不存在: {console_exe_path}"
+                logging.error(error_msg)
+                self._emit_backup_result(False, error_msg)
+                return
+            
+            # 构建命令
+            cmd_args = [console_exe_path, '-gv', file_path]
+            logging.debug(f"执行备份命令: {' '.join(cmd_args)}")
+            
+            # 执行备份命令
+            logging.debug("开始执行备份命令")
+            try:
+                process = self.job_runner.run(cmd_args, job_name='backup', timeout=TOOL_TIMEOUTS['backup'],
+                                              **self._job_callbacks('backup'))
+                log_job_output('backup', process)
+            except Exception as e:
+                error_msg = f"执行备份命令异常: {str(e)}"
+                logging.error(error_msg)
+                self._emit_backup_result(False, error_msg)
+                return
+            
+            if process.cancelled or process.timed_out:
+                InsydePaths.delete_file(in_path=file_path)
+                error_msg = "BIOS配置备份已取消" if process.cancelled else "BIOS配置备份超时"
+                logging.error(error_msg)
+                self._emit_backup_result(False, error_msg)
+                return
+            
+            # 检查备份结果
+            if process.returncode == 0 and os.path.exists(file_path):
+                # 检查文件大小
+                file_size = os.path.getsize(file_path)
+                logging.debug(f"备份成功，文件大小: {file_size} 字节")
+                
+                # 检查文件内容
+                try:
+                    with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                        content_preview = f.read(100)  # 只读取前100个字符用于日志
+                    logging.debug(f"文件内容预览: {content_preview}...")
+                except Exception as e:
+                    logging.warning(f"读取备份文件内容时出错: {str(e)}")
+                
+                self.file_index.update_file(file_path)
+                self._sync_setting_store()
+                
+                success_msg = f"BIOS配置备份成功: {file_name}"
+                logging.info(success_msg)
+                self._emit_backup_result(True, success_msg)
+            else:
+                error_msg = process.stderr if process.stderr else "未知错误"
+                logging.error(f"BIOS配置备份失败: {error_msg}")
+                self._emit_backup_result(False, f"BIOS配置备份失败: {error_msg}")
+                
+        except Exception as e:
+            error_msg = f"备份操作出错: {str(e)}"
+            logging.exception(error_msg)  # 记录完整堆栈跟踪
+            self._emit_backup_result(False, error_msg)
+    
+    def _emit_backup_result(self, success, message):
+        """发射备份结果信号"""
+        # 使用QMetaObject.invokeMethod确保信号在主线程发射
+        QMetaObject.invokeMethod(
+            self, 
+            "backupResultSignal", 
+            Qt.QueuedConnection,
+            Q_ARG(bool, success),
+            Q_ARG(str, message)
+        )
+        
+    @pyqtSlot(str)
+    def writeBiosConfig(self, params_str):
+        """写入BIOS配置"""
+        # 解析参数
+        params = json.loads(params_str)
+        file_name = params.get('fileName', '')
+        is_import = params.get('isImport', False)
+        
+        print(f"准备写入BIOS配置文件: {file_name}")
+        print(f"是否为导入文件: {is_import}")
+        
+        # 在调度器中执行写入操作，写入期间不运行任何其他作业
+        self._schedule_job(JobScheduler.EXCLUSIVE, self._do_write_config, 'write', file_name, is_import)
+    
+    def _do_write_config(self, file_name, is_import):
+        """执行BIOS配置写入的实际操作"""
+        try:
+            # 记录写入开始
+            logging.debug(f"开始写入BIOS配置文件: {file_name}")
+            logging.debug(f"是否为导入文件: {is_import}")
+            
+            # 确定文件路径
+            if is_import:
+                file_path = file_name  # 导入模式，文件名就是完整路径
+                logging.debug(f"使用导入模式，文件路径: {file_path}")
+            else:
+                file_path = os.path.join(BACKUP_DIR, file_name)  # 非导入模式，从备份目录获取
+                logging.debug(f"从备份目录获取文件，路径: {file_path}")
+            
+            # 检查文件是否存在
+            logging.debug(f"检查文件是否存在: {file_path}")
+            if not os.path.exists(file_path):
+                error_msg = f"文件不存在: {file_path}"
+                logging.error(error_msg)
+                self._emit_write_result(False, error_msg)
+                return
+            
+            # 检查文件内容
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                    content_preview = f.read(100)  # 只读取前100个字符用于日志
+                logging.debug(f"文件内容预览: {content_preview}...")
+                
+                # 检查文件大小
+                file_size = os.path.getsize(file_path)
+                logging.debug(f"文件大小: {file_size} 字节")
+            except Exception as e:
+                logging.warning(f"读取配置文件内容时出错: {str(e)}")
+                
+            # 检查H2OUVE程序是否存在
+            console_tool = ToolRegistry.shared().resolve(CONSOLE_EXE)
+            console_exe_path = console_tool.path
+            if not console_tool.available:
+                error_msg = f"H2OUVE控制台程序不存在: {console_exe_path}"
+                logging.error(error_msg)
+                self._emit_write_result(False, error_msg)
+                return
+                
+            # 构建命令
+            cmd_args = [console_exe_path, '-sv', file_path]
+            logging.debug(f"执行写入命令: {' '.join(cmd_args)}")
+            
+            # 执行写入命令
+            logging.debug("开始执行写入命令")
+            try:
+                process = self.job_runner.run(cmd_args, job_name='write', timeout=TOOL_TIMEOUTS['write'],
+                                              **self._job_callbacks('write'))
+                log_job_output('write', process)
+            except Exception as e:
+                error_msg = f"执行写入命令异常: {str(e)}"
+                logging.error(error_msg)
+                self._emit_write_result(False, error_msg)
+                return
+            
+            if process.cancelled or process.timed_out:
+                error_msg = "BIOS配置写入已取消" if process.cancelled else "BIOS配置写入超时"
+                logging.error(error_msg)
+                self._emit_write_result(False, error_msg)
+                return
+            
+            # 检查写入结果
+            if process.returncode == 0:
+                success_msg = f"BIOS配置写入成功，可能需要重启系统以应用更改"
+                logging.info(success_msg)
+                self._emit_write_result(True, success_msg)
+            else:
+                error_msg = process.stderr if process.stderr else "未知错误"
+                logging.error(f"BIOS配置写入失败: {error_msg}")
+                self._emit_write_result(False, f"BIOS配置写入失败: {error_msg}")
+                
+        except Exception as e:
+            error_msg = f"写入操作出错: {str(e)}"
+            logging.exception(error_msg)  # 记录完整堆栈跟踪
+            self._emit_write_result(False, error_msg)
+    
+    def _emit_write_result(self, success, message):
+        """发射写入结果信号"""
+        # 使用QMetaObject.invokeMethod确保信号在主线程发射
+        QMetaObject.invokeMethod(
+            self, 
+            "writeResultSignal", 
+            Qt.QueuedConnection,
+            Q_ARG(bool, success),
+            Q_ARG(str, message)
+        )
+        
+    @pyqtSlot(result=list)
+    def getBackupFiles(self):
+        """获取备份配置文件列表"""
+        try:
+            # 索引未变化时直接返回上次生成的列表
+            cached_list = self._file_lists.get("backup")
+            if cached_list and cached_list[0] == self.file_index.version:
+                return cached_list[1]
+            
+            index_version = self.file_index.version
+            
+            backup_files = []
+            
+            # 从文件索引获取备份目录中的文件
+            for file_path, file, size, mtime in self._backup_file_entries():
+                # 格式化文件大小和修改时间
+                if size < 1024:
+                    size_str = f"{size} B"
+                elif size < 1024 * 1024:
+                    size_str = f"{size/1024:.1f} KB"
+                else:
+                    size_str = f"{size/(1024*1024):.1f} MB"
+                
+                date_str = datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+                
+                backup_files.append({
+                    "name": file,
+                    "path": file_path,
+                    "size": size_str,
+                    "date": date_str
+                })
+            
+            # 按修改时间排序，最新的在前
+            backup_files.sort(key=lambda x: x["date"], reverse=True)
+            
+            self._file_lists["backup"] = (index_version, backup_files)
+            
+            return backup_files
+            
+        except Exception as e:
+            print(f"获取备份文件列表出错: {e}")
+            return []
+        
+    @pyqtSlot(result=list)
+    def getExtractedBiosFiles(self):
+        """获取提取的BIOS固件文件列表"""
+        try:
+            # 索引未变化时直接返回上次生成的列表
+            cached_list = self._file_lists.get("extracted")
+            if cached_list and cached_list[0] == self.file_index.version:
+                return cached_list[1]
+            
+            index_version = self.file_index.version
+            
+            # 从文件索引获取EXTRACT_DIR目录树及BIOS_BACKUP_DIR目录中的.bin、.fd和.rom文件
+            indexed_files = self._indexed_bios_files()
+            
+            # 按修改时间排序，最新的文件在前面
+            indexed_files.sort(key=lambda indexed_file: indexed_file[3], reverse=True)
+            
+            files = []
+            
+            for file_path, file_name, size, mod_time in indexed_files:
+                # 格式化文件大小
+                if size < 1024:
+                    size_str = f"{size} B"
+                elif size < 1024 * 1024:
+                    size_str = f"{size/1024:.1f} KB"
+                else:
+                    size_str = f"{size/(1024*1024):.1f} MB"
+                
+                # 格式化文件修改时间
+                mod_time_str = datetime.fromtimestamp(mod_time).strftime("%Y-%m-%d %H:%M:%S")
+                
+                files.append({
+                    "name": file_name,
+                    "path": file_path,
+                    "size": size_str,
+                    "time": mod_time_str
+                })
+            
+            self._file_lists["extracted"] = (index_version, files)
+            
+            return files
+            
+        except Exception as e:
+            print(f"获取提取的BIOS文件列表失败: {e}")
+            return []
+    
+    def _backup_file_entries(self):
+        """从文件索引获取备份目录中的备份文件，跳过以.开头的索引文件"""
+        return [backup_file for backup_file in self.file_index.files(BACKUP_DIR, recursive=False)
+                if not backup_file[1].startswith('.')]
+    
+    def _sync_setting_store(self):
+        """将备份目录的变化同步到设置索引"""
+        try:
+            self.setting_store.sync(self._backup_file_entries())
+        except Exception as e:
+            logging.warning(f"同步备份设置索引出错: {str(e)}")
+    
+    @pyqtSlot(str, result=list)
+    def searchBackupSettings(self, setting_name):
+        """在所有备份中按设置名称检索，返回各备份中该设置的变量、偏移和值"""
+        try:
+            # 设置索引由调度器在启动和备份完成后同步，这里只检索
+            return self.setting_store.search(name=setting_name)
+            
+        except Exception as e:
+            print(f"检索备份设置出错: {e}")
+            return []
+    
+    def _sync_microcode_index(self):
+        """将提取和备份镜像的变化同步到微码索引"""
+        try:
+            self.microcode_index.sync(MicrocodeIndex.image_files(self.file_index))
+        except Exception as e:
+            logging.warning(f"同步微码索引出错: {str(e)}")
+    
+    @pyqtSlot(str, str, result=list)
+    def findMicrocode(self, cpuid_text, min_revision_text):
+        """检索携带指定CPUID微码的镜像，CPUID和最低版本为十六进制文本，最低版本可为空"""
+        try:
+            # 微码索引由调度器在启动和提取完成后同步，这里只检索
+            matches = self.microcode_index.lookup(int(cpuid_text, 16),
+                                                  min_revision=int(min_revision_text, 16) if min_revision_text else None)
+            
+            for match in matches:
+                match['name'] = os.path.basename(match['path'])
+                match['cpuid'] = f"0x{match['cpuid']:08X}"
+                match['revision'] = f"0x{match['revision']:X}"
+                match['platform_ids'] = f"0x{match['platform_ids']:02X}"
+                match['valid'] = bool(match['valid'])
+            
+            return matches
+            
+        except Exception as e:
+            print(f"检索微码出错: {e}")
+            return []
+    
+    @pyqtSlot(str, str)
+    def diffBackupFiles(self, old_file_name, new_file_name):
+        """比较两个备份文件，差异分批通过settingsDiffChunkSignal发送，完成后发射settingsDiffResultSignal"""
+        self._diff_generation += 1
+        
+        # 在调度器中执行比较，避免大文件比较时界面卡顿
+        self._schedule_job(JobScheduler.PARALLEL, self._do_diff_backups, 'diff',
+                           old_file_name, new_file_name, self._diff_generation)
+    
+    def _do_diff_backups(self, old_file_name, new_file_name, diff_generation):
+        """执行备份比较的实际操作"""
+        try:
+            old_path = os.path.join(BACKUP_DIR, old_file_name)
+            new_path = os.path.join(BACKUP_DIR, new_file_name)
+            
+            for file_path in [old_path, new_path]:
+                if not os.path.exists(file_path):
+                    self._emit_diff_result(False, f"文件不存在: {file_path}")
+                    return
+            
+            setting_diff = UveSettingDiff(old_path, new_path)
+            change_counts = {'changed': 0, 'added': 0, 'removed': 0}
+            diff_chunk = []
+            
+            for change in setting_diff.changes():
+                change_counts[change['kind']] += 1
+                diff_chunk.append(change)
+                
+                if len(diff_chunk) >= self.DIFF_CHUNK:
+                    # 已开始新的比较时放弃本次结果
+                    if diff_generation != self._diff_generation:
+                        return
+                    
+                    self._emit_diff_chunk(diff_chunk)
+                    diff_chunk = []
+            
+            if diff_generation != self._diff_generation:
+                return
+            
+            if diff_chunk:
+                self._emit_diff_chunk(diff_chunk)
+            
+            self._emit_diff_result(True, f"变更 {change_counts['changed']} 项，新增 {change_counts['added']} 项，"
+                                         f"删除 {change_counts['removed']} 项"
+                                         f"（{setting_diff.skipped_variables} 个变量未变化）")
+            
+        except Exception as e:
+            error_msg = f"比较备份文件出错: {str(e)}"
+            logging.exception(error_msg)
+            self._emit_diff_result(False, error_msg)
+    
+    def _emit_diff_chunk(self, changes):
+        """发射一批比较结果"""
+        QMetaObject.invokeMethod(
+            self,
+            "settingsDiffChunkSignal",
+            Qt.QueuedConnection,
+            Q_ARG(list, changes)
+        )
+    
+    def _emit_diff_result(self, success, message):
+        """发射比较完成信号"""
+        QMetaObject.invokeMethod(
+            self,
+            "settingsDiffResultSignal",
+            Qt.QueuedConnection,
+            Q_ARG(bool, success),
+            Q_ARG(str, message)
+        )
+    
+    @pyqtSlot(str, result=str)
+    def readBackupFile(self, file_name):
+        """读取备份文件内容"""
+        try:
+            file_path = os.path.join(BACKUP_DIR, file_name)
+            
+            if not os.path.exists(file_path):
+                return f"文件不存在: {file_path}"
+            
+            # 读取文件内容
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                content = f.read()
+            
+            return content
+            
+        except Exception as e:
+            return f"读取文件出错: {str(e)}"
+    
+    @pyqtSlot(str, result=bool)
+    def deleteBackupFile(self, file_name):
+        """删除备份文件"""
+        try:
+            file_path = os.path.join(BACKUP_DIR, file_name)
+            
+            if not os.path.exists(file_path):
+                return False
+            
+            # 删除文件
+            os.remove(file_path)
+            self.file_index.remove_file(file_path)
+            
+            return True
+            
+        except Exception as e:
+            print(f"删除文件出错: {e}")
+            return False
+    
+    @pyqtSlot(str, str, result=bool)
+    def renameBackupFile(self, old_name, new_name):
+        """重命名备份文件"""
+        try:
+            old_path = os.path.join(BACKUP_DIR, old_name)
+            new_path = os.path.join(BACKUP_DIR, new_name)
+            
+            if not os.path.exists(old_path):
+                return False
+            
+            if os.path.exists(new_path):
+                return False
+            
+            # 重命名文件
+            os.rename(old_path, new_path)
+            self.file_index.rename_file(old_path, new_path)
+            
+            return True
+            
+        except Exception as e:
+            print(f"重命名文件出错: {e}")
+            return False
+
+    @pyqtSlot(str, str, result=bool)
+    def renameBiosFile(self, old_path, new_path):
+        """重命名BIOS文件"""
+        try:
+            # 解码URL编码的路径
+            old_path = unquote(old_path)
+            new_path = unquote(new_path)
+            
+            # 标准化路径，处理不同的路径分隔符
+            old_path = os.path.normpath(old_path)
+            
+            # 确保新路径使用正确的目录分隔符
+            dir_path = os.path.dirname(old_path)
+            new_filename = os.path.basename(new_path)
+            new_path = os.path.join(dir_path, new_filename)
+            
+            print(f"重命名文件: 从 '{old_path}' 到 '{new_path}'")
+            
+            if not os.path.exists(old_path):
+                print(f"源文件不存在: {old_path}")
+                return False
+            
+            if os.path.exists(new_path):
+                print(f"目标文件已存在: {new_path}")
+                return False
+            
+            # 重命名文件
+            os.rename(old_path, new_path)
+            self.file_index.rename_file(old_path, new_path)
+            print(f"文件重命名成功: {old_path} -> {new_path}")
+            return True
+            
+        except Exception as e:
+            print(f"重命名BIOS文件出错: {e}")
+            return False
+            
+    @pyqtSlot(str, result=bool)
+    def deleteBiosFile(self, file_path):
+        """删除BIOS文件"""
+        try:
+            # 解码URL编码的路径
+            file_path = unquote(file_path)
+            
+            if not os.path.exists(file_path):
+                print(f"文件不存在: {file_path}")
+                return False
+            
+            # 删除文件
+            os.remove(file_path)
+            self.file_index.remove_file(file_path)
+            print(f"文件删除成功: {file_path}")
+            return True
+            
+        except Exception as e:
+            print(f"删除BIOS文件出错: {e}")
+            return False
+
+    def _on_directory_changed(self, dir_path):
+        """顶层数据目录在程序外部发生变化时，只重新扫描该目录"""
+        try:
+            self.file_index.rescan_dir(dir_path)
+        except Exception as e:
+            logging.warning(f"更新文件索引出错: {dir_path}, {str(e)}")
@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Insyde BIOS工具箱命令行批量处理
+
+不导入PyQt5、不请求管理员权限，可在Linux构建机上运行。按文件、目录或通配符收集固件文件，
+多进程并行解析，每处理完一个文件输出一行JSON结果。
+
+用法:
+    python insyde_bios_cli.py [-r] [-j N] [-C DIR] [--ext .bin,.exe] [--inventory | --nvram [--nvram-name 名称]] [-o results.jsonl] 输入...
+    python insyde_bios_cli.py [-C DIR] [-o matches.jsonl] --find-microcode CPUID[:最低版本]
+
+默认模式与图形界面的"解析BIOS文件"相同，提取结果写入工作目录下的BIOSExtract；
+--inventory只统计签名、固件卷和微码，--nvram列出转储NvStorage中的UEFI变量（--nvram-name指定名称时只列出同名变量并附带数据），均不写出任何文件。全部成功时退出码为0，有文件失败时为1，没有输入文件时为2。
+--find-microcode检索工作目录下BIOSBackup和BIOSExtract中携带指定CPUID微码的镜像，每个匹配输出一行JSON，没有匹配时退出码为1。
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import contextlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from insyde_bios_core import BiosExtractor, InsydeIfdExtract, UefiFvParse, MicrocodeScan, MicrocodeIndex, FileIndex, \
+    NvramParse, ExtractCache, EXTRACT_DIR, BIOS_BACKUP_DIR
+
+# 工作进程内复用的提取器，由_init_worker创建
+_worker_extractor = None
+
+
+def collect_inputs(patterns, recursive=False, extensions=None):
+    """展开文件、目录和通配符，返回去重后按输入顺序排列的绝对路径列表"""
+    input_files = []
+    seen_paths = set()
+
+    def add_file(file_path):
+        file_path = os.path.abspath(file_path)
+
+        if extensions and not file_path.lower().endswith(extensions):
+            return
+
+        if file_path not in seen_paths:
+            seen_paths.add(file_path)
+            input_files.append(file_path)
+
+    for pattern in patterns:
+        if os.path.isfile(pattern):
+            add_file(pattern)
+            continue
+
+        if os.path.isdir(pattern):
+            for root, dir_names, file_names in os.walk(pattern):
+                dir_names.sort()
+
+                for file_name in sorted(file_names):
+                    add_file(os.path.join(root, file_name))
+
+                if not recursive:
+                    break
+            continue
+
+        for match_path in sorted(glob.glob(pattern, recursive=recursive)):
+            if os.path.isfile(match_path):
+                add_file(match_path)
+
+    return input_files
+
+
+def assign_extract_paths(input_files):
+    """为每个文件分配提取目录；不同目录下的同名文件追加路径哈希，避免并行解析时写入同一目录"""
+    name_counts = {}
+
+    for file_path in input_files:
+        file_name = os.path.basename(file_path).lower()
+        name_counts[file_name] = name_counts.get(file_name, 0) + 1
+
+    extract_paths = {}
+
+    for file_path in input_files:
+        file_name = os.path.basename(file_path)
+
+        if name_counts[file_name.lower()] > 1:
+            path_hash = hashlib.sha1(file_path.encode('utf-8')).hexdigest()[:8]
+            extract_paths[file_path] = os.path.join(EXTRACT_DIR, f"{file_name}_{path_hash}_extracted")
+        else:
+            extract_paths[file_path] = os.path.join(EXTRACT_DIR, f"{file_name}_extracted")
+
+    return extract_paths
+
+
+def _init_worker(log_level):
+    """工作进程初始化：配置日志并创建提取器，嵌套镜像在工作进程内顺序解析，并行度由进程池控制"""
+    global _worker_extractor
+
+    # 提取过程的提示信息改写到标准错误，标准输出只包含JSON结果
+    sys.stdout = sys.stderr
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+
+    _worker_extractor = BiosExtractor(max_workers=1)
+
+
+def inventory_file(file_path):
+    """统计固件文件中的签名、UEFI固件卷和微码，不写出任何文件"""
+    with InsydeIfdExtract(input_object=file_path, use_mmap=True) as extractor:
+        input_buffer = extractor.input_buffer
+        signatures = extractor.signatures
+
+        fv_parse = UefiFvParse(input_buffer, fvh_spans=signatures['fvh'])
+        volumes = []
+
+        for fv_info in fv_parse.volumes():
+            volumes.append({
+                'offset': fv_info['offset'],
+                'size': fv_info['size'],
+                'fs_guid': fv_info['fs_guid'],
+                'nv_storage': fv_info['nv_storage'],
+                'files': sum(1 for _ in fv_parse.files(fv_info))
+            })
+
+        microcode = [{
+            'offset': ucode['offset'],
+            'cpuid': f"0x{ucode['cpuid']:08X}",
+            'revision': f"0x{ucode['revision']:X}",
+            'date': ucode['date'],
+            'platform_ids': f"0x{ucode['platform_ids']:02X}",
+            'extended': [f"0x{cpuid:08X}" for cpuid, _ in ucode['extended']],
+            'valid': ucode['valid']
+        } for ucode in MicrocodeScan(input_buffer, ucode_spans=extractor.microcode_spans).updates()]
+        
+        return {
+            'sha256': hashlib.sha256(input_buffer).hexdigest(),
+            'insyde_update': extractor.check_format(),
+            'signatures': {**{sig_name: len(sig_spans) for sig_name, sig_spans in signatures.items()},
+                           'microcode': len(extractor.microcode_spans)},
+            'volumes': volumes,
+            'microcode': microcode
+        }
+
+
+def nvram_file(file_path, var_name=None):
+    """读取固件转储NvStorage固件卷中的UEFI变量，指定名称时只输出同名变量并附带十六进制数据"""
+    with InsydeIfdExtract(input_object=file_path, use_mmap=True) as extractor:
+        nvram_parse = NvramParse(extractor.input_buffer, fvh_spans=extractor.signatures['fvh'])
+
+        variables = []
+
+        for variable in sorted(nvram_parse.find(name=var_name), key=lambda variable: variable.offset):
+            variable_entry = {
+                'name': variable.name,
+                'guid': variable.guid,
+                'attributes': variable.attribute_text(),
+                'size': variable.data_size,
+                'offset': variable.offset
+            }
+
+            if var_name:
+                variable_entry['data'] = variable.data.hex()
+
+            variables.append(variable_entry)
+
+        return {'variables': variables}
+
+
+def process_file(file_path, extract_path, inventory=False, nvram=False, nvram_name=None):
+    """处理单个固件文件，返回一行结果记录；出错时记录错误而不抛出，保证批处理继续"""
+    start_time = time.perf_counter()
+
+    file_result = {'file': file_path, 'size': None, 'success': False, 'message': ''}
+
+    try:
+        file_result['size'] = os.path.getsize(file_path)
+
+        if inventory:
+            file_result.update(inventory_file(file_path))
+            file_result['success'] = True
+            file_result['message'] = "统计完成"
+        elif nvram:
+            file_result.update(nvram_file(file_path, var_name=nvram_name))
+            file_result['success'] = True
+            file_result['message'] = f"找到 {len(file_result['variables'])} 个变量"
+        else:
+            # 内容哈希同时作为提取缓存键，只读取一次文件
+            file_result['sha256'] = ExtractCache.file_key(file_path)
+
+            success, message, files = _worker_extractor.parse_bios_file(file_path, extract_path=extract_path,
+                                                                        cache_key=file_result['sha256'])
+
+            file_result['success'] = success
+            file_result['message'] = message
+            file_result['extract_path'] = os.path.abspath(extract_path)
+            file_result['files'] = [os.path.abspath(file_info['path']) for file_info in files]
+    except Exception as e:
+        file_result['message'] = f"处理出错: {str(e)}"
+
+    file_result['elapsed'] = round(time.perf_counter() - start_time, 3)
+
+    return file_result
+
+
+def find_microcode(query, output_file):
+    """同步微码索引并检索携带指定CPUID（及不低于指定版本）微码的镜像，返回匹配数"""
+    cpuid_text, _, revision_text = query.partition(':')
+
+    file_index = FileIndex()
+
+    for directory in (BIOS_BACKUP_DIR, EXTRACT_DIR):
+        file_index.scan_tree(directory)
+
+    microcode_index = MicrocodeIndex()
+    scanned_count = microcode_index.sync(MicrocodeIndex.image_files(file_index))
+    logging.info(f"微码索引已同步，重新扫描 {scanned_count} 个镜像")
+
+    matches = microcode_index.lookup(int(cpuid_text, 16), min_revision=int(revision_text, 16) if revision_text else None)
+
+    for match in matches:
+        match['path'] = os.path.abspath(match['path'])
+        match['cpuid'] = f"0x{match['cpuid']:08X}"
+        match['revision'] = f"0x{match['revision']:X}"
+        match['platform_ids'] = f"0x{match['platform_ids']:02X}"
+        match['valid'] = bool(match['valid'])
+
+        output_file.write(json.dumps(match, ensure_ascii=False) + '\n')
+
+    return len(matches)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Insyde BIOS工具箱命令行批量处理，每个文件输出一行JSON结果')
+    parser.add_argument('inputs', nargs='*', help='固件文件、目录或通配符')
+    parser.add_argument('-r', '--recursive', action='store_true', help='递归处理子目录，通配符支持**')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='并行进程数（默认CPU核心数）')
+    parser.add_argument('-C', '--workdir', help='工作目录，提取结果与缓存写入其中的BIOSExtract（默认当前目录）')
+    parser.add_argument('--ext', help='只处理这些扩展名的文件，逗号分隔，例如.bin,.fd,.rom,.exe')
+
+    # 各处理模式互斥，未指定时提取固件
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--inventory', action='store_true', help='只统计签名、固件卷和微码，不提取')
+    mode_group.add_argument('--nvram', action='store_true', help='列出转储NvStorage中的UEFI变量，不提取')
+    mode_group.add_argument('--find-microcode', metavar='CPUID[:REV]',
+                            help='检索BIOSBackup和BIOSExtract中携带该CPUID微码的镜像，可指定最低版本，均为十六进制')
+
+    parser.add_argument('--nvram-name', metavar='NAME', help='与--nvram一起使用，只列出该名称的变量并输出其数据')
+    parser.add_argument('-o', '--output', help='将结果写入文件而不是标准输出')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='输出日志到标准错误，-vv为调试日志')
+
+    args = parser.parse_args(argv)
+
+    if args.nvram_name is not None and not args.nvram:
+        parser.error('--nvram-name需要与--nvram一起使用')
+
+    if args.find_microcode and args.inputs:
+        parser.error('--find-microcode检索工作目录下的镜像，不接受输入文件')
+
+    if not args.inputs and not args.find_microcode:
+        parser.error('需要指定输入文件或--find-microcode')
+
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    log_level = [logging.WARNING, logging.INFO, logging.DEBUG][min(args.verbose, 2)]
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s', stream=sys.stderr)
+
+    extensions = tuple(ext.strip().lower() for ext in args.ext.split(',') if ext.strip()) if args.ext else None
+
+    # 先按启动时的目录解析输入路径，再切换工作目录
+    input_files = collect_inputs(args.inputs, recursive=args.recursive, extensions=extensions)
+    output_path = os.path.abspath(args.output) if args.output else None
+
+    if args.find_microcode:
+        if args.workdir:
+            os.chdir(args.workdir)
+
+        with open(output_path, 'w', encoding='utf-8') if output_path else contextlib.nullcontext(sys.stdout) as output_file:
+            return 0 if find_microcode(args.find_microcode, output_file) else 1
+
+    if not input_files:
+        print("没有找到输入文件", file=sys.stderr)
+        return 2
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        os.chdir(args.workdir)
+
+    extract_paths = assign_extract_paths(input_files)
+
+    output_file = open(output_path, 'w', encoding='utf-8') if output_path else sys.stdout
+    failed_count = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(input_files))), initializer=_init_worker,
+                                 initargs=(log_level,)) as executor:
+            futures = [executor.submit(process_file, file_path, extract_paths[file_path], args.inventory,
+                                       args.nvram, args.nvram_name) for file_path in input_files]
+
+            # 按完成顺序输出，便于下游流式消费
+            for future in as_completed(futures):
+                file_result = future.result()
+
+                if not file_result['success']:
+                    failed_count += 1
+
+                output_file.write(json.dumps(file_result, ensure_ascii=False) + '\n')
+                output_file.flush()
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    logging.info(f"处理完成: {len(input_files)} 个文件，失败 {failed_count} 个")
+
+    return 1 if failed_count else 0
+
+
+if __name__ == '__main__':
+    # 打包后的程序需要支持多进程解析的子进程启动
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,4652 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Insyde BIOS工具箱核心：固件解析与提取、外部工具作业、刷写计划和设置索引，不依赖PyQt5，供图形界面和命令行共用"""
+
+import os
+import sys
+import ctypes
+import json
+import time
+import subprocess
+import threading
+import shutil
+import glob
+import re
+import mmap
+import io
+import hashlib
+import zlib
+import csv
+import pickle
+import sqlite3
+import asyncio
+import locale
+import platform
+import lzma
+import uuid
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from itertools import repeat, islice
+from datetime import datetime
+import tempfile
+import importlib.util
+import struct
+import stat
+import logging
+import logging.handlers
+import queue
+import atexit
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# 设置日志系统
+class JsonLogFormatter(logging.Formatter):
+    """每条日志输出为一行JSON，便于日志工具检索"""
+    
+    def format(self, record):
+        log_entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        
+        if record.exc_info:
+            log_entry['exception'] = self.formatException(record.exc_info)
+        
+        return json.dumps(log_entry, ensure_ascii=False)
+
+
+def setup_logging(json_lines=None):
+    """配置日志系统：各线程只把日志放入队列，由后台监听线程写入按大小轮转的文件和控制台
+    
+    json_lines为None时由环境变量INSYDE_LOG_JSON决定，启用后调试日志写入debug.jsonl。返回QueueListener。
+    """
+    if json_lines is None:
+        json_lines = os.environ.get('INSYDE_LOG_JSON', '') not in ('', '0')
+    
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    
+    # 创建两个按大小轮转的文件处理器，一个用于debug日志，一个用于error日志
+    debug_handler = logging.handlers.RotatingFileHandler('debug.jsonl' if json_lines else 'debug.log',
+                                                         maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                                         encoding='utf-8')
+    debug_handler.setLevel(logging.DEBUG)
+    debug_handler.setFormatter(JsonLogFormatter() if json_lines else log_formatter)
+    
+    error_handler = logging.handlers.RotatingFileHandler('error.log', maxBytes=LOG_MAX_BYTES,
+                                                         backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(log_formatter)
+    
+    # 创建控制台处理器
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(log_formatter)
+    
+    # 获取根日志记录器并设置级别
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+    
+    # 清除之前可能存在的处理器
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    
+    # 工作线程只做入队，文件写入集中在监听线程，不在根日志记录器的锁上竞争
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    log_listener = logging.handlers.QueueListener(log_queue, debug_handler, error_handler, console_handler,
+                                                  respect_handler_level=True)
+    log_listener.start()
+    
+    # 退出前写完队列中剩余的日志
+    atexit.register(log_listener.stop)
+    
+    logging.debug("日志系统初始化完成")
+    
+    return log_listener
+
+
+def log_job_output(job_name, job_result):
+    """记录外部工具作业的输出：输出较短时直接写入主日志，较长时写入单独的作业日志文件，主日志只记录摘要"""
+    output_text = job_result.stdout + (f"\n[stderr]\n{job_result.stderr}" if job_result.stderr else '')
+    line_count = output_text.count('\n') + 1 if output_text else 0
+    
+    summary = f"作业 {job_name} 结束，返回代码: {job_result.returncode}，输出 {line_count} 行"
+    
+    if len(output_text) <= JOB_LOG_INLINE:
+        logging.debug(f"{summary}\n{output_text}" if output_text else summary)
+        return None
+    
+    try:
+        os.makedirs(JOB_LOG_DIR, exist_ok=True)
+        
+        job_log_path = os.path.join(JOB_LOG_DIR, f"{job_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.log")
+        
+        with open(job_log_path, 'w', encoding='utf-8') as job_log:
+            job_log.write(' '.join(str(arg) for arg in job_result.args) + '\n\n')
+            job_log.write(output_text)
+        
+        # 只保留最近的作业日志
+        job_logs = [os.path.join(JOB_LOG_DIR, file_name) for file_name in os.listdir(JOB_LOG_DIR)
+                    if file_name.endswith('.log')]
+        
+        for old_log in sorted(job_logs, key=os.path.getmtime)[:-JOB_LOG_KEEP]:
+            InsydePaths.delete_file(in_path=old_log)
+    except OSError as e:
+        logging.warning(f"{summary}，无法写入作业日志: {str(e)}")
+        return None
+    
+    logging.info(f"{summary}，完整输出: {job_log_path}")
+    
+    return job_log_path
+
+# 常量定义
+CONSOLE_EXE = "H2OUVE-W-CONSOLEx64.exe"
+GUI_EXE = "H2OUVE-W-GUIx64.exe"
+EZE_EXE = "H2OEZE.exe"  # H2OEZE可执行文件
+FPT_EXE = "FPTW64.exe"
+BACKUP_DIR = "BIOSsetting"
+EXTRACT_DIR = "BIOSExtract"
+BIOS_BACKUP_DIR = "BIOSBackup"  # 新增BIOS备份专用目录
+EXTRACT_WORKERS = min(8, os.cpu_count() or 1)  # 嵌套iFdPacker镜像并行解析的最大进程数
+EXTRACT_CACHE_LIMIT = 4 * 1024 * 1024 * 1024  # 提取结果缓存占用的最大空间（字节）
+SECTION_CACHE_LIMIT = 1024 * 1024 * 1024  # FFS节解压结果缓存占用的最大空间（字节）
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 日志文件轮转的大小（字节）
+LOG_BACKUP_COUNT = 3  # 每个日志文件保留的轮转份数
+JOB_LOG_DIR = os.path.join("logs", "jobs")  # 外部工具完整输出的作业日志目录
+JOB_LOG_INLINE = 2000  # 不超过该长度（字符）的作业输出直接写入主日志
+JOB_LOG_KEEP = 50  # 保留的作业日志文件数
+TOOL_TIMEOUTS = {'dump': 600, 'backup': 300, 'write': None, 'flash': None, 'flash_range': 120}  # 外部工具作业的超时秒数，写入配置和刷写不设超时，flash_range用于按范围读回
+
+# 已将所需的BIOSUtilities代码直接集成到该文件中，不再需要外部模块依赖
+
+# 集成BIOSUtilities中必需的代码
+# ==== 集成 structs.py ====
+class InsydeStructs:
+    """从BIOSUtilities集成的结构定义"""
+    
+    @staticmethod
+    def ctypes_struct(buffer, start_offset, class_object, param_list=None):
+        """
+        从buffer创建ctypes结构体
+        """
+        if not param_list:
+            param_list = []
+
+        structure = class_object(*param_list)
+        struct_len = ctypes.sizeof(structure)
+        
+        # 通过memoryview切片，buffer可以是bytes、bytearray或mmap，只复制结构体本身大小的数据
+        with memoryview(buffer) as buffer_view:
+            struct_data = buffer_view[start_offset:start_offset + struct_len].tobytes()
+        
+        least_len = min(len(struct_data), struct_len)
+        ctypes.memmove(ctypes.addressof(structure), struct_data, least_len)
+        return structure
+
+
+# ==== 集成 texts.py ====
+class InsydeTexts:
+    """从BIOSUtilities集成的文本处理函数"""
+    
+    @staticmethod
+    def to_string(in_object, sep_char=''):
+        """将对象转换为字符串"""
+        if isinstance(in_object, (list, tuple)):
+            out_string = sep_char.join(map(str, in_object))
+        else:
+            out_string = str(in_object)
+        return out_string
+    
+    @staticmethod
+    def file_to_bytes(in_object):
+        """从文件或缓冲区获取字节"""
+        if isinstance(in_object, str):
+            with open(in_object, 'rb') as object_fp:
+                return object_fp.read()
+        return bytes(in_object)
+    
+    @staticmethod
+    def file_to_mmap(in_object):
+        """将文件以只读方式映射到内存，避免整体读入"""
+        if not isinstance(in_object, str):
+            return InsydeTexts.file_to_bytes(in_object)
+        
+        with open(in_object, 'rb') as object_fp:
+            # 空文件无法映射，直接返回空缓冲区
+            if os.fstat(object_fp.fileno()).st_size == 0:
+                return b''
+            
+            return mmap.mmap(object_fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# ==== 集成 system.py ====
+class InsydeSystem:
+    """从BIOSUtilities集成的系统函数"""
+    
+    @staticmethod
+    def system_platform():
+        """获取系统平台信息"""
+        import platform
+        sys_os = platform.system()
+        is_win = sys_os == 'Windows'
+        is_lnx = sys_os in ('Linux', 'Darwin')
+        return sys_os, is_win, is_lnx
+    
+    @staticmethod
+    def printer(message=None, padding=0, new_line=True, sep_char=' ', strip=False):
+        """打印消息"""
+        message_string = InsydeTexts.to_string('' if message is None else message, sep_char=sep_char)
+        message_output = '\n' if new_line else ''
+        
+        for message_line_index, message_line_text in enumerate(message_string.split('\n')):
+            line_new = '' if message_line_index == 0 else '\n'
+            line_text = message_line_text.strip() if strip else message_line_text
+            message_output += f'{line_new}{" " * padding}{line_text}'
+        
+        print(message_output)
+
+
+# ==== 集成 paths.py ====
+class InsydePaths:
+    """从BIOSUtilities集成的路径处理函数"""
+    
+    @staticmethod
+    def make_dirs(in_path, parents=True, exist_ok=True, delete=False):
+        """创建目录"""
+        if delete:
+            InsydePaths.delete_dirs(in_path)
+        
+        os.makedirs(in_path, exist_ok=exist_ok)
+    
+    @staticmethod
+    def delete_dirs(in_path):
+        """删除目录"""
+        if InsydePaths.is_dir(in_path):
+            shutil.rmtree(in_path, onerror=InsydePaths.clear_readonly_callback)
+    
+    @staticmethod
+    def is_dir(in_path):
+        """检查路径是否为目录"""
+        return os.path.isdir(in_path)
+    
+    @staticmethod
+    def is_file(in_path, allow_broken_links=False):
+        """检查路径是否为文件"""
+        in_path_abs = os.path.abspath(in_path)
+        
+        if os.path.lexists(in_path_abs):
+            if not InsydePaths.is_dir(in_path_abs):
+                if allow_broken_links:
+                    return os.path.isfile(in_path_abs) or os.path.islink(in_path_abs)
+                return os.path.isfile(in_path_abs)
+        
+        return False
+    
+    @staticmethod
+    def is_file_read(in_path):
+        """检查路径是否为可读文件"""
+        return isinstance(in_path, str) and InsydePaths.is_file(in_path) and InsydePaths.is_access(in_path)
+    
+    @staticmethod
+    def is_access(in_path, access_mode=os.R_OK, follow_links=False):
+        """检查路径是否可访问"""
+        if not follow_links and os.access not in getattr(os, 'supports_follow_symlinks', []):
+            follow_links = True
+        
+        return os.access(in_path, access_mode, follow_symlinks=follow_links)
+    
+    @staticmethod
+    def path_name(in_path, limit=False):
+        """获取路径的最后一个组件（文件名）"""
+        return os.path.basename(in_path)
+    
+    @staticmethod
+    def extract_folder(in_path, suffix='_extracted'):
+        """生成提取文件夹路径"""
+        return f"{in_path}{suffix}"
+    
+    @staticmethod
+    def path_files(in_path, follow_links=False, root_only=False):
+        """遍历路径获取所有文件"""
+        file_paths = []
+        
+        for root_path, _, file_names in os.walk(in_path, followlinks=follow_links):
+            for file_name in file_names:
+                file_path = os.path.abspath(os.path.join(root_path, file_name))
+                
+                if InsydePaths.is_file(file_path):
+                    file_paths.append(file_path)
+            
+            if root_only:
+                break
+        
+        return file_paths
+    
+    @staticmethod
+    def clear_readonly(in_path):
+        """清除只读文件属性"""
+        import stat
+        os.chmod(in_path, stat.S_IWRITE)
+    
+    @staticmethod
+    def clear_readonly_callback(in_func, in_path, _):
+        """清除只读文件属性（用于shutil.rmtree错误）"""
+        InsydePaths.clear_readonly(in_path)
+        in_func(in_path)
+    
+    @staticmethod
+    def delete_file(in_path):
+        """删除文件"""
+        if InsydePaths.is_file(in_path):
+            InsydePaths.clear_readonly(in_path)
+            os.remove(in_path)
+    
+    @staticmethod
+    def safe_name(in_name):
+        """修复非法/保留的Windows字符"""
+        name_repr = repr(in_name).strip("'")
+        return re.sub(r'[\\/:"*?<>|]+', '_', name_repr)
+
+
+# ==== 集成 patterns.py ====
+# Insyde相关的正则表达式模式
+PAT_INSYDE_IFL = re.compile(br'\$_IFLASH')
+PAT_INSYDE_SFX = re.compile(br'\x0D\x0A;!@InstallEnd@!\x0D\x0A(7z\xBC\xAF\x27|\x6E\xF4\x79\x5F\x4E)')
+PAT_INSYDE_FID = re.compile(br'\$FID')
+PAT_UEFI_FVH = re.compile(br'_FVH')
+PAT_INTEL_UCODE = re.compile(br'\x01\x00{3}.{4}[\x00-\x99][\x19\x20][\x01-\x31][\x01-\x12].{8}\x01\x00{3}', re.DOTALL)
+
+
+# ==== 集成 templates.py ====
+class BIOSUtility:
+    """BIOS实用工具基类"""
+    
+    TITLE = 'BIOS Utility'
+    
+    def __init__(self, input_object=b'', extract_path='', padding=0, use_mmap=False):
+        self.input_object = input_object
+        self.extract_path = extract_path
+        self.padding = padding
+        self.use_mmap = use_mmap
+        self.__input_buffer = None
+    
+    @property
+    def input_buffer(self):
+        """获取输入对象缓冲区（mmap模式下为只读内存映射）"""
+        if self.__input_buffer is None:
+            if self.use_mmap:
+                self.__input_buffer = InsydeTexts.file_to_mmap(self.input_object)
+            else:
+                self.__input_buffer = InsydeTexts.file_to_bytes(self.input_object)
+        
+        return self.__input_buffer
+    
+    def close(self):
+        """释放输入缓冲区（关闭内存映射）"""
+        if isinstance(self.__input_buffer, mmap.mmap):
+            self.__input_buffer.close()
+        
+        self.__input_buffer = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def check_format(self):
+        """检查输入对象是否为特定支持的格式"""
+        raise NotImplementedError('Method "check_format" not implemented')
+    
+    def parse_format(self):
+        """将输入对象作为特定支持的格式进行处理"""
+        raise NotImplementedError('Method "parse_format" not implemented')
+
+
+# ==== 集成 compression.py (简化版) ====
+def szip_exe_path():
+    """获取外部7-Zip可执行文件路径，未找到时返回None"""
+    return shutil.which("7z.exe" if os.name == 'nt' else "7z")
+
+def szip_decompress(in_path, out_path, in_name='archive', padding=0, args=None, check=False, silent=False):
+    """使用7-Zip解压缩归档"""
+    try:
+        # 简化版，使用subprocess直接调用7z
+        szip_exe = szip_exe_path() or ("7z.exe" if os.name == 'nt' else "7z")
+        cmd_args = [szip_exe, 'x', '-y', '-o' + out_path, in_path]
+        
+        if args:
+            for arg in args:
+                if arg.startswith('-p'):
+                    cmd_args.insert(2, arg)
+        
+        process = subprocess.run(cmd_args, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        
+        if process.returncode in [0, 1] and os.path.isdir(out_path):
+            if not silent:
+                InsydeSystem.printer(message=f'Successful {in_name} decompression via 7-Zip!', padding=padding)
+            return True
+        return False
+    except:
+        return False
+
+class BufferReader(io.RawIOBase):
+    """缓冲区（bytes或mmap）指定偏移之后部分的只读、可定位文件对象，读取时只复制请求的数据；
+    指定查找表时按表转换读出的每个字节，用于在读取时解除混淆而不生成完整的转换副本"""
+    
+    def __init__(self, buffer, offset=0, table=None):
+        super().__init__()
+        
+        with memoryview(buffer) as buffer_view:
+            self._view = buffer_view[offset:]
+        
+        self._table = table
+        self._pos = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, out_buffer):
+        read_len = max(0, min(len(out_buffer), len(self._view) - self._pos))
+        
+        if self._table is None:
+            out_buffer[:read_len] = self._view[self._pos:self._pos + read_len]
+        else:
+            out_buffer[:read_len] = self._view[self._pos:self._pos + read_len].tobytes().translate(self._table)
+        
+        self._pos += read_len
+        
+        return read_len
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        
+        self._pos = offset
+        
+        return self._pos
+    
+    def tell(self):
+        return self._pos
+    
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        
+        super().close()
+
+def _szip_py7zr_available():
+    """检查进程内7z解码库py7zr是否可用"""
+    return importlib.util.find_spec('py7zr') is not None
+
+def _szip_py7zr_extract(in_stream, out_path, password=None):
+    """使用py7zr在进程内直接从文件对象解压7z归档"""
+    import py7zr
+    
+    with py7zr.SevenZipFile(in_stream, mode='r', password=password) as szip_archive:
+        szip_archive.extractall(path=out_path)
+    
+    return True
+
+def _szip_exe_extract(in_stream, out_path, password=None):
+    """使用外部7-Zip解压文件对象，外部工具只能读取磁盘文件，需要先写出临时归档文件"""
+    os.makedirs(out_path, exist_ok=True)
+    
+    tmp_fd, tmp_path = tempfile.mkstemp(suffix='.7z', dir=out_path)
+    
+    try:
+        with os.fdopen(tmp_fd, 'wb') as tmp_file:
+            shutil.copyfileobj(in_stream, tmp_file)
+        
+        return szip_decompress(in_path=tmp_path, out_path=out_path, args=[f'-p{password}'] if password else None,
+                               silent=True)
+    finally:
+        InsydePaths.delete_file(in_path=tmp_path)
+
+# 7-Zip解压后端，按优先级排列：(名称, 可用性检查, 解压函数)
+SZIP_BACKENDS = [
+    ('py7zr', _szip_py7zr_available, _szip_py7zr_extract),
+    ('7-Zip', lambda: szip_exe_path() is not None, _szip_exe_extract),
+]
+
+def szip_backends():
+    """获取当前可用的7-Zip解压后端"""
+    return [(backend_name, backend_extract) for backend_name, backend_check, backend_extract in SZIP_BACKENDS
+            if backend_check()]
+
+def szip_decompress_stream(in_stream, out_path, in_name='archive', padding=0, password=None, silent=False):
+    """从可定位的文件对象解压7-Zip归档，依次尝试可用的解压后端直到成功"""
+    for backend_name, backend_extract in szip_backends():
+        in_stream.seek(0)
+        
+        try:
+            if not backend_extract(in_stream, out_path, password):
+                logging.warning(f"{backend_name}解压{in_name}失败，尝试下一个解压后端")
+                continue
+        except Exception as e:
+            logging.warning(f"{backend_name}解压{in_name}出错，尝试下一个解压后端: {type(e).__name__}: {str(e)}")
+            continue
+        
+        if not silent:
+            InsydeSystem.printer(message=f'Successful {in_name} decompression via {backend_name}!', padding=padding)
+        
+        return True
+    
+    return False
+
+def tiano_exe_path():
+    """获取外部TianoCompress可执行文件路径，未找到时返回None"""
+    return shutil.which("TianoCompress.exe" if os.name == 'nt' else "TianoCompress")
+
+def _efi_module_available():
+    """检查是否安装了uefi_firmware（其efi_compressor为C扩展，无需外部工具）"""
+    return importlib.util.find_spec('uefi_firmware') is not None
+
+def _efi_module_decompress(in_buffer, comp_type):
+    """使用uefi_firmware.efi_compressor在进程内解压EFI/Tiano数据"""
+    from uefi_firmware import efi_compressor
+    
+    decompress = efi_compressor.EfiDecompress if comp_type == 'efi' else efi_compressor.TianoDecompress
+    
+    return decompress(in_buffer, len(in_buffer))
+
+def _efi_exe_decompress(in_buffer, comp_type):
+    """使用外部TianoCompress解压EFI/Tiano数据"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        in_path = os.path.join(tmp_dir, 'section.bin')
+        out_path = os.path.join(tmp_dir, 'section.out')
+        
+        with open(in_path, 'wb') as in_file:
+            in_file.write(in_buffer)
+        
+        comp_arg = '--uefi' if comp_type == 'efi' else '--tiano'
+        
+        subprocess.run([tiano_exe_path(), '-d', in_path, '-o', out_path, '-q', comp_arg], check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        
+        with open(out_path, 'rb') as out_file:
+            return out_file.read()
+
+# EFI/Tiano解压后端，按优先级排列：(名称, 可用性检查, 解压函数)
+EFI_BACKENDS = [
+    ('uefi_firmware', _efi_module_available, _efi_module_decompress),
+    ('TianoCompress', lambda: tiano_exe_path() is not None, _efi_exe_decompress),
+]
+
+def efi_decompress_buffer(in_buffer, comp_type='efi'):
+    """解压EFI标准压缩或Tiano压缩数据，依次尝试可用的后端，全部失败时返回None"""
+    for _, backend_check, backend_decompress in EFI_BACKENDS:
+        if not backend_check():
+            continue
+        
+        try:
+            return backend_decompress(in_buffer, comp_type)
+        except Exception:
+            continue
+    
+    return None
+
+def lzma_decompress_buffer(in_buffer, x86_filter=False):
+    """解压EDK2 LZMA数据（13字节LZMA Alone头部），LzmaF86还需在解压后逆转x86 BCJ转换"""
+    if not x86_filter:
+        return lzma.decompress(in_buffer, format=lzma.FORMAT_ALONE)
+    
+    # LZMA Alone格式不支持附加过滤器，按头部中的属性改用原始格式解码
+    lzma_props, dict_size, out_size = struct.unpack_from('<BIQ', in_buffer, 0)
+    
+    lzma_filter = {
+        'id': lzma.FILTER_LZMA1,
+        'lc': lzma_props % 9,
+        'lp': lzma_props // 9 % 5,
+        'pb': lzma_props // 45,
+        'dict_size': dict_size
+    }
+    
+    decompressor = lzma.LZMADecompressor(format=lzma.FORMAT_RAW, filters=[{'id': lzma.FILTER_X86}, lzma_filter])
+    
+    return decompressor.decompress(in_buffer[0xD:], max_length=out_size)
+
+def _brotli_available():
+    """检查是否安装了brotli模块"""
+    return importlib.util.find_spec('brotli') is not None
+
+def brotli_decompress_buffer(in_buffer):
+    """解压EDK2 Brotli数据（前0x10字节为解压后大小与临时缓冲区大小），未安装brotli时返回None"""
+    if not _brotli_available():
+        return None
+    
+    import brotli
+    
+    return brotli.decompress(in_buffer[0x10:])
+
+# FFS节解压方法：方法名 -> 解压函数
+SECTION_DECOMPRESSORS = {
+    'efi': lambda in_buffer: efi_decompress_buffer(in_buffer, comp_type='efi'),
+    'tiano': lambda in_buffer: efi_decompress_buffer(in_buffer, comp_type='tiano'),
+    'lzma': lambda in_buffer: lzma_decompress_buffer(in_buffer),
+    'lzmaf86': lambda in_buffer: lzma_decompress_buffer(in_buffer, x86_filter=True),
+    'brotli': brotli_decompress_buffer,
+}
+
+
+# ==== 集成 IflashHeader 结构 ====
+class IflashHeader(ctypes.LittleEndianStructure):
+    """Insyde iFlash头部"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('Signature',       ctypes.c_char * 8),      # 0x00 $_IFLASH
+        ('ImageTag',        ctypes.c_char * 8),      # 0x08
+        ('TotalSize',       ctypes.c_uint),          # 0x10 from header end
+        ('ImageSize',       ctypes.c_uint)           # 0x14 from header end
+        # 0x18
+    ]
+    
+    def _get_padd_len(self):
+        return self.TotalSize - self.ImageSize
+    
+    def get_image_tag(self):
+        """获取Insyde iFlash镜像标签"""
+        return self.ImageTag.decode('utf-8', 'ignore').strip('_')
+    
+    def struct_print(self, padding=0):
+        """显示结构信息"""
+        InsydeSystem.printer(message=['Signature :', self.Signature.decode('utf-8')], padding=padding, new_line=False)
+        InsydeSystem.printer(message=['Image Name:', self.get_image_tag()], padding=padding, new_line=False)
+        InsydeSystem.printer(message=['Image Size:', f'0x{self.ImageSize:X}'], padding=padding, new_line=False)
+        InsydeSystem.printer(message=['Total Size:', f'0x{self.TotalSize:X}'], padding=padding, new_line=False)
+        InsydeSystem.printer(message=['Padd Size :', f'0x{self._get_padd_len():X}'], padding=padding, new_line=False)
+
+
+# ==== UEFI固件卷/FFS结构 ====
+def guid_to_str(guid_bytes):
+    """将16字节的EFI_GUID转换为标准字符串形式"""
+    return str(uuid.UUID(bytes_le=bytes(guid_bytes))).upper()
+
+
+class FvHeader(ctypes.LittleEndianStructure):
+    """UEFI固件卷头部 (EFI_FIRMWARE_VOLUME_HEADER)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('ZeroVector',      ctypes.c_ubyte * 16),    # 0x00
+        ('FileSystemGuid',  ctypes.c_ubyte * 16),    # 0x10
+        ('FvLength',        ctypes.c_uint64),        # 0x20
+        ('Signature',       ctypes.c_char * 4),      # 0x28 _FVH
+        ('Attributes',      ctypes.c_uint),          # 0x2C
+        ('HeaderLength',    ctypes.c_ushort),        # 0x30
+        ('Checksum',        ctypes.c_ushort),        # 0x32
+        ('ExtHeaderOffset', ctypes.c_ushort),        # 0x34
+        ('Reserved',        ctypes.c_ubyte),         # 0x36
+        ('Revision',        ctypes.c_ubyte)          # 0x37
+        # 0x38 BlockMap
+    ]
+    
+    def get_erase_byte(self):
+        """获取固件卷的擦除值（EFI_FVB2_ERASE_POLARITY）"""
+        return 0xFF if self.Attributes & 0x800 else 0x00
+
+
+class FvExtHeader(ctypes.LittleEndianStructure):
+    """UEFI固件卷扩展头部 (EFI_FIRMWARE_VOLUME_EXT_HEADER)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('FvName',          ctypes.c_ubyte * 16),    # 0x00
+        ('ExtHeaderSize',   ctypes.c_uint)           # 0x10
+        # 0x14
+    ]
+
+
+class FfsFileHeader(ctypes.LittleEndianStructure):
+    """UEFI FFS文件头部 (EFI_FFS_FILE_HEADER/EFI_FFS_FILE_HEADER2)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('Name',            ctypes.c_ubyte * 16),    # 0x00
+        ('IntegrityCheck',  ctypes.c_ushort),        # 0x10
+        ('Type',            ctypes.c_ubyte),         # 0x12
+        ('Attributes',      ctypes.c_ubyte),         # 0x13
+        ('Size',            ctypes.c_ubyte * 3),     # 0x14
+        ('State',           ctypes.c_ubyte),         # 0x17
+        ('ExtendedSize',    ctypes.c_uint64)         # 0x18 仅FFS_ATTRIB_LARGE_FILE
+        # 0x20
+    ]
+    
+    def get_size(self):
+        """获取文件总大小与头部大小"""
+        if self.Attributes & 0x01 and not any(self.Size):
+            return self.ExtendedSize, 0x20
+        
+        return int.from_bytes(bytes(self.Size), 'little'), 0x18
+
+
+class FfsSectionHeader(ctypes.LittleEndianStructure):
+    """UEFI FFS节头部 (EFI_COMMON_SECTION_HEADER/EFI_COMMON_SECTION_HEADER2)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('Size',            ctypes.c_ubyte * 3),     # 0x00
+        ('Type',            ctypes.c_ubyte),         # 0x03
+        ('ExtendedSize',    ctypes.c_uint)           # 0x04 仅Size为0xFFFFFF时
+        # 0x08
+    ]
+    
+    def get_size(self):
+        """获取节总大小与头部大小"""
+        sec_size = int.from_bytes(bytes(self.Size), 'little')
+        
+        if sec_size == 0xFFFFFF:
+            return self.ExtendedSize, 0x8
+        
+        return sec_size, 0x4
+
+
+# ==== Intel微码更新结构 ====
+class MicrocodeHeader(ctypes.LittleEndianStructure):
+    """Intel微码更新头部 (Intel SDM Vol.3 9.11.1)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('HeaderVersion',   ctypes.c_uint),          # 0x00 固定为1
+        ('UpdateRevision',  ctypes.c_uint),          # 0x04
+        ('Date',            ctypes.c_uint),          # 0x08 BCD mmddyyyy
+        ('ProcessorSignature', ctypes.c_uint),       # 0x0C CPUID(EAX=1)
+        ('Checksum',        ctypes.c_uint),          # 0x10
+        ('LoaderRevision',  ctypes.c_uint),          # 0x14 固定为1
+        ('ProcessorFlags',  ctypes.c_uint),          # 0x18 平台ID位图
+        ('DataSize',        ctypes.c_uint),          # 0x1C 为0时表示2000字节
+        ('TotalSize',       ctypes.c_uint),          # 0x20 为0时表示2048字节
+        ('Reserved',        ctypes.c_ubyte * 12)     # 0x24
+        # 0x30
+    ]
+    
+    def get_sizes(self):
+        """获取数据大小与总大小，DataSize为0的旧格式微码固定为2000/2048字节"""
+        if self.DataSize == 0:
+            return 2000, 2048
+        
+        return self.DataSize, self.TotalSize
+    
+    def get_date(self):
+        """将BCD编码的mmddyyyy日期转换为YYYY-MM-DD"""
+        date_text = f'{self.Date:08X}'
+        
+        return f'{date_text[4:]}-{date_text[:2]}-{date_text[2:4]}'
+
+
+# ==== UEFI变量存储结构 ====
+class VssStoreHeader(ctypes.LittleEndianStructure):
+    """$VSS变量存储头部 (VARIABLE_STORE_HEADER，旧式4字节签名)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('Signature',       ctypes.c_char * 4),      # 0x00 $VSS
+        ('Size',            ctypes.c_uint),          # 0x04 包括头部
+        ('Format',          ctypes.c_ubyte),         # 0x08 0x5A表示已格式化
+        ('State',           ctypes.c_ubyte),         # 0x09 0xFE表示正常
+        ('Reserved',        ctypes.c_ushort),        # 0x0A
+        ('Reserved1',       ctypes.c_uint)           # 0x0C
+        # 0x10
+    ]
+
+
+class Vss2StoreHeader(ctypes.LittleEndianStructure):
+    """以GUID为签名的变量存储头部 (VARIABLE_STORE_HEADER)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('Signature',       ctypes.c_ubyte * 16),    # 0x00 gEfiVariableGuid/gEfiAuthenticatedVariableGuid
+        ('Size',            ctypes.c_uint),          # 0x10 包括头部
+        ('Format',          ctypes.c_ubyte),         # 0x14 0x5A表示已格式化
+        ('State',           ctypes.c_ubyte),         # 0x15 0xFE表示正常
+        ('Reserved',        ctypes.c_ushort),        # 0x16
+        ('Reserved1',       ctypes.c_uint)           # 0x18
+        # 0x1C
+    ]
+
+
+class VssVariableHeader(ctypes.LittleEndianStructure):
+    """UEFI变量头部 (VARIABLE_HEADER)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('StartId',         ctypes.c_ushort),        # 0x00 0x55AA
+        ('State',           ctypes.c_ubyte),         # 0x02
+        ('Reserved',        ctypes.c_ubyte),         # 0x03
+        ('Attributes',      ctypes.c_uint),          # 0x04
+        ('NameSize',        ctypes.c_uint),          # 0x08 包括结尾的UCS-2空字符
+        ('DataSize',        ctypes.c_uint),          # 0x0C
+        ('VendorGuid',      ctypes.c_ubyte * 16)     # 0x10
+        # 0x20
+    ]
+
+
+class VssAuthVariableHeader(ctypes.LittleEndianStructure):
+    """带认证信息的UEFI变量头部 (AUTHENTICATED_VARIABLE_HEADER)"""
+    
+    _pack_ = 1
+    _fields_ = [
+        ('StartId',         ctypes.c_ushort),        # 0x00 0x55AA
+        ('State',           ctypes.c_ubyte),         # 0x02
+        ('Reserved',        ctypes.c_ubyte),         # 0x03
+        ('Attributes',      ctypes.c_uint),          # 0x04
+        ('MonotonicCount',  ctypes.c_uint64),        # 0x08
+        ('TimeStamp',       ctypes.c_ubyte * 16),    # 0x10 EFI_TIME
+        ('PubKeyIndex',     ctypes.c_uint),          # 0x20
+        ('NameSize',        ctypes.c_uint),          # 0x24 包括结尾的UCS-2空字符
+        ('DataSize',        ctypes.c_uint),          # 0x28
+        ('VendorGuid',      ctypes.c_ubyte * 16)     # 0x2C
+        # 0x3C
+    ]
+
+
+# ==== 集成 InsydeIfdExtract 类 ====
+class InsydeIfdExtract(BIOSUtility):
+    """Insyde iFlash/iFdPacker提取器"""
+    
+    TITLE = 'Insyde iFlash/iFdPacker Extractor'
+    
+    # Insyde iFdPacker已知的7-Zip SFX密码
+    INS_SFX_PWD = 'Y`t~i!L@i#t$U%h^s7A*l(f)E-d=y+S_n?i'
+    
+    # 单次扫描所有已知签名的组合模式，各分支均以字面量开头以保留正则引擎的快速前缀查找
+    INS_SIG_PAT = re.compile(b'|'.join([
+        br'(?P<iflash>' + PAT_INSYDE_IFL.pattern + br')',
+        br'(?P<sfx>' + PAT_INSYDE_SFX.pattern + br')',
+        br'(?P<sfx_pwd>' + re.escape(bytes(INS_SFX_PWD, 'utf-16le')) + br')',
+        br'(?P<fvh>' + PAT_UEFI_FVH.pattern + br')',
+        br'(?P<fid>' + PAT_INSYDE_FID.pattern + br')'
+    ]))
+    
+    # Insyde iFlash已知的镜像名称
+    INS_IFL_IMG = {
+        'BIOSCER': ['Certificate', 'bin'],
+        'BIOSCR2': ['Certificate 2nd', 'bin'],
+        'BIOSIMG': ['BIOS-UEFI', 'bin'],
+        'DRV_IMG': ['isflash', 'efi'],
+        'EC_IMG': ['Embedded Controller', 'bin'],
+        'INI_IMG': ['platform', 'ini'],
+        'IOM_IMG': ['IO Manageability', 'bin'],
+        'ISH_IMG': ['Integrated Sensor Hub', 'bin'],
+        'ME_IMG': ['Management Engine', 'bin'],
+        'OEM_ID': ['OEM Identifier', 'bin'],
+        'PDT_IMG': ['Platform Descriptor Table', 'bin'],
+        'TBT_IMG': ['Integrated Thunderbolt', 'bin']
+    }
+    
+    # 获取常见的ctypes结构体大小
+    INS_IFL_LEN = ctypes.sizeof(IflashHeader)
+    
+    # Insyde iFdPacker 7-Zip SFX混淆为逐字节循环左移1位，解混淆查找表即循环右移1位
+    INS_SFX_DEOBF = bytes((byte >> 1) | ((byte & 0x1) << 7) for byte in range(0x100))
+    
+    # 流式写出与计算哈希时每次处理的数据块大小
+    INS_IO_CHUNK = 0x400000
+    
+    # 提取组件完整性清单的文件名
+    INS_IFL_MANIFEST = 'Insyde iFlash Manifest.json'
+    
+    def __init__(self, *args, max_workers=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # 解析iFdPacker解压出的嵌套镜像时使用的最大进程数，1表示在当前进程中顺序解析
+        self.max_workers = max(1, max_workers)
+        
+        self._sig_buffer = None
+        self._sig_spans = {}
+        
+        self._ucode_buffer = None
+        self._ucode_spans = []
+    
+    def check_format(self):
+        """检查输入是否为Insyde iFlash/iFdPacker更新镜像"""
+        if bool(self._insyde_iflash_detect(input_buffer=self.input_buffer)):
+            return True
+        
+        if bool(self._insyde_signatures(input_buffer=self.input_buffer)['sfx']):
+            return True
+        
+        return False
+    
+    def parse_format(self):
+        """解析并提取Insyde iFlash/iFdPacker更新镜像"""
+        iflash_code = self._insyde_iflash_extract(input_buffer=self.input_buffer, extract_path=self.extract_path,
+                                               padding=self.padding)
+        
+        ifdpack_path = os.path.join(self.extract_path, 'Insyde iFdPacker SFX')
+        
+        ifdpack_code = self._insyde_packer_extract(input_buffer=self.input_buffer, extract_path=ifdpack_path,
+                                                padding=self.padding)
+        
+        return (iflash_code and ifdpack_code) == 0
+    
+    @property
+    def signatures(self):
+        """输入缓冲区中所有已知签名的偏移（首次访问时扫描）"""
+        return self._insyde_signatures(input_buffer=self.input_buffer)
+    
+    @property
+    def microcode_spans(self):
+        """输入缓冲区中Intel微码候选头部的偏移（首次访问时扫描）"""
+        return self._microcode_spans(input_buffer=self.input_buffer)
+    
+    def _insyde_signatures(self, input_buffer):
+        """单次扫描缓冲区中的所有已知签名，按签名名称缓存各匹配的(起始, 结束)偏移"""
+        if self._sig_buffer is input_buffer:
+            return self._sig_spans
+        
+        sig_spans = {sig_name: [] for sig_name in self.INS_SIG_PAT.groupindex}
+        
+        for sig_match in self.INS_SIG_PAT.finditer(input_buffer):
+            sig_spans[sig_match.lastgroup].append(sig_match.span())
+        
+        self._sig_buffer = input_buffer
+        self._sig_spans = sig_spans
+        
+        return sig_spans
+    
+    def _microcode_spans(self, input_buffer):
+        """扫描并缓存缓冲区中的Intel微码候选头部偏移"""
+        if self._ucode_buffer is input_buffer:
+            return self._ucode_spans
+        
+        # 微码头部没有字面量签名，并入组合模式会使整个扫描失去快速前缀查找，故仅在需要微码时按其固定前缀单独扫描
+        self._ucode_spans = [ucode_match.span() for ucode_match in PAT_INTEL_UCODE.finditer(input_buffer)]
+        self._ucode_buffer = input_buffer
+        
+        return self._ucode_spans
+    
+    def _insyde_iflash_detect(self, input_buffer):
+        """检测Insyde iFlash更新镜像"""
+        iflash_match_all = []
+        iflash_match_nan = [0x0, 0xFFFFFFFF]
+        
+        for ifl_bgn, _ in self._insyde_signatures(input_buffer=input_buffer)['iflash']:
+            
+            if len(input_buffer) - ifl_bgn <= self.INS_IFL_LEN:
+                continue
+            
+            ifl_hdr = InsydeStructs.ctypes_struct(buffer=input_buffer, start_offset=ifl_bgn, class_object=IflashHeader)
+            
+            if ifl_hdr.TotalSize in iflash_match_nan \
+                    or ifl_hdr.ImageSize in iflash_match_nan \
+                    or ifl_hdr.TotalSize < ifl_hdr.ImageSize \
+                    or ifl_bgn + self.INS_IFL_LEN + ifl_hdr.TotalSize > len(input_buffer):
+                continue
+            
+            iflash_match_all.append([ifl_bgn, ifl_hdr])
+        
+        return iflash_match_all
+    
+    def _insyde_iflash_extract(self, input_buffer, extract_path, padding=0):
+        """提取Insyde iFlash更新镜像"""
+        insyde_iflash_all = self._insyde_iflash_detect(input_buffer=input_buffer)
+        
+        if not insyde_iflash_all:
+            return 127
+        
+        InsydeSystem.printer(message='Detected Insyde iFlash Update image!', padding=padding)
+        
+        InsydePaths.make_dirs(in_path=extract_path)
+        
+        exit_codes = []
+        
+        manifest_all = []
+        
+        for insyde_iflash in insyde_iflash_all:
+            exit_code = 0
+            
+            ifl_bgn, ifl_hdr = insyde_iflash
+            
+            img_bgn = ifl_bgn + self.INS_IFL_LEN
+            img_end = img_bgn + ifl_hdr.ImageSize
+            
+            if min(img_end, len(input_buffer)) - img_bgn != ifl_hdr.ImageSize:
+                exit_code = 1
+            
+            img_val = [ifl_hdr.get_image_tag(), 'bin']
+            img_tag, img_ext = self.INS_IFL_IMG.get(img_val[0], img_val)
+            
+            img_name = f'{img_tag} [0x{img_bgn:08X}-0x{img_end:08X}]'
+            
+            InsydeSystem.printer(message=f'{img_name}\n', padding=padding + 4)
+            
+            ifl_hdr.struct_print(padding=padding + 8)
+            
+            if img_val == [img_tag, img_ext]:
+                InsydeSystem.printer(message=f'Note: Detected new Insyde iFlash tag {img_tag}!', padding=padding + 12)
+            
+            out_name = f'{img_name}.{img_ext}'
+            
+            out_path = os.path.join(extract_path, InsydePaths.safe_name(in_name=out_name))
+            
+            # 通过memoryview直接从输入缓冲区（或内存映射）写出，不产生中间副本
+            with memoryview(input_buffer) as input_view, open(out_path, 'wb') as out_image:
+                img_digest = self._insyde_iflash_write(img_view=input_view[img_bgn:img_end], out_file=out_image)
+            
+            manifest_all.append({
+                'name': InsydePaths.path_name(in_path=out_path),
+                'tag': ifl_hdr.get_image_tag(),
+                'offset': img_bgn,
+                'complete': exit_code == 0,
+                **img_digest
+            })
+            
+            InsydeSystem.printer(message=f'Successful Insyde iFlash > {img_tag} extraction!', padding=padding + 12)
+            
+            exit_codes.append(exit_code)
+        
+        with open(os.path.join(extract_path, self.INS_IFL_MANIFEST), 'w', encoding='utf-8') as manifest_file:
+            json.dump({'components': manifest_all}, manifest_file, ensure_ascii=False, indent=4)
+        
+        return sum(exit_codes)
+    
+    def _insyde_iflash_write(self, img_view, out_file):
+        """分块写出iFlash组件，同一遍中计算SHA-256与CRC32，无需再次读取"""
+        img_sha256 = hashlib.sha256()
+        img_crc32 = 0
+        
+        for chunk_bgn in range(0, len(img_view), self.INS_IO_CHUNK):
+            chunk_view = img_view[chunk_bgn:chunk_bgn + self.INS_IO_CHUNK]
+            
+            out_file.write(chunk_view)
+            
+            img_sha256.update(chunk_view)
+            img_crc32 = zlib.crc32(chunk_view, img_crc32)
+        
+        return {'size': len(img_view), 'sha256': img_sha256.hexdigest(), 'crc32': f'{img_crc32:08X}'}
+    
+    def _insyde_packer_extract(self, input_buffer, extract_path, padding=0):
+        """提取Insyde iFdPacker 7-Zip SFX 7z更新镜像"""
+        sig_spans = self._insyde_signatures(input_buffer=input_buffer)
+        
+        if not sig_spans['sfx']:
+            return 127
+        
+        sfx_match_bgn, sfx_match_end = sig_spans['sfx'][0]
+        
+        InsydeSystem.printer(message='Detected Insyde iFdPacker Update image!', padding=padding)
+        
+        InsydePaths.make_dirs(in_path=extract_path, delete=True)
+        
+        sfx_bgn = sfx_match_end - 0x5
+        
+        sfx_table = None
+        
+        if input_buffer[sfx_bgn:sfx_bgn + 0x5] == b'\x6E\xF4\x79\x5F\x4E':
+            InsydeSystem.printer(message='Detected Insyde iFdPacker > 7-Zip SFX > Obfuscation!', padding=padding + 4)
+            
+            sfx_table = self.INS_SFX_DEOBF
+        
+        # 归档以只读视图直接交给解压后端，混淆的归档在读取时按查找表解除混淆，不写出临时文件也不复制整个归档
+        sfx_stream = BufferReader(input_buffer, offset=sfx_bgn, table=sfx_table)
+        
+        if sfx_table:
+            InsydeSystem.printer(message='Removed Insyde iFdPacker > 7-Zip SFX > Obfuscation!', padding=padding + 8)
+        
+        try:
+            InsydeSystem.printer(message='Extracting Insyde iFdPacker > 7-Zip SFX archive...', padding=padding + 4)
+            
+            if any(pwd_bgn < sfx_match_bgn for pwd_bgn, _ in sig_spans['sfx_pwd']):
+                InsydeSystem.printer(message='Detected Insyde iFdPacker > 7-Zip SFX > Password!', padding=padding + 8)
+                InsydeSystem.printer(message=self.INS_SFX_PWD, padding=padding + 12)
+            
+            if not szip_backends():
+                return 126
+            
+            if not szip_decompress_stream(in_stream=sfx_stream, out_path=extract_path,
+                                          in_name='Insyde iFdPacker > 7-Zip SFX', padding=padding + 8,
+                                          password=self.INS_SFX_PWD):
+                return 125
+        finally:
+            sfx_stream.close()
+        
+        exit_codes = []
+        
+        # 排序以保证无论顺序还是并行解析，输出顺序都一致
+        sfx_files = sorted(sfx_file for sfx_file in InsydePaths.path_files(in_path=extract_path)
+                           if InsydePaths.is_file_read(in_path=sfx_file))
+        
+        if self.max_workers > 1 and len(sfx_files) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(sfx_files))) as executor:
+                sfx_results = executor.map(_insyde_ifd_worker, sfx_files, repeat(padding + 16), repeat(self.use_mmap))
+                
+                # 按提交顺序收集各工作进程的结果与输出
+                for sfx_file, (ifd_format, ifd_status, ifd_output) in zip(sfx_files, sfx_results):
+                    if ifd_format:
+                        InsydeSystem.printer(message=InsydePaths.path_name(in_path=sfx_file), padding=padding + 12)
+                        
+                        print(ifd_output, end='')
+                        
+                        exit_codes.append(0 if ifd_status else 1)
+            
+            return sum(exit_codes)
+        
+        for sfx_file in sfx_files:
+            with InsydeIfdExtract(input_object=sfx_file, extract_path=InsydePaths.extract_folder(sfx_file),
+                                  padding=padding + 16, use_mmap=self.use_mmap) as insyde_ifd_extract:
+                if insyde_ifd_extract.check_format():
+                    InsydeSystem.printer(message=InsydePaths.path_name(in_path=sfx_file), padding=padding + 12)
+                    
+                    ifd_status = insyde_ifd_extract.parse_format()
+                    
+                    exit_codes.append(0 if ifd_status else 1)
+        
+        return sum(exit_codes)
+
+
+def _insyde_ifd_worker(sfx_file, padding, use_mmap):
+    """工作进程入口：解析单个嵌套镜像，返回(是否为支持格式, 解析状态, 捕获的输出)"""
+    with io.StringIO() as worker_output:
+        with contextlib.redirect_stdout(worker_output):
+            with InsydeIfdExtract(input_object=sfx_file, extract_path=InsydePaths.extract_folder(sfx_file),
+                                  padding=padding, use_mmap=use_mmap) as insyde_ifd_extract:
+                ifd_format = insyde_ifd_extract.check_format()
+                ifd_status = insyde_ifd_extract.parse_format() if ifd_format else False
+        
+        return ifd_format, ifd_status, worker_output.getvalue()
+
+
+# UEFI固件卷解析类 - 取代基本解析中的字符串转储
+class UefiFvParse:
+    """按_FVH签名偏移定位UEFI固件卷并遍历其中的FFS文件与节，记录按需逐个产出，不复制固件数据"""
+    
+    FFS_TYPES = {
+        0x01: 'RAW',
+        0x02: 'FREEFORM',
+        0x03: 'SECURITY_CORE',
+        0x04: 'PEI_CORE',
+        0x05: 'DXE_CORE',
+        0x06: 'PEIM',
+        0x07: 'DRIVER',
+        0x08: 'COMBINED_PEIM_DRIVER',
+        0x09: 'APPLICATION',
+        0x0A: 'SMM',
+        0x0B: 'FIRMWARE_VOLUME_IMAGE',
+        0x0C: 'COMBINED_SMM_DXE',
+        0x0D: 'SMM_CORE',
+        0x0E: 'MM_STANDALONE',
+        0x0F: 'MM_CORE_STANDALONE',
+        0xF0: 'FFS_PAD'
+    }
+    
+    # 不包含节结构的文件类型
+    FFS_RAW_TYPES = (0x01, 0xF0)
+    FFS_PAD = 0xF0
+    
+    SECTION_COMPRESSION = 0x01
+    SECTION_GUID_DEFINED = 0x02
+    SECTION_USER_INTERFACE = 0x15
+    
+    # 压缩节CompressionType对应的解压方法，'none'表示未压缩
+    SECTION_COMP_TYPES = {0x00: 'none', 0x01: 'efi'}
+    
+    # GUID定义节的SectionDefinitionGuid对应的解压方法，'none'表示数据未经处理（仅校验）
+    SECTION_GUIDS = {
+        'EE4E5898-3914-4259-9D6E-DC7BD79403CF': 'lzma',
+        'D42AE6BD-1352-4BFB-909A-CA72A6EAE889': 'lzmaf86',
+        'A31280AD-481E-41B6-95E8-127F4C984779': 'tiano',
+        '3D532050-5CDA-4FD0-879E-0F7F630D5AFB': 'brotli',
+        'FC1BCDB0-7D31-49AA-936A-A4600D9DD083': 'none'  # CRC32
+    }
+    
+    # 固件卷文件系统GUID
+    FV_FFS_GUIDS = ('8C8CE578-8A3D-4F1C-9935-896185C32DD3', '5473C07A-3DCB-4DCA-BD6F-1E9689E7349A')
+    FV_NVRAM_GUIDS = ('FFF12B8D-7696-4C8B-A985-2747075B4F50',)
+    
+    # _FVH签名在固件卷头部中的偏移
+    FV_SIG_OFF = FvHeader.Signature.offset
+    FV_HDR_LEN = ctypes.sizeof(FvHeader)
+    FFS_HDR_LEN = FfsFileHeader.ExtendedSize.offset
+    
+    def __init__(self, input_buffer, fvh_spans=None):
+        self.input_buffer = input_buffer
+        
+        # 未提供签名扫描结果时自行扫描一次
+        if fvh_spans is None:
+            fvh_spans = [fvh_match.span() for fvh_match in PAT_UEFI_FVH.finditer(input_buffer)]
+        
+        self.fvh_spans = fvh_spans
+    
+    def volumes(self):
+        """依次产出每个有效的固件卷"""
+        for fvh_bgn, _ in self.fvh_spans:
+            fv_bgn = fvh_bgn - self.FV_SIG_OFF
+            
+            if fv_bgn < 0 or len(self.input_buffer) - fv_bgn < self.FV_HDR_LEN:
+                continue
+            
+            fv_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=fv_bgn, class_object=FvHeader)
+            
+            fs_guid = guid_to_str(fv_hdr.FileSystemGuid)
+            
+            if not self._fv_valid(fv_bgn=fv_bgn, fv_hdr=fv_hdr, fs_guid=fs_guid):
+                continue
+            
+            name_guid = None
+            files_bgn = fv_bgn + fv_hdr.HeaderLength
+            
+            if fv_hdr.ExtHeaderOffset and fv_hdr.ExtHeaderOffset + ctypes.sizeof(FvExtHeader) <= fv_hdr.FvLength:
+                ext_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer,
+                                                      start_offset=fv_bgn + fv_hdr.ExtHeaderOffset,
+                                                      class_object=FvExtHeader)
+                
+                name_guid = guid_to_str(ext_hdr.FvName)
+                files_bgn = max(files_bgn, fv_bgn + fv_hdr.ExtHeaderOffset + ext_hdr.ExtHeaderSize)
+            
+            yield {
+                'offset': fv_bgn,
+                'size': fv_hdr.FvLength,
+                'fs_guid': fs_guid,
+                'name_guid': name_guid,
+                'attributes': fv_hdr.Attributes,
+                'erase_byte': fv_hdr.get_erase_byte(),
+                'files_bgn': files_bgn,
+                'nv_storage': fs_guid in self.FV_NVRAM_GUIDS,
+                'free_space': 0
+            }
+    
+    def files(self, fv_info):
+        """依次产出固件卷中的有效FFS文件，遍历结束后固件卷记录中的free_space为空闲空间大小"""
+        fv_bgn = fv_info['offset']
+        fv_end = fv_bgn + fv_info['size']
+        
+        if fv_info['nv_storage']:
+            return
+        
+        empty_hdr = bytes([fv_info['erase_byte']]) * self.FFS_HDR_LEN
+        
+        file_bgn = fv_info['files_bgn']
+        
+        while True:
+            # FFS文件相对固件卷起始8字节对齐
+            file_bgn = fv_bgn + ((file_bgn - fv_bgn + 0x7) & ~0x7)
+            
+            if file_bgn + self.FFS_HDR_LEN > fv_end:
+                break
+            
+            # 遇到空白头部即到达固件卷的空闲空间
+            if self.input_buffer[file_bgn:file_bgn + self.FFS_HDR_LEN] == empty_hdr:
+                fv_info['free_space'] += fv_end - file_bgn
+                break
+            
+            ffs_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=file_bgn,
+                                                  class_object=FfsFileHeader)
+            
+            file_size, file_hdr_len = ffs_hdr.get_size()
+            
+            if file_size < file_hdr_len or file_bgn + file_size > fv_end:
+                break
+            
+            # 擦除值为0xFF时状态位以清零表示置位
+            file_state = ffs_hdr.State ^ fv_info['erase_byte']
+            
+            if ffs_hdr.Type == self.FFS_PAD:
+                fv_info['free_space'] += file_size - file_hdr_len
+            elif not file_state & 0x30:  # EFI_FILE_DELETED | EFI_FILE_HEADER_INVALID
+                yield self._file_info(file_bgn=file_bgn, file_size=file_size, file_hdr_len=file_hdr_len,
+                                      ffs_hdr=ffs_hdr)
+            
+            file_bgn += file_size
+    
+    def sections(self, data_bgn, data_end):
+        """依次产出指定范围内的FFS节"""
+        sec_bgn = data_bgn
+        
+        while True:
+            # FFS节相对文件数据起始4字节对齐
+            sec_bgn = data_bgn + ((sec_bgn - data_bgn + 0x3) & ~0x3)
+            
+            if sec_bgn + 0x4 > data_end:
+                break
+            
+            sec_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=sec_bgn,
+                                                  class_object=FfsSectionHeader)
+            
+            sec_size, sec_hdr_len = sec_hdr.get_size()
+            
+            if sec_size < sec_hdr_len or sec_bgn + sec_size > data_end:
+                break
+            
+            yield {
+                'offset': sec_bgn,
+                'size': sec_size,
+                'header_size': sec_hdr_len,
+                'type': sec_hdr.Type
+            }
+            
+            sec_bgn += sec_size
+    
+    def section_payload(self, sec_info):
+        """获取压缩节或GUID定义节的(解压方法, 数据起始, 数据结束)，方法未知或非封装节时返回None"""
+        sec_bgn = sec_info['offset']
+        sec_end = sec_bgn + sec_info['size']
+        sec_hdr_end = sec_bgn + sec_info['header_size']
+        
+        if sec_info['type'] == self.SECTION_COMPRESSION and sec_hdr_end + 0x5 <= sec_end:
+            _, comp_type = struct.unpack_from('<IB', self.input_buffer, sec_hdr_end)  # UncompressedLength, CompressionType
+            
+            comp_method = self.SECTION_COMP_TYPES.get(comp_type)
+            
+            return (comp_method, sec_hdr_end + 0x5, sec_end) if comp_method else None
+        
+        if sec_info['type'] == self.SECTION_GUID_DEFINED and sec_hdr_end + 0x14 <= sec_end:
+            sec_guid = guid_to_str(self.input_buffer[sec_hdr_end:sec_hdr_end + 0x10])
+            data_offset, _ = struct.unpack_from('<HH', self.input_buffer, sec_hdr_end + 0x10)  # DataOffset, Attributes
+            
+            comp_method = self.SECTION_GUIDS.get(sec_guid)
+            
+            if comp_method is None or not sec_info['header_size'] + 0x14 <= data_offset <= sec_info['size']:
+                return None
+            
+            return comp_method, sec_bgn + data_offset, sec_end
+        
+        return None
+    
+    def _fv_valid(self, fv_bgn, fv_hdr, fs_guid):
+        """校验固件卷头部：长度合理，且头部校验和为0或文件系统GUID为已知值"""
+        if fv_hdr.HeaderLength < self.FV_HDR_LEN or fv_hdr.HeaderLength > fv_hdr.FvLength:
+            return False
+        
+        if fv_bgn + fv_hdr.FvLength > len(self.input_buffer):
+            return False
+        
+        hdr_words = struct.unpack_from(f'<{fv_hdr.HeaderLength // 2}H', self.input_buffer, fv_bgn)
+        
+        return sum(hdr_words) & 0xFFFF == 0 or fs_guid in self.FV_FFS_GUIDS + self.FV_NVRAM_GUIDS
+    
+    def _file_info(self, file_bgn, file_size, file_hdr_len, ffs_hdr):
+        """生成FFS文件记录，名称取自用户界面节"""
+        file_name = None
+        compressed = False
+        
+        if ffs_hdr.Type not in self.FFS_RAW_TYPES:
+            for sec_info in self.sections(data_bgn=file_bgn + file_hdr_len, data_end=file_bgn + file_size):
+                if sec_info['type'] == self.SECTION_USER_INTERFACE and file_name is None:
+                    name_bgn = sec_info['offset'] + sec_info['header_size']
+                    name_end = sec_info['offset'] + sec_info['size']
+                    file_name = self.input_buffer[name_bgn:name_end].decode('utf-16le', 'ignore').split('\x00')[0]
+                elif sec_info['type'] in (self.SECTION_COMPRESSION, self.SECTION_GUID_DEFINED):
+                    compressed = True
+        
+        return {
+            'offset': file_bgn,
+            'size': file_size,
+            'header_size': file_hdr_len,
+            'type': ffs_hdr.Type,
+            'type_name': self.FFS_TYPES.get(ffs_hdr.Type, f'0x{ffs_hdr.Type:02X}'),
+            'guid': guid_to_str(ffs_hdr.Name),
+            'name': file_name,
+            'compressed': compressed
+        }
+
+
+# Intel微码扫描类 - 定位并校验固件中的微码更新
+class MicrocodeScan:
+    """按PAT_INTEL_UCODE候选偏移定位Intel微码更新，校验头部布局后以32位整数数组批量计算校验和"""
+    
+    HDR_LEN = ctypes.sizeof(MicrocodeHeader)
+    
+    # 扩展签名表：头部(ExtendedSignatureCount, ExtendedChecksum, Reserved[12])后为12字节的(签名, 平台ID, 校验和)项
+    EXT_HDR_LEN = 0x14
+    EXT_SIG_LEN = 0xC
+    
+    # 本机字节序为小端且unsigned int为4字节时直接按32位整数解释缓冲区，否则用struct按小端解包
+    NATIVE_DWORDS = sys.byteorder == 'little' and struct.calcsize('I') == 4
+    
+    def __init__(self, input_buffer, ucode_spans=None):
+        self.input_buffer = input_buffer
+        
+        # 未提供签名扫描结果时自行扫描一次
+        if ucode_spans is None:
+            ucode_spans = [ucode_match.span() for ucode_match in PAT_INTEL_UCODE.finditer(input_buffer)]
+        
+        self.ucode_spans = ucode_spans
+    
+    def updates(self):
+        """返回布局有效的微码更新列表，valid表示校验和（及扩展签名表的校验和）正确"""
+        candidates = []
+        
+        for ucode_bgn, _ in self.ucode_spans:
+            if len(self.input_buffer) - ucode_bgn < self.HDR_LEN:
+                continue
+            
+            ucode_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=ucode_bgn,
+                                                    class_object=MicrocodeHeader)
+            
+            data_size, total_size = ucode_hdr.get_sizes()
+            
+            # 总大小为1 KB的整数倍，数据按DWORD对齐且位于总大小之内
+            if not total_size or total_size % 0x400 or data_size % 4 or self.HDR_LEN + data_size > total_size:
+                continue
+            
+            if ucode_bgn + total_size > len(self.input_buffer):
+                continue
+            
+            candidates.append((ucode_bgn, ucode_hdr, data_size, total_size))
+        
+        # 所有候选的整体校验和一次批量计算
+        checksums = self.dword_sums(self.input_buffer, [(ucode_bgn, total_size)
+                                                        for ucode_bgn, _, _, total_size in candidates])
+        
+        updates = []
+        ucode_end = 0
+        
+        for (ucode_bgn, ucode_hdr, data_size, total_size), checksum in zip(candidates, checksums):
+            # 跳过落在前一个有效微码内部的误匹配
+            if ucode_bgn < ucode_end:
+                continue
+            
+            extended, ext_valid = self._extended_signatures(ucode_bgn + self.HDR_LEN + data_size,
+                                                            total_size - self.HDR_LEN - data_size)
+            
+            valid = checksum == 0 and ext_valid
+            
+            if valid:
+                ucode_end = ucode_bgn + total_size
+            
+            updates.append({
+                'offset': ucode_bgn,
+                'cpuid': ucode_hdr.ProcessorSignature,
+                'revision': ucode_hdr.UpdateRevision,
+                'date': ucode_hdr.get_date(),
+                'raw_date': ucode_hdr.Date,
+                'platform_ids': ucode_hdr.ProcessorFlags,
+                'checksum': ucode_hdr.Checksum,
+                'header_version': ucode_hdr.HeaderVersion,
+                'loader_revision': ucode_hdr.LoaderRevision,
+                'data_size': data_size,
+                'total_size': total_size,
+                'extended': extended,
+                'valid': valid
+            })
+        
+        return updates
+    
+    def _extended_signatures(self, ext_bgn, ext_len):
+        """解析扩展签名表，返回([(签名, 平台ID)], 校验和是否正确)，没有扩展签名表时校验视为正确"""
+        if ext_len < self.EXT_HDR_LEN:
+            return [], True
+        
+        ext_count, _ = struct.unpack_from('<2I', self.input_buffer, ext_bgn)
+        ext_total = self.EXT_HDR_LEN + ext_count * self.EXT_SIG_LEN
+        
+        if not ext_count or ext_total > ext_len:
+            return [], True
+        
+        extended = [struct.unpack_from('<2I', self.input_buffer, ext_bgn + self.EXT_HDR_LEN + ext_index * self.EXT_SIG_LEN)
+                    for ext_index in range(ext_count)]
+        
+        return extended, self.dword_sums(self.input_buffer, [(ext_bgn, ext_total)])[0] == 0
+    
+    @classmethod
+    def dword_sums(cls, input_buffer, ranges):
+        """批量计算各(偏移, 长度)范围内小端32位整数之和（模2^32），在同一个内存视图上按整数数组求和，不逐个解包"""
+        sums = []
+        
+        with memoryview(input_buffer) as buffer_view:
+            for range_bgn, range_len in ranges:
+                if not cls.NATIVE_DWORDS:
+                    sums.append(sum(struct.unpack_from(f'<{range_len // 4}I', buffer_view, range_bgn)) & 0xFFFFFFFF)
+                    continue
+                
+                with buffer_view[range_bgn:range_bgn + range_len - range_len % 4] as range_view, \
+                        range_view.cast('I') as dwords:
+                    sums.append(sum(dwords) & 0xFFFFFFFF)
+        
+        return sums
+
+
+# UEFI变量记录类
+class NvramVariable:
+    """变量存储中的单个变量，可按(GUID, 名称, 属性, 数据)解包；数据在访问时才从缓冲区复制"""
+    
+    __slots__ = ('guid', 'name', 'attributes', 'state', 'offset', 'data_offset', 'data_size', '_buffer')
+    
+    # 变量属性位 -> 简称
+    ATTRIBUTE_NAMES = ((0x01, 'NV'), (0x02, 'BS'), (0x04, 'RT'), (0x08, 'HR'), (0x10, 'AW'), (0x20, 'TA'),
+                       (0x40, 'AP'))
+    
+    # 有效变量的状态：VAR_ADDED，或VAR_ADDED与VAR_IN_DELETED_TRANSITION相与（正在被新副本取代）
+    STATE_ADDED = 0x3F
+    STATE_IN_TRANSITION = 0x3E
+    
+    def __init__(self, buffer, guid, name, attributes, state, offset, data_offset, data_size):
+        self._buffer = buffer
+        self.guid = guid
+        self.name = name
+        self.attributes = attributes
+        self.state = state
+        self.offset = offset
+        self.data_offset = data_offset
+        self.data_size = data_size
+    
+    def __iter__(self):
+        return iter((self.guid, self.name, self.attributes, self.data))
+    
+    def __repr__(self):
+        return f'NvramVariable({self.guid}, {self.name!r}, 0x{self.attributes:X}, {self.data_size} bytes)'
+    
+    @property
+    def data(self):
+        return bytes(self._buffer[self.data_offset:self.data_offset + self.data_size])
+    
+    @property
+    def active(self):
+        return self.state in (self.STATE_ADDED, self.STATE_IN_TRANSITION)
+    
+    def attribute_text(self):
+        """以NV+BS+RT形式显示属性"""
+        return '+'.join(attr_name for attr_bit, attr_name in self.ATTRIBUTE_NAMES if self.attributes & attr_bit) or '-'
+
+
+# UEFI变量存储解析类 - 离线读取固件转储中的NVRAM变量
+class NvramParse:
+    """在NvStorage固件卷中定位UEFI变量存储（$VSS或以GUID为签名），按需逐个产出变量，按名称和GUID建立索引"""
+    
+    STORE_FORMATTED = 0x5A
+    VAR_START_ID = 0x55AA
+    
+    # 认证变量存储中所有变量都使用带认证信息的头部
+    VSS2_GUIDS = {
+        'DDCF3616-3275-4164-98B6-FE85707FFE7D': False,  # gEfiVariableGuid
+        'DDCF3617-3275-4164-98B6-FE85707FFE7D': False,  # VSS2存储GUID
+        'AAF32C78-947B-439A-A180-2E144EC37792': True    # gEfiAuthenticatedVariableGuid
+    }
+    
+    PAT_STORE = re.compile(b'|'.join([re.escape(b'$VSS')] + [re.escape(uuid.UUID(store_guid).bytes_le)
+                                                              for store_guid in VSS2_GUIDS]))
+    
+    # 旧式$VSS存储中带这些属性的变量使用带认证信息的头部
+    AUTH_ATTRIBUTES = 0x10 | 0x20 | 0x40
+    
+    VAR_HDR_LEN = ctypes.sizeof(VssVariableHeader)
+    AUTH_VAR_HDR_LEN = ctypes.sizeof(VssAuthVariableHeader)
+    
+    def __init__(self, input_buffer, fvh_spans=None):
+        self.input_buffer = input_buffer
+        self.fv_parse = UefiFvParse(input_buffer, fvh_spans=fvh_spans)
+        
+        # 名称/GUID -> [变量]，首次查询时建立
+        self._by_name = None
+        self._by_guid = None
+    
+    def stores(self):
+        """依次产出NvStorage固件卷中格式有效的变量存储"""
+        for fv_info in self.fv_parse.volumes():
+            if not fv_info['nv_storage']:
+                continue
+            
+            fv_end = fv_info['offset'] + fv_info['size']
+            store_end = 0
+            
+            for store_match in self.PAT_STORE.finditer(self.input_buffer, fv_info['files_bgn'], fv_end):
+                store_bgn = store_match.start()
+                
+                # 跳过落在前一个存储内部的签名（例如变量数据中的GUID）
+                if store_bgn < store_end:
+                    continue
+                
+                store_info = self._store_info(store_bgn, fv_end)
+                
+                if store_info is not None:
+                    store_end = store_bgn + store_info['size']
+                    yield store_info
+    
+    def variables(self, include_deleted=False):
+        """依次产出各变量存储中的变量，默认跳过已删除的变量"""
+        for store_info in self.stores():
+            for variable in self._store_variables(store_info):
+                if include_deleted or variable.active:
+                    yield variable
+    
+    def find(self, name=None, guid=None):
+        """按名称和/或GUID查找有效变量，同名同GUID的变量正在被取代时只返回新副本"""
+        if self._by_name is None:
+            self._build_index()
+        
+        if name is not None:
+            matches = self._by_name.get(name, [])
+            
+            return [variable for variable in matches if guid is None or variable.guid == guid.upper()]
+        
+        if guid is not None:
+            return list(self._by_guid.get(guid.upper(), []))
+        
+        return [variable for variables in self._by_name.values() for variable in variables]
+    
+    def _build_index(self):
+        latest = {}
+        
+        for variable in self.variables():
+            variable_key = (variable.guid, variable.name)
+            previous = latest.get(variable_key)
+            
+            # VAR_ADDED的副本优先于仍处于删除过程中的旧副本，同状态时取后写入的
+            if previous is None or variable.state == NvramVariable.STATE_ADDED or \
+                    previous.state == NvramVariable.STATE_IN_TRANSITION:
+                latest[variable_key] = variable
+        
+        self._by_name = {}
+        self._by_guid = {}
+        
+        for variable in latest.values():
+            self._by_name.setdefault(variable.name, []).append(variable)
+            self._by_guid.setdefault(variable.guid, []).append(variable)
+    
+    def _store_info(self, store_bgn, fv_end):
+        """校验存储头部，返回存储记录，无效时返回None"""
+        if self.input_buffer[store_bgn:store_bgn + 4] == b'$VSS':
+            hdr_class, auth = VssStoreHeader, False
+        else:
+            hdr_class = Vss2StoreHeader
+            auth = self.VSS2_GUIDS[guid_to_str(self.input_buffer[store_bgn:store_bgn + 16])]
+        
+        hdr_len = ctypes.sizeof(hdr_class)
+        
+        if store_bgn + hdr_len > fv_end:
+            return None
+        
+        store_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=store_bgn, class_object=hdr_class)
+        
+        if store_hdr.Format != self.STORE_FORMATTED or not hdr_len < store_hdr.Size <= fv_end - store_bgn:
+            return None
+        
+        return {
+            'offset': store_bgn,
+            'size': store_hdr.Size,
+            'format': 'vss' if hdr_class is VssStoreHeader else 'vss2',
+            'auth': auth,
+            'state': store_hdr.State,
+            'vars_bgn': store_bgn + hdr_len
+        }
+    
+    def _store_variables(self, store_info):
+        """遍历单个存储中的变量，遇到空白区或损坏的头部时结束"""
+        store_end = store_info['offset'] + store_info['size']
+        var_bgn = store_info['vars_bgn']
+        
+        while var_bgn + self.VAR_HDR_LEN <= store_end:
+            var_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=var_bgn,
+                                                  class_object=VssVariableHeader)
+            
+            if var_hdr.StartId != self.VAR_START_ID:
+                break
+            
+            # 旧式存储按属性判断头部格式；名称和数据长度均为0说明该位置实为单调计数器
+            auth = store_info['auth'] or var_hdr.Attributes & self.AUTH_ATTRIBUTES or \
+                (var_hdr.NameSize == 0 and var_hdr.DataSize == 0)
+            
+            if auth:
+                if var_bgn + self.AUTH_VAR_HDR_LEN > store_end:
+                    break
+                
+                var_hdr = InsydeStructs.ctypes_struct(buffer=self.input_buffer, start_offset=var_bgn,
+                                                      class_object=VssAuthVariableHeader)
+            
+            name_bgn = var_bgn + (self.AUTH_VAR_HDR_LEN if auth else self.VAR_HDR_LEN)
+            data_bgn = name_bgn + var_hdr.NameSize
+            var_end = data_bgn + var_hdr.DataSize
+            
+            if var_hdr.NameSize % 2 or var_end > store_end:
+                break
+            
+            var_name = bytes(self.input_buffer[name_bgn:data_bgn]).decode('utf-16-le', 'replace').split('\x00', 1)[0]
+            
+            yield NvramVariable(self.input_buffer, guid_to_str(var_hdr.VendorGuid), var_name, var_hdr.Attributes,
+                                var_hdr.State, var_bgn, data_bgn, var_hdr.DataSize)
+            
+            # 变量头部按4字节对齐
+            var_bgn = (var_end + 0x3) & ~0x3
+
+
+# FFS节解压类 - 解压固件卷中的压缩节与GUID定义节
+class UefiSectionExtract:
+    """收集镜像中的压缩节与GUID定义节，按节内容哈希去重后并行解压，解压结果中的嵌套封装节逐轮继续处理"""
+    
+    # 最大嵌套展开轮数，防止异常数据导致无限展开
+    MAX_DEPTH = 8
+    
+    OUT_DIR = 'Sections'
+    
+    def __init__(self, extract_path, section_cache=None, max_workers=1, guid_index=None):
+        self.extract_path = extract_path
+        self.section_cache = section_cache
+        
+        # 文件没有用户界面节时，用GUID索引中的模块名称命名输出
+        self.guid_index = guid_index
+        
+        # 解压时使用的最大进程数，1表示在当前进程中顺序解压
+        self.max_workers = max(1, max_workers)
+    
+    def extract(self, fv_parse):
+        """解压所有可处理的封装节并写入提取目录的Sections子目录，返回每个节的结果记录"""
+        section_results = []
+        
+        pending = self._collect(fv_parse=fv_parse)
+        
+        for depth in range(self.MAX_DEPTH):
+            if not pending:
+                break
+            
+            section_data = self._decompress(pending)
+            
+            nested = []
+            
+            for section in pending:
+                out_data, out_cached = section_data[section['key']]
+                
+                section_result = {
+                    'label': section['label'],
+                    'method': section['method'],
+                    'offset': section['offset'],
+                    'depth': depth,
+                    'size': section['size'],
+                    'out_size': None,
+                    'cached': out_cached,
+                    'path': None
+                }
+                
+                if out_data is not None:
+                    out_path = os.path.join(self.extract_path, self.OUT_DIR,
+                                            f"{len(section_results):03d}_{section['label']}_{section['method']}.sec")
+                    
+                    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+                    
+                    with open(out_path, 'wb') as out_file:
+                        out_file.write(out_data)
+                    
+                    section_result['out_size'] = len(out_data)
+                    section_result['path'] = out_path
+                    
+                    # 解压结果可能是嵌套的固件卷，也可能直接是节序列
+                    nested.extend(self._collect(fv_parse=UefiFvParse(out_data), label=section['label']))
+                
+                section_results.append(section_result)
+            
+            pending = nested
+        
+        if self.section_cache is not None:
+            self.section_cache.evict()
+        
+        return section_results
+    
+    def _collect(self, fv_parse, label=None):
+        """收集缓冲区中的待解压节；label不为None时缓冲区为解压结果，其顶层节序列也一并遍历"""
+        sections = []
+        seen = set()
+        
+        for fv_info in fv_parse.volumes():
+            for ffs_file in fv_parse.files(fv_info):
+                file_label = ffs_file['name']
+                
+                if file_label is None and self.guid_index is not None:
+                    file_label = self.guid_index.name(ffs_file['guid'])
+                
+                self._walk_sections(fv_parse=fv_parse, data_bgn=ffs_file['offset'] + ffs_file['header_size'],
+                                    data_end=ffs_file['offset'] + ffs_file['size'],
+                                    label=file_label or ffs_file['guid'], seen=seen, sections=sections)
+        
+        if label is not None:
+            self._walk_sections(fv_parse=fv_parse, data_bgn=0, data_end=len(fv_parse.input_buffer), label=label,
+                                seen=seen, sections=sections)
+        
+        return sections
+    
+    def _walk_sections(self, fv_parse, data_bgn, data_end, label, seen, sections):
+        """遍历节序列，未压缩的封装节直接展开其内容，需要解压的节加入待处理列表"""
+        for sec_info in fv_parse.sections(data_bgn=data_bgn, data_end=data_end):
+            if sec_info['offset'] in seen:
+                continue
+            
+            seen.add(sec_info['offset'])
+            
+            sec_payload = fv_parse.section_payload(sec_info)
+            
+            if sec_payload is None:
+                continue
+            
+            comp_method, comp_bgn, comp_end = sec_payload
+            
+            if comp_method == 'none':
+                self._walk_sections(fv_parse=fv_parse, data_bgn=comp_bgn, data_end=comp_end, label=label, seen=seen,
+                                    sections=sections)
+                continue
+            
+            sec_data = fv_parse.input_buffer[sec_info['offset']:comp_end]
+            
+            sections.append({
+                'key': SectionCache.section_key(sec_data),
+                'label': InsydePaths.safe_name(in_name=label),
+                'method': comp_method,
+                'offset': sec_info['offset'],
+                'size': sec_info['size'],
+                'data': sec_data[comp_bgn - sec_info['offset']:]
+            })
+    
+    def _decompress(self, sections):
+        """按节内容哈希去重后解压，优先使用缓存，返回 哈希 -> (解压数据或None, 是否命中缓存)"""
+        section_data = {}
+        jobs = {}
+        
+        for section in sections:
+            if section['key'] in section_data or section['key'] in jobs:
+                continue
+            
+            cached_data = self.section_cache.lookup(section['key']) if self.section_cache is not None else None
+            
+            if cached_data is not None:
+                section_data[section['key']] = (cached_data, True)
+            else:
+                jobs[section['key']] = section
+        
+        job_keys = list(jobs)
+        job_methods = [jobs[job_key]['method'] for job_key in job_keys]
+        job_inputs = [jobs[job_key]['data'] for job_key in job_keys]
+        
+        if self.max_workers > 1 and len(job_keys) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(job_keys))) as executor:
+                job_outputs = list(executor.map(_uefi_section_worker, job_methods, job_inputs))
+        else:
+            job_outputs = list(map(_uefi_section_worker, job_methods, job_inputs))
+        
+        for job_key, out_data in zip(job_keys, job_outputs):
+            if out_data is not None and self.section_cache is not None:
+                self.section_cache.store(job_key, out_data)
+            
+            section_data[job_key] = (out_data, False)
+        
+        return section_data
+
+
+def _uefi_section_worker(comp_method, comp_data):
+    """工作进程入口：解压单个FFS节的数据，失败时返回None"""
+    try:
+        return SECTION_DECOMPRESSORS[comp_method](comp_data)
+    except Exception:
+        return None
+
+
+# FFS节解压结果缓存类 - 相邻版本固件中未变化的节无需重复解压
+class SectionCache:
+    """以压缩节原始内容的SHA-256为键保存解压结果，内容寻址因此无需失效校验，按修改时间做LRU淘汰"""
+    
+    CACHE_NAME = '.section_cache'
+    
+    def __init__(self, cache_dir=None, size_limit=SECTION_CACHE_LIMIT):
+        self.cache_dir = cache_dir or os.path.join(EXTRACT_DIR, self.CACHE_NAME)
+        self.size_limit = size_limit
+    
+    @staticmethod
+    def section_key(section_data):
+        """计算压缩节（含节头部）内容的SHA-256作为缓存键"""
+        return hashlib.sha256(section_data).hexdigest()
+    
+    def lookup(self, section_key):
+        """读取缓存的解压结果，未命中时返回None"""
+        cache_path = self._cache_path(section_key)
+        
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                cache_data = cache_file.read()
+            
+            # 更新修改时间作为最近使用时间
+            os.utime(cache_path)
+        except OSError:
+            return None
+        
+        return cache_data
+    
+    def store(self, section_key, section_data):
+        """保存解压结果，先写入临时文件再替换"""
+        cache_path = self._cache_path(section_key)
+        
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        
+        with open(tmp_path, 'wb') as cache_file:
+            cache_file.write(section_data)
+        
+        os.replace(tmp_path, cache_path)
+    
+    def evict(self):
+        """按最近使用时间从旧到新删除缓存文件，直到总大小不超过限制"""
+        cache_files = []
+        
+        for root, _, file_names in os.walk(self.cache_dir):
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:
+                    continue
+                
+                cache_files.append((file_stat.st_mtime, file_stat.st_size, file_path))
+        
+        total_size = sum(file_size for _, file_size, _ in cache_files)
+        
+        for _, file_size, file_path in sorted(cache_files):
+            if total_size <= self.size_limit:
+                break
+            
+            InsydePaths.delete_file(in_path=file_path)
+            total_size -= file_size
+    
+    def _cache_path(self, section_key):
+        return os.path.join(self.cache_dir, section_key[:2], section_key + '.sec')
+
+
+# 模块GUID记录类
+class GuidRecord:
+    """单个模块GUID在H2OEZE层CSV中的记录"""
+    
+    __slots__ = ('name', 'package', 'layer', 'path', 'description')
+    
+    def __init__(self, name, package, layer, path, description):
+        self.name = name
+        self.package = package
+        self.layer = layer
+        self.path = path
+        self.description = description
+    
+    def __getstate__(self):
+        return tuple(getattr(self, slot_name) for slot_name in self.__slots__)
+    
+    def __setstate__(self, state):
+        for slot_name, slot_value in zip(self.__slots__, state):
+            setattr(self, slot_name, slot_value)
+
+
+# 模块GUID名称解析类 - 基于runtime目录中H2OEZE导出的层CSV
+class GuidIndex:
+    """以16字节二进制GUID为键的模块名称索引，首次查询时才加载，并缓存为pickle以免每次运行重新解析CSV"""
+    
+    LAYER_FILES = ('KernelLayer.csv', 'ChipsetLayer.csv', 'PlatformOEMLayer.csv')
+    
+    CACHE_NAME = '.guid_index.pickle'
+    
+    # 缓存格式变化时递增，旧缓存将被忽略
+    CACHE_VERSION = 1
+    
+    def __init__(self, runtime_dir=None, cache_path=None):
+        self.runtime_dir = runtime_dir
+        self.cache_path = cache_path or os.path.join(EXTRACT_DIR, self.CACHE_NAME)
+        
+        self._records = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def guid_key(guid):
+        """将GUID字符串或EFI_GUID原始字节转换为索引键（EFI_GUID字节序的16字节）"""
+        if isinstance(guid, str):
+            return uuid.UUID(guid).bytes_le
+        
+        return bytes(guid)
+    
+    @property
+    def records(self):
+        """GUID -> GuidRecord的字典，首次访问时加载"""
+        if self._records is None:
+            with self._lock:
+                if self._records is None:
+                    self._records = self._load()
+        
+        return self._records
+    
+    def lookup(self, guid):
+        """查找GUID对应的记录，未知或格式无效时返回None"""
+        try:
+            return self.records.get(self.guid_key(guid))
+        except ValueError:
+            return None
+    
+    def name(self, guid, default=None):
+        """获取GUID对应的模块名称"""
+        guid_record = self.lookup(guid)
+        
+        return guid_record.name if guid_record is not None else default
+    
+    def annotate(self, guids):
+        """批量查找，按输入顺序返回记录列表（未知GUID为None）"""
+        return [self.lookup(guid) for guid in guids]
+    
+    def _layer_paths(self):
+        runtime_dir = self.runtime_dir or get_resource_path('runtime')
+        
+        return [os.path.join(runtime_dir, layer_file) for layer_file in self.LAYER_FILES]
+    
+    def _sources(self, layer_paths):
+        """源CSV的(文件名, 大小, 修改时间)，用于判断pickle缓存是否仍然有效"""
+        sources = []
+        
+        for layer_path in layer_paths:
+            try:
+                layer_stat = os.stat(layer_path)
+            except OSError:
+                continue
+            
+            sources.append((os.path.basename(layer_path), layer_stat.st_size, layer_stat.st_mtime_ns))
+        
+        return sources
+    
+    def _load(self):
+        layer_paths = self._layer_paths()
+        sources = self._sources(layer_paths)
+        
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                cache_version, cache_sources, cache_records = pickle.load(cache_file)
+            
+            if cache_version == self.CACHE_VERSION and cache_sources == sources:
+                return cache_records
+        except Exception:
+            pass
+        
+        records = {}
+        
+        for layer_path in layer_paths:
+            try:
+                records.update(self._parse_layer(layer_path))
+            except OSError as e:
+                logging.debug(f"无法读取GUID层文件 {layer_path}: {str(e)}")
+        
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            
+            tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+            
+            with open(tmp_path, 'wb') as cache_file:
+                pickle.dump((self.CACHE_VERSION, sources, records), cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.debug(f"无法写入GUID索引缓存: {str(e)}")
+        
+        return records
+    
+    @staticmethod
+    def _parse_layer(layer_path):
+        """解析单个层CSV：前两行为芯片组名称与表头，仅有第一列的行为包名，其余行为模块记录"""
+        records = {}
+        package = ''
+        
+        with open(layer_path, 'r', encoding='utf-8', errors='replace', newline='') as layer_file:
+            for row in islice(csv.reader(layer_file), 2, None):
+                if len(row) < 3:
+                    continue
+                
+                layer, module_path, module_guid = (field.strip() for field in row[:3])
+                
+                if not module_path and not module_guid:
+                    package = layer
+                    continue
+                
+                try:
+                    guid_key = GuidIndex.guid_key(module_guid)
+                except ValueError:
+                    continue
+                
+                records[guid_key] = GuidRecord(name=module_path.rsplit('\\', 1)[-1], package=package, layer=layer,
+                                               path=module_path, description=','.join(row[3:]).strip())
+        
+        return records
+
+# 提取结果缓存类 - 按固件内容哈希复用已有的提取目录
+class ExtractCache:
+    """按固件文件内容哈希索引提取结果，带完整性校验和按大小的LRU淘汰"""
+    
+    INDEX_NAME = '.extract_cache.json'
+    
+    HASH_CHUNK = 0x100000
+    
+    # 提取结果格式版本，解析器或提取目录结构变化时递增，版本不同的条目视为未命中
+    FORMAT_VERSION = 1
+    
+    # Windows上LK_LOCK每次最多等待约10秒，超过重试次数仍未取得锁时放弃
+    LOCK_RETRIES = 6
+    LOCK_RETRY_DELAY = 1.0
+    
+    def __init__(self, cache_dir=EXTRACT_DIR, size_limit=EXTRACT_CACHE_LIMIT):
+        self.cache_dir = cache_dir
+        self.size_limit = size_limit
+        self.index_path = os.path.join(cache_dir, self.INDEX_NAME)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def file_key(file_path):
+        """计算固件文件内容的SHA-256作为缓存键"""
+        file_hash = hashlib.sha256()
+        
+        with open(file_path, 'rb') as file_object:
+            for chunk_data in iter(lambda: file_object.read(ExtractCache.HASH_CHUNK), b''):
+                file_hash.update(chunk_data)
+        
+        return file_hash.hexdigest()
+    
+    def lookup(self, cache_key):
+        """查找缓存条目，提取目录不完整时视为未命中并移除该条目"""
+        with self._index_lock():
+            cache_index = self._load_index()
+            cache_entry = cache_index.get(cache_key)
+            
+            if cache_entry is None:
+                return None
+            
+            if cache_entry.get('version') != self.FORMAT_VERSION:
+                logging.debug(f"提取缓存条目版本不匹配: {cache_entry['extract_path']}")
+                del cache_index[cache_key]
+                self._save_index(cache_index)
+                return None
+            
+            if not self._entry_valid(cache_entry):
+                logging.debug(f"提取缓存条目已失效: {cache_entry['extract_path']}")
+                del cache_index[cache_key]
+                self._save_index(cache_index)
+                return None
+            
+            cache_entry['last_used'] = time.time()
+            self._save_index(cache_index)
+            
+            return cache_entry
+    
+    def store(self, cache_key, extract_path):
+        """记录提取目录的文件清单，并按LRU淘汰超出容量限制的旧条目"""
+        manifest = []
+        
+        for root, _, file_names in os.walk(extract_path):
+            for file_name in file_names:
+                file_path = os.path.join(root, file_name)
+                file_stat = os.stat(file_path)
+                manifest.append([os.path.relpath(file_path, extract_path), file_stat.st_size, file_stat.st_mtime_ns])
+        
+        with self._index_lock():
+            cache_index = self._load_index()
+            
+            # 同一提取目录已被新内容覆盖，旧条目不再有效
+            for stale_key in [key for key, entry in cache_index.items() if entry['extract_path'] == extract_path]:
+                del cache_index[stale_key]
+            
+            cache_index[cache_key] = {
+                'version': self.FORMAT_VERSION,
+                'extract_path': extract_path,
+                'files': manifest,
+                'total_size': sum(file_size for _, file_size, _ in manifest),
+                'last_used': time.time()
+            }
+            
+            self._evict(cache_index, keep_key=cache_key)
+            self._save_index(cache_index)
+    
+    @contextlib.contextmanager
+    def _index_lock(self):
+        """进程内用线程锁、进程间用锁文件保护索引的读写，命令行批量解析时多个进程共用同一索引"""
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            
+            with open(self.index_path + '.lock', 'a+b') as lock_file:
+                if os.name == 'nt':
+                    lock_file.seek(0)
+                    
+                    # LK_LOCK最多重试10秒，持有锁的进程写入较大索引时可能超过该时间，有限次重试后抛出
+                    for lock_attempt in range(1, self.LOCK_RETRIES + 1):
+                        try:
+                            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError as error:
+                            if lock_attempt == self.LOCK_RETRIES:
+                                logging.error(f"无法锁定提取缓存索引 {self.index_path}: {error}")
+                                raise
+                            
+                            logging.warning(f"提取缓存索引锁定失败，重试({lock_attempt}/{self.LOCK_RETRIES}): {error}")
+                            time.sleep(self.LOCK_RETRY_DELAY)
+                    
+                    try:
+                        yield
+                    finally:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                else:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                    
+                    try:
+                        yield
+                    finally:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    
+    def _entry_valid(self, cache_entry):
+        """检查条目记录的每个文件是否仍存在且大小、修改时间未变"""
+        extract_path = cache_entry['extract_path']
+        
+        if not os.path.isdir(extract_path):
+            return False
+        
+        for rel_path, file_size, file_mtime in cache_entry['files']:
+            try:
+                file_stat = os.stat(os.path.join(extract_path, rel_path))
+            except OSError:
+                return False
+            
+            if file_stat.st_size != file_size or file_stat.st_mtime_ns != file_mtime:
+                return False
+        
+        return True
+    
+    def _evict(self, cache_index, keep_key):
+        """按最近使用时间从旧到新删除提取目录，直到总大小不超过限制"""
+        total_size = sum(entry['total_size'] for entry in cache_index.values())
+        
+        for cache_key in sorted(cache_index, key=lambda key: cache_index[key]['last_used']):
+            if total_size <= self.size_limit:
+                break
+            
+            if cache_key == keep_key:
+                continue
+            
+            cache_entry = cache_index.pop(cache_key)
+            total_size -= cache_entry['total_size']
+            
+            logging.debug(f"淘汰提取缓存: {cache_entry['extract_path']}")
+            InsydePaths.delete_dirs(in_path=cache_entry['extract_path'])
+    
+    def _load_index(self):
+        """读取缓存索引，索引不存在或损坏时返回空索引"""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as index_file:
+                return json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_index(self, cache_index):
+        """先写入临时文件再替换，避免索引写到一半时损坏"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        
+        tmp_path = f'{self.index_path}.{os.getpid()}.tmp'
+        
+        with open(tmp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(cache_index, index_file, ensure_ascii=False)
+        
+        os.replace(tmp_path, self.index_path)
+
+# 固件差异类 - 定位两个固件镜像之间发生变化的地址范围
+class FirmwareDelta:
+    """以内存映射方式比较两个固件镜像：先按大块比较跳过相同部分，只在不同的大块内按块定位变化，
+    变化范围按新镜像中的顶层固件卷归属到区域"""
+    
+    BLOCK_SIZE = 0x1000
+    CHUNK_SIZE = 0x100000
+    
+    OUTSIDE_REGION = '固件卷之外'
+    
+    def __init__(self, old_path, new_path, block_size=BLOCK_SIZE):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.block_size = block_size
+    
+    def compare(self):
+        """比较两个镜像，返回变化的字节数、地址范围及各区域的变化量"""
+        old_buffer = InsydeTexts.file_to_mmap(self.old_path)
+        new_buffer = InsydeTexts.file_to_mmap(self.new_path)
+        
+        try:
+            changed_ranges = self.merge_ranges(self.changed_blocks(old_buffer, new_buffer), self.block_size)
+            
+            common_size = min(len(old_buffer), len(new_buffer))
+            
+            # 大小不同时，较长镜像多出的部分全部视为变化
+            if len(old_buffer) != len(new_buffer):
+                changed_ranges.append((common_size, max(len(old_buffer), len(new_buffer))))
+            
+            # 最后一块可能超出较短镜像的末尾
+            changed_ranges = [(range_bgn, min(range_end, max(len(old_buffer), len(new_buffer))))
+                              for range_bgn, range_end in changed_ranges]
+            
+            changed_ranges = self.merge_ranges(changed_ranges)
+            
+            return {
+                'old_size': len(old_buffer),
+                'new_size': len(new_buffer),
+                'changed_bytes': sum(range_end - range_bgn for range_bgn, range_end in changed_ranges),
+                'ranges': changed_ranges,
+                'regions': self._regions(new_buffer, changed_ranges)
+            }
+        finally:
+            for buffer in [old_buffer, new_buffer]:
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+    
+    def changed_blocks(self, old_buffer, new_buffer):
+        """依次产出两个镜像公共部分中内容不同的块的起始偏移"""
+        common_size = min(len(old_buffer), len(new_buffer))
+        
+        for chunk_bgn in range(0, common_size, self.CHUNK_SIZE):
+            chunk_end = min(chunk_bgn + self.CHUNK_SIZE, common_size)
+            
+            if old_buffer[chunk_bgn:chunk_end] == new_buffer[chunk_bgn:chunk_end]:
+                continue
+            
+            for block_bgn in range(chunk_bgn, chunk_end, self.block_size):
+                block_end = min(block_bgn + self.block_size, chunk_end)
+                
+                if old_buffer[block_bgn:block_end] != new_buffer[block_bgn:block_end]:
+                    yield block_bgn
+    
+    @staticmethod
+    def merge_ranges(items, block_size=None):
+        """合并相邻或重叠的范围；指定block_size时输入为块起始偏移"""
+        merged = []
+        
+        for item in items:
+            range_bgn, range_end = (item, item + block_size) if block_size else item
+            
+            if merged and range_bgn <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+            else:
+                merged.append((range_bgn, range_end))
+        
+        return merged
+    
+    def _regions(self, new_buffer, changed_ranges):
+        """统计每个顶层固件卷（及固件卷之外部分）中变化的字节数，只返回有变化的区域"""
+        fv_parse = UefiFvParse(new_buffer)
+        
+        regions = []
+        region_end = 0
+        
+        # 未压缩固件卷中嵌套的固件卷也会被签名扫描找到，只保留顶层固件卷
+        for fv_info in sorted(fv_parse.volumes(), key=lambda fv_info: fv_info['offset']):
+            if fv_info['offset'] < region_end:
+                continue
+            
+            region_end = fv_info['offset'] + fv_info['size']
+            
+            regions.append({
+                'name': fv_info['name_guid'] or fv_info['fs_guid'],
+                'offset': fv_info['offset'],
+                'size': fv_info['size'],
+                'changed_bytes': 0
+            })
+        
+        outside_bytes = 0
+        
+        for range_bgn, range_end in changed_ranges:
+            covered_bytes = 0
+            
+            for region in regions:
+                overlap = min(range_end, region['offset'] + region['size']) - max(range_bgn, region['offset'])
+                
+                if overlap > 0:
+                    region['changed_bytes'] += overlap
+                    covered_bytes += overlap
+            
+            outside_bytes += range_end - range_bgn - covered_bytes
+        
+        changed_regions = [region for region in regions if region['changed_bytes']]
+        
+        if outside_bytes:
+            changed_regions.append({'name': self.OUTSIDE_REGION, 'offset': -1, 'size': -1,
+                                    'changed_bytes': outside_bytes})
+        
+        return changed_regions
+
+
+# 外部工具信息类
+class ToolInfo:
+    """外部工具的解析结果，size为None表示未找到，此时path为默认路径"""
+    
+    __slots__ = ('name', 'path', 'size', 'mtime', 'version', 'capabilities')
+    
+    def __init__(self, name, path, size=None, mtime=None, version=None, capabilities=()):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.version = version
+        self.capabilities = capabilities
+    
+    @property
+    def available(self):
+        return self.size is not None
+    
+    def to_dict(self):
+        tool_dict = {slot_name: getattr(self, slot_name) for slot_name in self.__slots__}
+        tool_dict['available'] = self.available
+        return tool_dict
+
+
+# 外部工具注册类 - 取代每次操作都重新探测候选路径的get_exe_path
+class ToolRegistry:
+    """每个外部工具只解析一次路径并缓存大小、修改时间和版本；再次获取时只stat一次已知路径，文件变化才重新读取"""
+    
+    # 工具名 -> 支持的操作
+    CAPABILITIES = {
+        FPT_EXE: ('dump', 'flash', 'range'),
+        CONSOLE_EXE: ('get_variables', 'set_variables'),
+        GUI_EXE: ('editor',),
+        EZE_EXE: ('editor',)
+    }
+    
+    VS_FIXEDFILEINFO_SIGNATURE = 0xFEEF04BD
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self):
+        self._tools = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls):
+        """进程内共享的注册表"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+        
+        return cls._shared
+    
+    def resolve(self, exe_name):
+        """返回工具的ToolInfo，已缓存时只按修改时间和大小校验一次"""
+        with self._lock:
+            tool_info = self._tools.get(exe_name)
+            
+            if tool_info is not None and tool_info.available:
+                try:
+                    file_stat = os.stat(tool_info.path)
+                except OSError:
+                    file_stat = None
+                
+                if file_stat is not None and (file_stat.st_mtime_ns, file_stat.st_size) == (tool_info.mtime, tool_info.size):
+                    return tool_info
+                
+                if file_stat is not None:
+                    # 文件被替换，路径不变，只重新读取版本
+                    tool_info = self._tool_info(exe_name, tool_info.path, file_stat)
+                    logging.info(f"外部工具已更新: {tool_info.path}，版本: {tool_info.version}")
+                    self._tools[exe_name] = tool_info
+                    return tool_info
+            
+            new_info = self._probe(exe_name)
+            
+            # 只在状态变化时记录，避免每次操作重复写日志
+            if tool_info is None or tool_info.available != new_info.available or tool_info.path != new_info.path:
+                if new_info.available:
+                    logging.debug(f"找到可执行文件: {new_info.path}，版本: {new_info.version}")
+                else:
+                    logging.warning(f"未找到可执行文件 {exe_name}，使用默认路径: {new_info.path}")
+            
+            self._tools[exe_name] = new_info
+            
+            return new_info
+    
+    def path(self, exe_name):
+        return self.resolve(exe_name).path
+    
+    def cached(self, exe_name):
+        """不访问文件系统，返回最近一次解析的结果，从未解析过时返回None"""
+        with self._lock:
+            return self._tools.get(exe_name)
+    
+    def supports(self, exe_name, capability):
+        """按缓存结果判断工具是否可用且支持该操作，不访问文件系统"""
+        tool_info = self.cached(exe_name)
+        
+        if tool_info is None:
+            tool_info = self.resolve(exe_name)
+        
+        return tool_info.available and capability in tool_info.capabilities
+    
+    def snapshot(self):
+        """返回所有已解析工具的信息列表"""
+        with self._lock:
+            return [tool_info.to_dict() for tool_info in self._tools.values()]
+    
+    def refresh(self, exe_names=None):
+        """解析指定的工具（默认所有已知工具），返回ToolInfo列表"""
+        return [self.resolve(exe_name) for exe_name in (exe_names or self.CAPABILITIES)]
+    
+    def _probe(self, exe_name):
+        """按当前目录、脚本目录、资源目录的顺序查找工具"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        resource_dir = getattr(sys, '_MEIPASS', script_dir)
+        
+        candidate_names = [exe_name]
+        
+        # 如果是Windows，添加.exe后缀的搜索
+        if sys.platform == 'win32' and not exe_name.lower().endswith('.exe'):
+            candidate_names.append(exe_name + '.exe')
+        
+        candidate_paths = []
+        
+        for candidate_name in candidate_names:
+            for candidate_path in (os.path.abspath(candidate_name), os.path.join(script_dir, candidate_name),
+                                   os.path.join(resource_dir, candidate_name)):
+                if candidate_path not in candidate_paths:
+                    candidate_paths.append(candidate_path)
+        
+        for candidate_path in candidate_paths:
+            try:
+                file_stat = os.stat(candidate_path)
+            except OSError:
+                continue
+            
+            if stat.S_ISREG(file_stat.st_mode):
+                return self._tool_info(exe_name, candidate_path, file_stat)
+        
+        return ToolInfo(exe_name, os.path.abspath(exe_name), capabilities=self.CAPABILITIES.get(exe_name, ()))
+    
+    def _tool_info(self, exe_name, exe_path, file_stat):
+        return ToolInfo(exe_name, exe_path, size=file_stat.st_size, mtime=file_stat.st_mtime_ns,
+                        version=self._file_version(exe_path), capabilities=self.CAPABILITIES.get(exe_name, ()))
+    
+    @classmethod
+    def _file_version(cls, exe_path):
+        """读取Windows可执行文件版本资源中的文件版本，其他平台或没有版本资源时返回None"""
+        if sys.platform != 'win32':
+            return None
+        
+        try:
+            version_dll = ctypes.windll.version
+            
+            info_size = version_dll.GetFileVersionInfoSizeW(exe_path, None)
+            if not info_size:
+                return None
+            
+            info_buffer = ctypes.create_string_buffer(info_size)
+            if not version_dll.GetFileVersionInfoW(exe_path, 0, info_size, info_buffer):
+                return None
+            
+            value_ptr = ctypes.c_void_p()
+            value_size = ctypes.c_uint()
+            if not version_dll.VerQueryValueW(info_buffer, '\\', ctypes.byref(value_ptr), ctypes.byref(value_size)):
+                return None
+            
+            # VS_FIXEDFILEINFO: dwSignature, dwStrucVersion, dwFileVersionMS, dwFileVersionLS
+            signature, _, version_ms, version_ls = struct.unpack_from('<4I', ctypes.string_at(value_ptr.value,
+                                                                                              value_size.value))
+            if signature != cls.VS_FIXEDFILEINFO_SIGNATURE:
+                return None
+            
+            return f"{version_ms >> 16}.{version_ms & 0xFFFF}.{version_ls >> 16}.{version_ls & 0xFFFF}"
+        except (OSError, AttributeError, struct.error) as e:
+            logging.debug(f"读取文件版本失败: {exe_path}: {str(e)}")
+            return None
+
+
+# 外部工具进度解析类
+class ToolProgressParse:
+    """从FPT/H2OUVE的输出行中解析当前阶段和完成百分比"""
+    
+    PAT_PERCENT = re.compile(r'(\d{1,3}(?:\.\d+)?)\s*%')
+    PAT_AMOUNT = re.compile(r'(\d+)\s*KB\s+of\s+(\d+)\s*KB', re.IGNORECASE)
+    
+    # 行中关键字 -> 阶段名
+    PHASES = (
+        ('erasing', 'erase'),
+        ('programming', 'program'),
+        ('writing', 'program'),
+        ('verifying', 'verify'),
+        ('reading', 'read'),
+        ('parsing', 'parse'),
+        ('saving', 'save'),
+        ('updating', 'update')
+    )
+    
+    @classmethod
+    def parse(cls, line):
+        """解析一行输出，不含进度信息时返回None"""
+        percent_match = cls.PAT_PERCENT.search(line)
+        amount_match = cls.PAT_AMOUNT.search(line)
+        
+        if percent_match is None and amount_match is None:
+            return None
+        
+        done_bytes = total_bytes = None
+        
+        if amount_match is not None:
+            done_bytes, total_bytes = (int(amount) * 1024 for amount in amount_match.groups())
+        
+        if percent_match is not None:
+            percent = min(float(percent_match.group(1)), 100.0)
+        else:
+            percent = done_bytes * 100.0 / total_bytes if total_bytes else 0.0
+        
+        line_lower = line.lower()
+        phase = next((phase_name for keyword, phase_name in cls.PHASES if keyword in line_lower), 'run')
+        
+        return {'phase': phase, 'percent': percent, 'done': done_bytes, 'total': total_bytes}
+
+
+# 外部工具作业结果类
+class JobResult:
+    """外部工具作业的结果，常用属性与subprocess.CompletedProcess一致"""
+    
+    __slots__ = ('args', 'returncode', 'stdout', 'stderr', 'timed_out', 'cancelled')
+    
+    def __init__(self, args):
+        self.args = args
+        self.returncode = None
+        self.stdout = ''
+        self.stderr = ''
+        self.timed_out = False
+        self.cancelled = False
+
+
+# 外部工具作业运行类 - 取代阻塞到进程结束的subprocess.run
+class JobRunner:
+    """在后台线程的asyncio事件循环中运行外部工具，逐行转发输出并解析进度，支持按作业名取消和超时"""
+    
+    READ_CHUNK = 0x1000
+    
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self):
+        self.encoding = locale.getpreferredencoding(False)
+        
+        self._loop = None
+        self._tasks = {}
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls):
+        """进程内共享的运行器"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+        
+        return cls._shared
+    
+    def submit(self, cmd_args, job_name=None, on_line=None, on_progress=None, timeout=None):
+        """提交作业，返回concurrent.futures.Future，结果为JobResult"""
+        return asyncio.run_coroutine_threadsafe(
+            self._run_job(cmd_args, job_name, on_line, on_progress, timeout), self._event_loop())
+    
+    def run(self, cmd_args, job_name=None, on_line=None, on_progress=None, timeout=None):
+        """运行作业并等待结束，供工作线程调用"""
+        return self.submit(cmd_args, job_name, on_line, on_progress, timeout).result()
+    
+    def cancel(self, job_name):
+        """取消正在运行的作业（结束其进程），作业不存在时返回False"""
+        with self._lock:
+            job_task = self._tasks.get(job_name)
+        
+        if job_task is None:
+            return False
+        
+        self._loop.call_soon_threadsafe(job_task.cancel)
+        
+        return True
+    
+    def running(self):
+        """正在运行的作业名列表"""
+        with self._lock:
+            return list(self._tasks)
+    
+    def _event_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                
+                loop_thread = threading.Thread(target=self._loop.run_forever, name='JobRunner')
+                loop_thread.daemon = True
+                loop_thread.start()
+        
+        return self._loop
+    
+    @staticmethod
+    def _popen_kwargs():
+        if os.name != 'nt':
+            return {}
+        
+        # 创建无窗口进程
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = 0  # SW_HIDE
+        
+        return {'startupinfo': startupinfo}
+    
+    async def _run_job(self, cmd_args, job_name, on_line, on_progress, timeout):
+        job_result = JobResult(args=cmd_args)
+        stdout_lines = []
+        process = None
+        
+        if job_name is not None:
+            with self._lock:
+                self._tasks[job_name] = asyncio.current_task()
+        
+        try:
+            process = await asyncio.create_subprocess_exec(*cmd_args, stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE, **self._popen_kwargs())
+            
+            _, stderr_data = await asyncio.wait_for(asyncio.gather(
+                self._read_lines(process.stdout, stdout_lines, on_line, on_progress),
+                process.stderr.read()), timeout)
+            
+            job_result.stderr = stderr_data.decode(self.encoding, errors='replace')
+            job_result.returncode = await process.wait()
+        except asyncio.TimeoutError:
+            job_result.timed_out = True
+        except asyncio.CancelledError:
+            job_result.cancelled = True
+        finally:
+            if process is not None and process.returncode is None:
+                process.kill()
+                job_result.returncode = await process.wait()
+            
+            if job_name is not None:
+                with self._lock:
+                    self._tasks.pop(job_name, None)
+        
+        job_result.stdout = '\n'.join(stdout_lines)
+        
+        return job_result
+    
+    async def _read_lines(self, stream, stdout_lines, on_line, on_progress):
+        """按\r或\n分行读取输出，FPT等工具用\r在同一行刷新进度"""
+        pending = b''
+        last_progress = None
+        
+        while True:
+            chunk_data = await stream.read(self.READ_CHUNK)
+            
+            raw_lines = re.split(rb'[\r\n]', pending + chunk_data)
+            pending = raw_lines.pop() if chunk_data else b''
+            
+            for raw_line in raw_lines:
+                line = raw_line.decode(self.encoding, errors='replace').rstrip()
+                
+                if not line:
+                    continue
+                
+                stdout_lines.append(line)
+                self._callback(on_line, line)
+                
+                progress = ToolProgressParse.parse(line)
+                
+                # 同一阶段的整数百分比未变化时不重复通知
+                if progress is not None and (progress['phase'], int(progress['percent'])) != last_progress:
+                    last_progress = progress['phase'], int(progress['percent'])
+                    self._callback(on_progress, progress)
+            
+            if not chunk_data:
+                break
+    
+    @staticmethod
+    def _callback(callback, argument):
+        if callback is None:
+            return
+        
+        try:
+            callback(argument)
+        except Exception as e:
+            logging.warning(f"作业回调出错: {str(e)}")
+
+
+# 后台作业调度类 - 取代每次操作都新建的守护线程
+class JobScheduler:
+    """按作业类别调度后台任务，相同的进行中请求只执行一次
+    
+    独占作业（刷写固件、写入配置）运行时不允许任何其他作业；设备作业（提取系统BIOS、备份配置）访问硬件，彼此互斥；
+    并行作业（解析固件、比较备份）同时运行的数量受限。独占作业排队时不再启动其后的作业，避免被连续的解析饿死。
+    """
+    
+    EXCLUSIVE = 'exclusive'
+    DEVICE = 'device'
+    PARALLEL = 'parallel'
+    
+    def __init__(self, max_parallel=None, on_change=None):
+        self.max_parallel = max_parallel or max(1, min(4, (os.cpu_count() or 1) // 2))
+        self.on_change = on_change
+        
+        self._pending = []
+        self._jobs = {}
+        self._running = {self.EXCLUSIVE: 0, self.DEVICE: 0, self.PARALLEL: 0}
+        self._lock = threading.Lock()
+        
+        # 独占作业单独运行，设备作业最多一个，因此工作线程数为并行上限加一
+        self._executor = ThreadPoolExecutor(max_workers=self.max_parallel + 1, thread_name_prefix='JobScheduler')
+    
+    def submit(self, job_key, job_class, target, args=()):
+        """提交作业，返回(Future, 是否为新作业)；相同作业键的作业正在排队或运行时返回该作业的Future"""
+        with self._lock:
+            job_info = self._jobs.get(job_key)
+            
+            if job_info is not None:
+                return job_info['future'], False
+            
+            job_info = {'key': job_key, 'class': job_class, 'target': target, 'args': args,
+                        'state': 'queued', 'submitted': time.time(), 'future': Future()}
+            
+            self._jobs[job_key] = job_info
+            self._pending.append(job_info)
+            
+            started_jobs = self._dispatch()
+        
+        self._notify(job_info, 'queued')
+        
+        for started_job in started_jobs:
+            self._notify(started_job, 'running')
+        
+        return job_info['future'], True
+    
+    def snapshot(self):
+        """当前排队和运行中的作业列表"""
+        now = time.time()
+        
+        with self._lock:
+            return [{'key': job_info['key'], 'jobClass': job_info['class'], 'state': job_info['state'],
+                     'elapsed': round(now - job_info['submitted'], 1)} for job_info in self._jobs.values()]
+    
+    def _can_start(self, job_class):
+        if self._running[self.EXCLUSIVE]:
+            return False
+        
+        if job_class == self.EXCLUSIVE:
+            return not any(self._running.values())
+        
+        if job_class == self.DEVICE:
+            return not self._running[self.DEVICE]
+        
+        return self._running[self.PARALLEL] < self.max_parallel
+    
+    def _dispatch(self):
+        """按提交顺序启动可以运行的作业，调用时需持有锁"""
+        started_jobs = []
+        
+        for job_info in list(self._pending):
+            if not self._can_start(job_info['class']):
+                if job_info['class'] == self.EXCLUSIVE:
+                    break
+                
+                continue
+            
+            self._pending.remove(job_info)
+            self._running[job_info['class']] += 1
+            job_info['state'] = 'running'
+            
+            self._executor.submit(self._run_job, job_info)
+            started_jobs.append(job_info)
+        
+        return started_jobs
+    
+    def _run_job(self, job_info):
+        job_result, job_error = None, None
+        
+        try:
+            job_result = job_info['target'](*job_info['args'])
+        except Exception as e:
+            logging.exception(f"后台作业出错: {job_info['key']}")
+            job_error = e
+        
+        with self._lock:
+            self._running[job_info['class']] -= 1
+            del self._jobs[job_info['key']]
+            
+            started_jobs = self._dispatch()
+        
+        if job_error is None:
+            job_info['future'].set_result(job_result)
+        else:
+            job_info['future'].set_exception(job_error)
+        
+        self._notify(job_info, 'failed' if job_error is not None else 'done')
+        
+        for started_job in started_jobs:
+            self._notify(started_job, 'running')
+    
+    def _notify(self, job_info, job_state):
+        if self.on_change is None:
+            return
+        
+        try:
+            self.on_change(job_info['key'], job_state)
+        except Exception as e:
+            logging.warning(f"作业状态回调出错: {str(e)}")
+
+
+# 闪存描述符类 - 确定BIOS区域在整个SPI闪存中的位置
+class FlashDescriptor:
+    """解析Intel闪存描述符的区域表，FPT的-a地址是整个SPI闪存上的绝对地址，按范围访问BIOS区域时需要加上区域基址"""
+    
+    SIGNATURE = b'\x5A\xA5\xF0\x0F'
+    
+    # 较新平台的签名位于偏移0x10，ICH8等旧平台位于偏移0x0
+    SIGNATURE_OFFSETS = (0x10, 0x0)
+    
+    DESCRIPTOR_SIZE = 0x1000
+    
+    BIOS_REGION = 1
+    
+    @classmethod
+    def region(cls, desc_buffer, region_index=BIOS_REGION):
+        """返回区域的(起始地址, 结束地址)，描述符无效或区域未使用时返回None"""
+        sig_off = next((sig_off for sig_off in cls.SIGNATURE_OFFSETS
+                        if desc_buffer[sig_off:sig_off + 0x4] == cls.SIGNATURE), None)
+        
+        if sig_off is None:
+            return None
+        
+        # FLMAP0的位16-23为区域表基址（FRBA）右移4位
+        flmap0 = struct.unpack_from('<I', desc_buffer, sig_off + 0x4)[0]
+        flreg_off = ((flmap0 >> 16) & 0xFF) << 4
+        flreg_off += region_index * 0x4
+        
+        if flreg_off + 0x4 > len(desc_buffer):
+            return None
+        
+        # FLREG的位0-14为区域起始4K块号，位16-30为区域最后一个4K块号，起始大于结束表示区域未使用
+        flreg = struct.unpack_from('<I', desc_buffer, flreg_off)[0]
+        region_bgn = (flreg & 0x7FFF) << 12
+        region_end = (((flreg >> 16) & 0x7FFF) + 1) << 12
+        
+        if region_bgn >= region_end:
+            return None
+        
+        return region_bgn, region_end
+
+
+# SPI闪存设备类 - 增量刷写计划的执行对象
+class SpiDevice:
+    """SPI闪存设备接口，地址均相对于BIOS区域起始处"""
+    
+    def read(self, address, length):
+        """读取指定范围的内容"""
+        raise NotImplementedError('Method "read" not implemented')
+    
+    def write_range(self, address, data):
+        """擦除并写入指定范围，address和len(data)均为擦除块大小的整数倍"""
+        raise NotImplementedError('Method "write_range" not implemented')
+    
+    def dump(self, out_path):
+        """将整个BIOS区域读出到文件"""
+        raise NotImplementedError('Method "dump" not implemented')
+    
+    def write_all(self, in_path):
+        """擦除并写入整个BIOS区域，增量刷写中途失败时用于恢复"""
+        raise NotImplementedError('Method "write_all" not implemented')
+    
+    def region_size(self):
+        """BIOS区域的大小"""
+        raise NotImplementedError('Method "region_size" not implemented')
+
+
+class FlashCancelledError(RuntimeError):
+    """刷写工具作业被取消"""
+
+
+class PartialFlashError(RuntimeError):
+    """增量刷写在某个范围失败，此前的范围已写入，失败的范围可能已被擦除，BIOS区域处于部分写入状态
+    
+    recovered为True表示已改为整体写入BIOS区域并成功。
+    """
+    
+    def __init__(self, failed_range, written_ranges, cause):
+        self.failed_range = failed_range
+        self.written_ranges = written_ranges
+        self.cause = cause
+        self.cancelled = isinstance(cause, FlashCancelledError)
+        self.recovered = False
+        
+        super().__init__(f'增量刷写在范围 0x{failed_range[0]:08X} - 0x{failed_range[1]:08X} 失败: {cause}；'
+                         f'此前已写入 {len(written_ranges)} 个范围，BIOS区域处于部分写入状态')
+
+
+class SimulatedSpiDevice(SpiDevice):
+    """内存中模拟的SPI闪存：擦除将整块置为0xFF，编程只能将位从1清为0，并统计擦除与写入量"""
+    
+    def __init__(self, image, erase_block=0x1000):
+        self.memory = bytearray(image)
+        self.erase_block = erase_block
+        
+        self.erased_bytes = 0
+        self.written_bytes = 0
+        self.operations = []
+    
+    def read(self, address, length):
+        return bytes(self.memory[address:address + length])
+    
+    def write_range(self, address, data):
+        self.erase(address, len(data))
+        self.program(address, data)
+        
+        self.operations.append((address, len(data)))
+    
+    def erase(self, address, length):
+        """将按擦除块对齐的范围置为0xFF"""
+        if address % self.erase_block or length % self.erase_block or address + length > len(self.memory):
+            raise ValueError(f'范围未按擦除块对齐或超出闪存大小: 0x{address:X} + 0x{length:X}')
+        
+        self.memory[address:address + length] = b'\xFF' * length
+        self.erased_bytes += length
+    
+    def program(self, address, data):
+        """不擦除直接编程：结果为原内容与数据按位与，未擦除的范围中为0的位无法恢复为1"""
+        if address + len(data) > len(self.memory):
+            raise ValueError(f'范围超出闪存大小: 0x{address:X} + 0x{len(data):X}')
+        
+        current_data = int.from_bytes(self.memory[address:address + len(data)], 'big')
+        self.memory[address:address + len(data)] = (current_data & int.from_bytes(data, 'big')).to_bytes(len(data), 'big')
+        self.written_bytes += len(data)
+    
+    def dump(self, out_path):
+        with open(out_path, 'wb') as out_file:
+            out_file.write(self.memory)
+    
+    def write_all(self, in_path):
+        with open(in_path, 'rb') as in_file:
+            image_data = in_file.read()
+        
+        if len(image_data) != len(self.memory):
+            raise ValueError(f'镜像大小与闪存大小不一致: 0x{len(image_data):X} / 0x{len(self.memory):X}')
+        
+        self.write_range(0, image_data)
+    
+    def region_size(self):
+        return len(self.memory)
+
+
+class FptSpiDevice(SpiDevice):
+    """通过Intel FPT访问BIOS区域，每个范围单独调用一次FPT
+    
+    FPT的-a/-l按整个SPI闪存的绝对地址寻址，范围地址需加上从闪存描述符读取的BIOS区域基址。
+    """
+    
+    def __init__(self, fpt_exe_path, on_progress=None, on_call=None, bios_region=None):
+        self.fpt_exe_path = fpt_exe_path
+        self.on_progress = on_progress
+        
+        # 每次FPT调用结束后以耗时秒数调用
+        self.on_call = on_call
+        
+        # BIOS区域在SPI闪存中的(起始地址, 结束地址)，为None时在首次按范围访问前从闪存描述符读取
+        self.bios_region = bios_region
+    
+    def read(self, address, length):
+        flash_address = self._flash_address(address, length)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = os.path.join(tmp_dir, 'range.bin')
+            
+            self._run_fpt(['-d', out_path, '-a', f'0x{flash_address:X}', '-l', f'0x{length:X}'],
+                          timeout=TOOL_TIMEOUTS['flash_range'])
+            
+            with open(out_path, 'rb') as out_file:
+                return out_file.read()
+    
+    def write_range(self, address, data):
+        flash_address = self._flash_address(address, len(data))
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            in_path = os.path.join(tmp_dir, 'range.bin')
+            
+            with open(in_path, 'wb') as in_file:
+                in_file.write(data)
+            
+            # FPT写入时会先擦除所涉及的块；与整体刷写相同不设超时，擦写中途结束进程会使闪存处于部分擦除状态
+            self._run_fpt(['-f', in_path, '-a', f'0x{flash_address:X}', '-l', f'0x{len(data):X}'],
+                          timeout=TOOL_TIMEOUTS['flash'])
+    
+    def dump(self, out_path):
+        self._run_fpt(['-d', out_path, '-bios'], timeout=TOOL_TIMEOUTS['dump'])
+    
+    def write_all(self, in_path):
+        self._run_fpt(['-f', in_path, '-bios'], timeout=TOOL_TIMEOUTS['flash'])
+    
+    def region_size(self):
+        if self.bios_region is None:
+            self.bios_region = self._read_bios_region()
+        
+        return self.bios_region[1] - self.bios_region[0]
+    
+    def _flash_address(self, address, length):
+        """将相对于BIOS区域的地址换算为SPI闪存绝对地址，范围超出BIOS区域时抛出ValueError"""
+        if self.bios_region is None:
+            self.bios_region = self._read_bios_region()
+        
+        region_bgn, region_end = self.bios_region
+        
+        if address < 0 or region_bgn + address + length > region_end:
+            raise ValueError(f'范围超出BIOS区域: 0x{address:X} + 0x{length:X}')
+        
+        return region_bgn + address
+    
+    def _read_bios_region(self):
+        """读出闪存描述符并解析BIOS区域位置，无法确定时抛出RuntimeError，不按猜测的地址擦写"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            desc_path = os.path.join(tmp_dir, 'descriptor.bin')
+            
+            self._run_fpt(['-d', desc_path, '-desc'], timeout=TOOL_TIMEOUTS['dump'])
+            
+            with open(desc_path, 'rb') as desc_file:
+                bios_region = FlashDescriptor.region(desc_file.read())
+        
+        if bios_region is None:
+            raise RuntimeError('无法从闪存描述符确定BIOS区域位置，不能按范围刷写')
+        
+        logging.debug(f"BIOS区域: 0x{bios_region[0]:08X} - 0x{bios_region[1]:08X}")
+        
+        return bios_region
+    
+    def _run_fpt(self, fpt_args, timeout=None):
+        """运行一次FPT，取消、超时或返回非0时抛出异常"""
+        cmd_args = [self.fpt_exe_path] + fpt_args
+        logging.debug(f"执行FPT命令: {' '.join(cmd_args)}")
+        
+        call_bgn = time.perf_counter()
+        process = JobRunner.shared().run(cmd_args, job_name='flash', on_progress=self.on_progress, timeout=timeout)
+        
+        if self.on_call is not None:
+            self.on_call(time.perf_counter() - call_bgn)
+        
+        log_job_output('flash', process)
+        
+        if process.cancelled:
+            raise FlashCancelledError('FPT作业已取消')
+        
+        if process.timed_out:
+            raise RuntimeError(f'FPT在 {timeout} 秒内未完成，已终止')
+        
+        if process.returncode != 0:
+            raise RuntimeError(process.stderr or process.stdout or f"FPT返回代码: {process.returncode}")
+
+
+# 增量刷写计划类 - 只擦写与当前闪存内容不同的擦除块
+class FlashPlanner:
+    """按擦除块比较目标固件与当前闪存转储，生成需要擦写的地址范围并在SPI设备上执行"""
+    
+    ERASE_BLOCKS = (0x1000, 0x10000)
+    
+    def __init__(self, current_path, target_path, erase_block=0x1000, merge_gap=0):
+        if erase_block not in self.ERASE_BLOCKS:
+            raise ValueError(f'不支持的擦除块大小: 0x{erase_block:X}')
+        
+        self.current_path = current_path
+        self.target_path = target_path
+        self.erase_block = erase_block
+        
+        # 间隔不超过该值的相邻范围合并为一次写入，以减少刷写工具的调用次数
+        self.merge_gap = merge_gap
+    
+    def plan(self):
+        """生成刷写计划：[(起始地址, 结束地址), ...]，两个镜像大小不同时无法增量刷写，返回None"""
+        if os.path.getsize(self.current_path) != os.path.getsize(self.target_path):
+            return None
+        
+        firmware_delta = FirmwareDelta(self.current_path, self.target_path, block_size=self.erase_block)
+        
+        current_buffer = InsydeTexts.file_to_mmap(self.current_path)
+        target_buffer = InsydeTexts.file_to_mmap(self.target_path)
+        
+        try:
+            changed_ranges = FirmwareDelta.merge_ranges(firmware_delta.changed_blocks(current_buffer, target_buffer),
+                                                        self.erase_block)
+        finally:
+            for buffer in [current_buffer, target_buffer]:
+                if isinstance(buffer, mmap.mmap):
+                    buffer.close()
+        
+        return self.merge_gaps(changed_ranges, self.merge_gap)
+    
+    @staticmethod
+    def merge_gaps(changed_ranges, merge_gap):
+        """合并间隔不超过merge_gap的相邻范围"""
+        flash_plan = []
+        
+        for range_bgn, range_end in changed_ranges:
+            if flash_plan and range_bgn - flash_plan[-1][1] <= merge_gap:
+                flash_plan[-1] = (flash_plan[-1][0], range_end)
+            else:
+                flash_plan.append((range_bgn, range_end))
+        
+        return flash_plan
+    
+    def execute(self, device, flash_plan, dry_run=False, verify=True, fallback=True):
+        """按计划在设备上擦写各范围，返回写入的字节数；dry_run时只记录将执行的操作
+        
+        某个范围写入或校验失败时抛出PartialFlashError；fallback为True且不是用户取消时，先改为整体写入
+        目标固件以恢复BIOS区域，成功时异常的recovered为True。
+        """
+        written_bytes = 0
+        written_ranges = []
+        
+        # 在擦写任何范围之前确认计划的地址都在BIOS区域内
+        if not dry_run and flash_plan and device.region_size() != os.path.getsize(self.target_path):
+            raise ValueError(f'目标固件大小与BIOS区域大小不一致: 0x{os.path.getsize(self.target_path):X} / '
+                             f'0x{device.region_size():X}')
+        
+        with open(self.target_path, 'rb') as target_file:
+            for range_bgn, range_end in flash_plan:
+                logging.info(f"{'演练' if dry_run else '写入'}范围: 0x{range_bgn:08X} - 0x{range_end:08X} "
+                             f"(0x{range_end - range_bgn:X} 字节)")
+                
+                written_bytes += range_end - range_bgn
+                
+                if dry_run:
+                    continue
+                
+                target_file.seek(range_bgn)
+                range_data = target_file.read(range_end - range_bgn)
+                
+                try:
+                    device.write_range(range_bgn, range_data)
+                    
+                    if verify and device.read(range_bgn, len(range_data)) != range_data:
+                        raise RuntimeError('读回内容与目标固件不一致')
+                except Exception as e:
+                    partial_error = PartialFlashError((range_bgn, range_end), written_ranges, e)
+                    logging.error(str(partial_error))
+                    
+                    if fallback and not partial_error.cancelled:
+                        self._recover(device, partial_error)
+                    
+                    raise partial_error from e
+                
+                written_ranges.append((range_bgn, range_end))
+        
+        return written_bytes
+    
+    def _recover(self, device, partial_error):
+        """增量刷写中途失败后整体写入目标固件，失败时保留recovered为False"""
+        logging.warning(f"改为整体写入BIOS区域: {self.target_path}")
+        
+        try:
+            device.write_all(self.target_path)
+        except Exception as e:
+            logging.error(f"整体写入BIOS区域失败，BIOS区域仍处于部分写入状态: {str(e)}")
+            return
+        
+        partial_error.recovered = True
+        logging.warning("整体写入BIOS区域成功")
+
+
+# 刷写吞吐量历史类 - 按本机实测的各阶段速度估算刷写耗时
+class FlashThroughput:
+    """按机器名保存各刷写阶段的吞吐量（字节/秒）和每次调用FPT的固定开销，取指数加权平均"""
+    
+    HISTORY_NAME = '.flash_throughput.json'
+    
+    # 没有实测记录时使用的典型SPI闪存速度（字节/秒）和每次调用FPT的开销（秒）
+    DEFAULT_RATES = {'erase': 0x40000, 'program': 0x40000, 'verify': 0x200000, 'read': 0x200000}
+    DEFAULT_CALL_SECONDS = 2.0
+    
+    # 新测量值的权重
+    SMOOTHING = 0.3
+    
+    # 数据量太小或耗时太短时，吞吐量主要反映固定开销而不是闪存速度，不记录
+    MIN_BYTES = 0x40000
+    MIN_SECONDS = 0.2
+    
+    def __init__(self, history_path=None, machine_name=None):
+        self.history_path = history_path or os.path.join(BIOS_BACKUP_DIR, self.HISTORY_NAME)
+        self.machine_name = machine_name or platform.node() or 'local'
+        self._history = None
+        self._lock = threading.Lock()
+    
+    def rate(self, phase):
+        """返回(字节/秒, 是否为实测值)"""
+        phase_entry = self._machine_history().get(phase)
+        
+        if phase_entry:
+            return phase_entry['value'], True
+        
+        return self.DEFAULT_RATES.get(phase, self.DEFAULT_RATES['program']), False
+    
+    def call_seconds(self):
+        """返回(每次调用FPT的固定开销秒数, 是否为实测值)"""
+        call_entry = self._machine_history().get('call')
+        
+        if call_entry:
+            return call_entry['value'], True
+        
+        return self.DEFAULT_CALL_SECONDS, False
+    
+    def estimate(self, steps, calls=1):
+        """估算按steps（[(阶段, 字节数), ...]）刷写并调用calls次FPT的耗时，返回(秒数, 是否全部基于实测值)"""
+        total_seconds, call_measured = self.call_seconds()
+        total_seconds *= calls
+        all_measured = call_measured or not calls
+        
+        for phase, byte_count in steps:
+            phase_rate, rate_measured = self.rate(phase)
+            total_seconds += byte_count / phase_rate
+            all_measured = all_measured and rate_measured
+        
+        return total_seconds, all_measured
+    
+    def record_rate(self, phase, byte_count, seconds):
+        """记录一个阶段的实测吞吐量"""
+        if byte_count < self.MIN_BYTES or seconds < self.MIN_SECONDS:
+            return
+        
+        self._update(phase, byte_count / seconds)
+    
+    def record_call(self, seconds):
+        """记录一次调用FPT除各阶段外的固定开销"""
+        if seconds >= 0:
+            self._update('call', seconds)
+    
+    def _update(self, key, value):
+        with self._lock:
+            history = self._load()
+            
+            machine_history = history.setdefault(self.machine_name, {})
+            entry = machine_history.get(key)
+            
+            if entry is None:
+                machine_history[key] = {'value': value, 'samples': 1}
+            else:
+                entry['value'] += (value - entry['value']) * self.SMOOTHING
+                entry['samples'] += 1
+            
+            self._save(history)
+            self._history = history
+    
+    def _machine_history(self):
+        """本机的记录，首次访问时读取历史文件"""
+        with self._lock:
+            if self._history is None:
+                self._history = self._load()
+            
+            return self._history.get(self.machine_name, {})
+    
+    def _load(self):
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as history_file:
+                return json.load(history_file)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save(self, history):
+        try:
+            os.makedirs(os.path.dirname(self.history_path) or '.', exist_ok=True)
+            
+            tmp_path = f'{self.history_path}.{os.getpid()}.tmp'
+            
+            with open(tmp_path, 'w', encoding='utf-8') as history_file:
+                json.dump(history, history_file, ensure_ascii=False, indent=2)
+            
+            os.replace(tmp_path, self.history_path)
+        except OSError as e:
+            logging.warning(f"无法保存刷写吞吐量记录: {str(e)}")
+
+
+# 刷写进度类 - 将各次FPT调用的阶段进度换算为整体进度和剩余时间
+class FlashProgress:
+    """按预计的刷写步骤（阶段, 字节数）跟踪FPT输出的阶段进度，阶段结束时把实测吞吐量记入历史
+    
+    整体进度按各步骤的预计耗时加权，当前步骤的剩余时间在进度推进后改用本次实测速度推算。
+    """
+    
+    # 当前步骤进度达到该百分比后才用实测速度推算剩余时间
+    LIVE_RATE_PERCENT = 5.0
+    
+    def __init__(self, steps, throughput, calls=1, on_update=None):
+        self.throughput = throughput
+        self.on_update = on_update
+        
+        self.steps = []
+        self.estimates = []
+        self.calls_total = 0
+        self.calls_done = 0
+        self.call_seconds = throughput.call_seconds()[0]
+        
+        self._index = -1
+        self._step_bgn = None
+        self._last = None
+        self._percent = 0.0
+        self._call_phase_seconds = 0.0
+        
+        self.add_steps(steps, calls)
+    
+    @staticmethod
+    def full_flash_steps(image_size):
+        """整体刷写（fpt -f -bios）的步骤和FPT调用次数"""
+        return [('erase', image_size), ('program', image_size), ('verify', image_size)], 1
+    
+    @staticmethod
+    def delta_flash_steps(flash_plan, verify=True):
+        """增量刷写计划中各范围的步骤和FPT调用次数：写入时FPT擦除、写入、校验，之后再读回校验；
+        首次按范围访问前还要调用一次FPT读取闪存描述符"""
+        steps = []
+        
+        for range_bgn, range_end in flash_plan:
+            range_size = range_end - range_bgn
+            steps += [('erase', range_size), ('program', range_size), ('verify', range_size)]
+            
+            if verify:
+                steps.append(('read', range_size))
+        
+        return steps, len(flash_plan) * (2 if verify else 1) + (1 if flash_plan else 0)
+    
+    def add_steps(self, steps, calls=0):
+        """追加步骤，增量刷写在读出当前内容并生成计划后才知道后续步骤"""
+        for phase, byte_count in steps:
+            self.steps.append((phase, byte_count))
+            self.estimates.append(byte_count / self.throughput.rate(phase)[0])
+        
+        self.calls_total += calls
+    
+    def on_progress(self, progress):
+        """JobRunner的进度回调"""
+        now = time.perf_counter()
+        phase = progress['phase']
+        percent = progress['percent']
+        
+        if self._index < 0 or phase != self.steps[self._index][0]:
+            step_index = next((index for index in range(self._index + 1, len(self.steps))
+                               if self.steps[index][0] == phase), None)
+            
+            # 不在计划中的阶段（如FPT读取描述符）不影响整体进度
+            if step_index is None:
+                return
+            
+            self._complete_step()
+            self._index = step_index
+            self._step_bgn = (now, percent)
+        
+        self._last = (now, percent)
+        
+        if self.on_update is not None:
+            self.on_update(phase, self.percent(), self.remaining_seconds())
+    
+    def call_done(self, seconds):
+        """一次FPT调用结束，调用耗时中不属于各阶段的部分记为固定开销"""
+        self._complete_step()
+        
+        self.calls_done += 1
+        self.throughput.record_call(seconds - self._call_phase_seconds)
+        self._call_phase_seconds = 0.0
+    
+    def percent(self):
+        """按预计耗时加权的整体完成百分比，追加步骤后总量变大时不回退"""
+        total_seconds = sum(self.estimates) + self.calls_total * self.call_seconds
+        
+        if not total_seconds:
+            return self._percent
+        
+        done_seconds = sum(self.estimates[:max(self._index, 0)]) + self.calls_done * self.call_seconds
+        
+        if self._index >= 0 and self._last is not None:
+            done_seconds += self.estimates[self._index] * self._last[1] / 100
+        
+        self._percent = max(self._percent, min(done_seconds * 100 / total_seconds, 100.0))
+        
+        return self._percent
+    
+    def remaining_seconds(self):
+        """预计剩余秒数"""
+        remaining = sum(self.estimates[self._index + 1:]) + (self.calls_total - self.calls_done) * self.call_seconds
+        
+        if self._index >= 0 and self._last is not None:
+            (bgn_time, bgn_percent), (last_time, last_percent) = self._step_bgn, self._last
+            
+            if last_percent - bgn_percent >= self.LIVE_RATE_PERCENT:
+                remaining += (last_time - bgn_time) / (last_percent - bgn_percent) * (100 - last_percent)
+            else:
+                remaining += self.estimates[self._index] * (100 - last_percent) / 100
+        
+        return max(remaining, 0.0)
+    
+    def _complete_step(self):
+        """结束当前步骤，按本步骤内进度的推进量和耗时记录吞吐量"""
+        if self._index < 0 or self._step_bgn is None:
+            return
+        
+        (bgn_time, bgn_percent), (last_time, last_percent) = self._step_bgn, self._last
+        phase, byte_count = self.steps[self._index]
+        
+        self._call_phase_seconds += last_time - bgn_time
+        self.throughput.record_rate(phase, byte_count * (last_percent - bgn_percent) / 100, last_time - bgn_time)
+        
+        self._step_bgn = None
+
+
+# BIOS提取器类 - 修改以使用集成的InsydeIfdExtract
+class BiosExtractor:
+    """处理BIOS提取和解析的类"""
+    
+    def __init__(self, max_workers=EXTRACT_WORKERS):
+        # 确保提取目录存在
+        os.makedirs(EXTRACT_DIR, exist_ok=True)
+        
+        # 嵌套iFdPacker镜像并行解析的最大进程数
+        self.max_workers = max_workers
+        
+        # 按固件内容哈希复用提取结果
+        self.extract_cache = ExtractCache()
+        
+        # 按节内容哈希复用FFS节解压结果
+        self.section_cache = SectionCache()
+        
+        # 模块GUID名称索引，首次查询时才加载
+        self.guid_index = GuidIndex()
+    
+    def extract_system_bios(self, on_line=None, on_progress=None):
+        """从系统提取BIOS固件，on_line/on_progress接收FPT的逐行输出和进度"""
+        try:
+            # 检查管理员权限
+            if not is_admin():
+                return False, "提取BIOS需要管理员权限，请以管理员身份运行程序", []
+            
+            # 确保BIOS备份目录存在
+            logging.debug(f"确保BIOS备份目录存在: {BIOS_BACKUP_DIR}")
+            os.makedirs(BIOS_BACKUP_DIR, exist_ok=True)
+            
+            # 使用时间戳生成文件名
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = os.path.join(BIOS_BACKUP_DIR, f"BIOS_Backup_{timestamp}.bin")
+            logging.debug(f"BIOS备份文件路径: {output_file}")
+            
+            # 获取FPT工具路径
+            fpt_tool = ToolRegistry.shared().resolve(FPT_EXE)
+            fpt_exe_path = fpt_tool.path
+            
+            if not fpt_tool.available:
+                error_msg = f"FPT工具不存在: {fpt_exe_path}"
+                logging.error(error_msg)
+                return False, error_msg, []
+            
+            # 使用FPT工具提取系统BIOS
+            cmd_args = [fpt_exe_path, '-d', output_file, '-bios']
+            logging.debug(f"执行FPT命令: {' '.join(cmd_args)}")
+            
+            try:
+                process = JobRunner.shared().run(cmd_args, job_name='dump', on_line=on_line, on_progress=on_progress,
+                                                 timeout=TOOL_TIMEOUTS['dump'])
+                log_job_output('dump', process)
+            except Exception as e:
+                error_msg = f"执行FPT命令异常: {str(e)}"
+                logging.exception(error_msg)
+                return False, error_msg, []
+            
+            if process.cancelled or process.timed_out:
+                InsydePaths.delete_file(in_path=output_file)
+                error_msg = "BIOS提取已取消" if process.cancelled else "BIOS提取超时"
+                logging.error(error_msg)
+                return False, error_msg, []
+            
+            if process.returncode == 0 and os.path.exists(output_file):
+                # 检查文件大小
+                file_size = os.path.getsize(output_file)
+                logging.debug(f"BIOS备份成功，文件大小: {file_size} 字节")
+                
+                # 不执行解析，直接返回成功信息和文件列表
+                files = [{
+                    "name": os.path.basename(output_file),
+                    "path": output_file,
+                    "size": self._format_file_size(os.path.getsize(output_file)),
+                    "time": timestamp
+                }]
+                
+                success_msg = f"BIOS备份成功保存到{BIOS_BACKUP_DIR}目录"
+                logging.info(success_msg)
+                return True, success_msg, files
+            else:
+                error_msg = process.stderr if process.stderr else process.stdout if process.stdout else "未知错误"
+                
+                # 检查是否是权限相关错误
+                if "administrator" in error_msg or "privileged" in error_msg or "permission" in error_msg:
+                    error_msg = "提取BIOS需要管理员权限，请以管理员身份运行程序"
+                    logging.error(error_msg)
+                    return False, error_msg, []
+                elif "Failed to communicate with CSME" in error_msg:
+                    error_msg = "无法与芯片组管理引擎通信，请确保您以管理员身份运行程序并且硬件支持该操作"
+                    logging.error(error_msg)
+                    return False, error_msg, []
+                else:
+                    error_msg = f"系统BIOS提取失败: {error_msg}"
+                    logging.error(error_msg)
+                    return False, error_msg, []
+                
+        except Exception as e:
+            error_msg = f"系统BIOS提取出错: {str(e)}"
+            logging.exception(error_msg)
+            return False, error_msg, []
+    
+    def parse_bios_file(self, file_path, extract_path=None, cache_key=None):
+        """解析BIOS固件文件，extract_path默认为get_extract_path按文件名生成的目录；
+        调用方已计算文件的ExtractCache.file_key时通过cache_key传入，避免再次读取整个文件"""
+        try:
+            if not os.path.exists(file_path):
+                return False, f"文件不存在: {file_path}", []
+            
+            if extract_path is None:
+                extract_path = self.get_extract_path(file_path)
+            
+            # 相同内容的固件已解析过且提取目录完整时，直接返回缓存的文件清单
+            if cache_key is None:
+                cache_key = ExtractCache.file_key(file_path)
+            cache_entry = self.extract_cache.lookup(cache_key)
+            
+            if cache_entry is not None:
+                logging.debug(f"命中提取缓存: {cache_entry['extract_path']}")
+                return True, "BIOS固件解析成功（使用缓存的提取结果）", self._get_cached_files(cache_entry)
+            
+            # 创建提取器实例，以内存映射方式访问固件文件，避免整体读入内存
+            with InsydeIfdExtract(
+                input_object=file_path,
+                extract_path=extract_path,
+                padding=0,
+                use_mmap=True,
+                max_workers=self.max_workers
+            ) as extractor:
+                # 检查是否是支持的格式
+                if extractor.check_format():
+                    # 解析和提取
+                    parse_result = extractor.parse_format()
+                    
+                    if parse_result:
+                        # 成功解析，获取提取的文件列表
+                        extracted_files = self._get_extracted_files(extract_path)
+                        self.extract_cache.store(cache_key, extract_path)
+                        return True, "BIOS固件解析成功", extracted_files
+                    else:
+                        return False, "BIOS固件解析失败，可能是不支持的格式", []
+                
+                # 如果不是Insyde IFD格式，尝试基本的解析，复用已建立的内存映射和签名扫描结果
+                parse_status = self._basic_bios_parse(file_path, extract_path, input_buffer=extractor.input_buffer,
+                                                      fvh_spans=extractor.signatures['fvh'],
+                                                      ucode_spans=extractor.microcode_spans)
+            
+            if parse_status[0]:
+                self.extract_cache.store(cache_key, extract_path)
+            
+            return parse_status
+                
+        except Exception as e:
+            return False, f"BIOS固件解析出错: {str(e)}", []
+    
+    def get_extract_path(self, file_path):
+        """获取BIOS固件文件对应的提取目录"""
+        return os.path.join(EXTRACT_DIR, os.path.basename(file_path) + "_extracted")
+    
+    def _basic_bios_parse(self, file_path, extract_path, input_buffer=None, fvh_spans=None, ucode_spans=None):
+        """基本的BIOS解析：遍历UEFI固件卷与FFS文件，未找到固件卷时提取可打印字符串"""
+        try:
+            # 确保提取目录存在
+            os.makedirs(extract_path, exist_ok=True)
+            
+            # 以内存映射方式读取文件
+            bios_data = InsydeTexts.file_to_mmap(file_path) if input_buffer is None else input_buffer
+            
+            # 提取一些基本信息
+            bios_info_file = os.path.join(extract_path, "bios_info.txt")
+            
+            try:
+                with open(bios_info_file, 'w', encoding='utf-8') as f:
+                    f.write(f"BIOS文件: {os.path.basename(file_path)}\n")
+                    f.write(f"文件大小: {len(bios_data):,} 字节\n")
+                    f.write(f"解析时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
+                    
+                    self._write_microcode_report(f, MicrocodeScan(bios_data, ucode_spans=ucode_spans))
+                    
+                    fv_parse = UefiFvParse(bios_data, fvh_spans=fvh_spans)
+                    
+                    # 优先输出固件卷与FFS文件列表并解压其中的压缩节，未找到固件卷时退回字符串提取
+                    if self._write_fv_report(f, fv_parse):
+                        self._write_nvram_report(f, NvramParse(bios_data, fvh_spans=fv_parse.fvh_spans))
+                        
+                        section_extract = UefiSectionExtract(extract_path=extract_path, section_cache=self.section_cache,
+                                                             max_workers=self.max_workers, guid_index=self.guid_index)
+                        
+                        self._write_section_report(f, section_extract.extract(fv_parse=fv_parse))
+                    else:
+                        self._write_strings_report(f, bios_data)
+            finally:
+                # 仅关闭本函数自行建立的内存映射
+                if input_buffer is None and isinstance(bios_data, mmap.mmap):
+                    bios_data.close()
+            
+            # 创建原始BIOS副本
+            bios_copy = os.path.join(extract_path, os.path.basename(file_path))
+            shutil.copy2(file_path, bios_copy)
+            
+            # 返回提取的文件列表
+            extracted_files = self._get_extracted_files(extract_path)
+            return True, "BIOS固件已保存并进行了基本解析", extracted_files
+            
+        except Exception as e:
+            return False, f"基本BIOS解析出错: {str(e)}", []
+    
+    def _write_microcode_report(self, report_file, microcode_scan):
+        """按H2OEZE FstBiosImgInfoDetail的[MicroCode]格式写出微码列表，末列为校验和是否正确"""
+        updates = microcode_scan.updates()
+        
+        if not updates:
+            return
+        
+        report_file.write("[MicroCode]\n")
+        report_file.write(f"{'Processor ID':<16}{'Data Offset':<15}{'Header Version':<18}{'Update Revision':<19}"
+                          f"{'Date':<14}{'Checksum':<16}{'Loader Revision':<19}{'Processor Flags':<19}"
+                          f"{'Data Size':<13}{'TotalSize':<13}Valid\n")
+        
+        for ucode in updates:
+            cpuid = f"<0x{ucode['cpuid']:08X}>"
+            valid = 'TRUE' if ucode['valid'] else 'FALSE'
+            
+            report_file.write(f"{cpuid:<16}0x{ucode['offset']:08X}     0x{ucode['header_version']:08X}        "
+                              f"0x{ucode['revision']:08X}         0x{ucode['raw_date']:08X}    "
+                              f"0x{ucode['checksum']:08X}      0x{ucode['loader_revision']:08X}         "
+                              f"0x{ucode['platform_ids']:08X}         0x{ucode['data_size']:08X}   "
+                              f"0x{ucode['total_size']:08X}   {valid}\n")
+        
+        report_file.write("\n")
+    
+    def _write_fv_report(self, report_file, fv_parse):
+        """按H2OEZE FstBiosImgInfoDetail格式写出固件卷与FFS文件列表，返回找到的固件卷数量"""
+        fv_count = 0
+        
+        for fv_info in fv_parse.volumes():
+            ffs_files = list(fv_parse.files(fv_info))
+            
+            fv_guid = fv_info['name_guid'] or fv_info['fs_guid']
+            nv_storage = 'TRUE' if fv_info['nv_storage'] else 'FALSE'
+            compress = 'TRUE' if any(ffs_file['compressed'] for ffs_file in ffs_files) else 'FALSE'
+            
+            report_file.write(f"<FV:{fv_count}, GUID:{fv_guid}, Attribute:0x{fv_info['attributes']:X}, "
+                              f"Data Offset:0x{fv_info['offset']:X}, Size:0x{fv_info['size']:X}, "
+                              f"Free Space:0x{fv_info['free_space']:X}, NV Storage:{nv_storage}, "
+                              f"Compress:{compress}>\n")
+            
+            if ffs_files:
+                report_file.write(f"  {'Type':<24}{'Name':<40}{'GUID':<40}{'Size':<12}Offset\n")
+            
+            for ffs_file in ffs_files:
+                # 没有用户界面节的文件使用GUID索引中的模块名称
+                ffs_name = ffs_file['name'] or self.guid_index.name(ffs_file['guid'], default='(null)')
+                ffs_size = f"0x{ffs_file['size']:X}"
+                report_file.write(f"  {ffs_file['type_name']:<24}{ffs_name:<40}{ffs_file['guid']:<40}"
+                                  f"{ffs_size:<12}0x{ffs_file['offset']:X}\n")
+            
+            report_file.write("\n")
+            
+            fv_count += 1
+        
+        return fv_count
+    
+    def _write_nvram_report(self, report_file, nvram_parse):
+        """写出NvStorage固件卷中的有效UEFI变量"""
+        variables = nvram_parse.find()
+        
+        if not variables:
+            return
+        
+        report_file.write(f"[NVRAM] {len(variables)} 个变量\n")
+        report_file.write(f"  {'Name':<40}{'GUID':<40}{'Attributes':<24}{'Size':<12}Offset\n")
+        
+        for variable in sorted(variables, key=lambda variable: variable.offset):
+            var_size = f"0x{variable.data_size:X}"
+            report_file.write(f"  {variable.name:<40}{variable.guid:<40}{variable.attribute_text():<24}"
+                              f"{var_size:<12}0x{variable.offset:X}\n")
+        
+        report_file.write("\n")
+    
+    def _write_section_report(self, report_file, section_results):
+        """写出压缩节的解压结果，以及解压后得到的嵌套固件卷"""
+        if not section_results:
+            return
+        
+        cached_count = sum(1 for section_result in section_results if section_result['cached'])
+        
+        report_file.write(f"压缩节: {len(section_results)} 个（缓存命中 {cached_count} 个）\n")
+        report_file.write(f"  {'Method':<10}{'Name':<40}{'Offset':<12}{'Size':<12}{'Decompressed':<14}Output\n")
+        
+        for section_result in section_results:
+            sec_size = f"0x{section_result['size']:X}"
+            
+            if section_result['path'] is None:
+                out_size, out_name = '-', '解压失败'
+            else:
+                out_size, out_name = f"0x{section_result['out_size']:X}", os.path.basename(section_result['path'])
+            
+            report_file.write(f"  {section_result['method']:<10}{section_result['label']:<40}"
+                              f"0x{section_result['offset']:<10X}{sec_size:<12}{out_size:<14}{out_name}\n")
+        
+        report_file.write("\n")
+        
+        for section_result in section_results:
+            if section_result['path'] is None:
+                continue
+            
+            section_data = InsydeTexts.file_to_mmap(section_result['path'])
+            
+            try:
+                fv_report = io.StringIO()
+                
+                if self._write_fv_report(fv_report, UefiFvParse(section_data)):
+                    report_file.write(f"[{os.path.basename(section_result['path'])}]\n")
+                    report_file.write(fv_report.getvalue())
+            finally:
+                if isinstance(section_data, mmap.mmap):
+                    section_data.close()
+    
+    def _write_strings_report(self, report_file, bios_data):
+        """提取前100个可打印字符串"""
+        printable_chars = re.compile(b'[ -~]{8,}')  # 至少8个可打印ASCII字符
+        
+        report_file.write("发现的字符串:\n")
+        # 逐个匹配，找到前100个字符串后即停止扫描
+        for i, match in enumerate(printable_chars.finditer(bios_data)):
+            if i >= 100:  # 限制为前100个字符串
+                break
+            try:
+                decoded = match.group().decode('utf-8', errors='replace')
+                report_file.write(f"{i+1}. {decoded}\n")
+            except:
+                continue
+    
+    def _get_extracted_files(self, extract_path):
+        """获取提取目录中的文件列表"""
+        extracted_files = []
+        
+        for root, dirs, files in os.walk(extract_path):
+            for file in files:
+                file_path = os.path.join(root, file)
+                rel_path = os.path.relpath(file_path, extract_path)
+                size = os.path.getsize(file_path)
+                
+                # 格式化文件大小
+                if size < 1024:
+                    size_str = f"{size} B"
+                elif size < 1024 * 1024:
+                    size_str = f"{size/1024:.1f} KB"
+                else:
+                    size_str = f"{size/(1024*1024):.1f} MB"
+                
+                extracted_files.append({
+                    "name": rel_path,
+                    "path": file_path,
+                    "size": size_str
+                })
+        
+        return extracted_files
+
+    def _get_cached_files(self, cache_entry):
+        """根据缓存条目的文件清单生成文件列表，不再遍历提取目录"""
+        return [{
+            "name": rel_path,
+            "path": os.path.join(cache_entry['extract_path'], rel_path),
+            "size": self._format_file_size(file_size)
+        } for rel_path, file_size, _ in cache_entry['files']]
+    
+    def _format_file_size(self, size):
+        """格式化文件大小"""
+        if size < 1024:
+            return f"{size} B"
+        elif size < 1024 * 1024:
+            return f"{size/1024:.1f} KB"
+        else:
+            return f"{size/(1024*1024):.1f} MB"
+
+# H2OUVE设置记录类
+class UveSetting:
+    """H2OUVE -gv导出文件中的单个设置项"""
+    
+    __slots__ = ('name', 'variable', 'offset', 'size', 'value', 'option', 'options')
+    
+    def __init__(self, name=None, variable=None, offset=None, size=None, value=None, option=None, options=None):
+        self.name = name
+        self.variable = variable
+        self.offset = offset
+        self.size = size
+        self.value = value          # 当前值，选项类设置为选中选项的值
+        self.option = option        # 选中选项的名称
+        self.options = options or []  # [(值, 名称), ...]
+    
+    def key(self):
+        """设置项在变量中的位置，用于跨备份比对同一设置"""
+        return self.variable, self.offset, self.name
+
+
+# H2OUVE变量备份解析类 - 流式解析-gv导出的设置文件
+class UveSettingParse:
+    """逐行解析H2OUVE -gv导出文件，每个设置块产出一个UveSetting，不需要整体读入文件
+    
+    设置块由分隔线或新的Setting行分隔，块内为"键 : 值"行，选项行以*标记当前选中项，例如：
+        Setting     :  "Boot Type"
+        Variable    :  0x0003 SystemConfig
+        Offset      :  0x00000005 / 0x0005
+        Size        :  1
+        Options     :  [0x00]UEFI Boot Type
+                    *  [0x01]Legacy Boot Type
+    """
+    
+    # 各版本H2OUVE使用的键名 -> UveSetting字段
+    FIELD_KEYS = {
+        'setting': 'name',
+        'settingname': 'name',
+        'name': 'name',
+        'prompt': 'name',
+        'variable': 'variable',
+        'variablename': 'variable',
+        'varstore': 'variable',
+        'offset': 'offset',
+        'variableoffset': 'offset',
+        'size': 'size',
+        'value': 'value',
+        'currentvalue': 'value',
+        'options': 'options',
+        'option': 'options'
+    }
+    
+    PAT_SEPARATOR = re.compile(r'^\s*[-=*#/]{5,}')
+    PAT_FIELD = re.compile(r'^\s*([A-Za-z][A-Za-z ]*?)\s*:\s*(.*?)\s*$')
+    PAT_OPTION = re.compile(r'^\s*(\*)?\s*:?\s*(\*)?\s*\[?(0x[0-9A-Fa-f]+|\d+)\]?\s*(.*?)\s*$')
+    PAT_NUMBER = re.compile(r'0x[0-9A-Fa-f]+|\d+')
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+    
+    def __iter__(self):
+        return self.settings()
+    
+    def settings(self):
+        """依次产出文件中的设置项"""
+        setting = UveSetting()
+        in_options = False
+        
+        with open(self.file_path, 'r', encoding='utf-8', errors='replace') as backup_file:
+            for line in backup_file:
+                if self.PAT_SEPARATOR.match(line):
+                    if self._complete(setting):
+                        yield setting
+                    
+                    setting = UveSetting()
+                    in_options = False
+                    continue
+                
+                field_match = self.PAT_FIELD.match(line)
+                field_name = self.FIELD_KEYS.get(field_match.group(1).replace(' ', '').lower()) if field_match else None
+                
+                if field_name is None:
+                    # 选项的后续行
+                    if in_options and self._add_option(setting, line):
+                        continue
+                    
+                    in_options = False
+                    continue
+                
+                field_value = field_match.group(2)
+                
+                # 同一块中出现第二个Setting行说明上一个设置块已结束
+                if field_name == 'name' and setting.name is not None:
+                    if self._complete(setting):
+                        yield setting
+                    
+                    setting = UveSetting()
+                
+                in_options = field_name == 'options'
+                
+                if in_options:
+                    self._add_option(setting, field_value)
+                elif field_name == 'name':
+                    setting.name = field_value.strip('"')
+                elif field_name == 'variable':
+                    # "0x0003 SystemConfig"形式时去掉变量存储编号
+                    variable_parts = field_value.split()
+                    
+                    if len(variable_parts) > 1 and self.PAT_NUMBER.fullmatch(variable_parts[0]):
+                        variable_parts = variable_parts[1:]
+                    
+                    setting.variable = ' '.join(variable_parts)
+                else:
+                    setattr(setting, field_name, self._number(field_value))
+        
+        if self._complete(setting):
+            yield setting
+    
+    def _add_option(self, setting, line):
+        """解析一行选项，返回是否为选项行"""
+        option_match = self.PAT_OPTION.match(line)
+        
+        if not option_match:
+            return False
+        
+        option_value = int(option_match.group(3), 0)
+        option_name = option_match.group(4)
+        
+        setting.options.append((option_value, option_name))
+        
+        if option_match.group(1) or option_match.group(2):
+            setting.value = option_value
+            setting.option = option_name
+        
+        return True
+    
+    def _number(self, text):
+        """取文本中的第一个数值（"0x00000005 / 0x0005"取0x5），不含数值时返回原文本"""
+        number_match = self.PAT_NUMBER.search(text)
+        
+        return int(number_match.group(), 0) if number_match else text
+    
+    @staticmethod
+    def _complete(setting):
+        return setting.name is not None or setting.variable is not None
+
+
+# H2OUVE设置索引类 - 在所有备份中快速检索设置项
+class UveSettingStore:
+    """将备份目录中各备份文件的设置项保存到SQLite索引，文件大小与修改时间未变时不重新解析"""
+    
+    DB_NAME = '.settings_index.sqlite'
+    
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS backups (id INTEGER PRIMARY KEY, file_name TEXT UNIQUE, size INTEGER, mtime REAL)',
+        'CREATE TABLE IF NOT EXISTS settings (backup_id INTEGER, name TEXT, variable TEXT, offset INTEGER, '
+        'size INTEGER, value TEXT, option TEXT)',
+        'CREATE INDEX IF NOT EXISTS settings_name ON settings (name)',
+        'CREATE INDEX IF NOT EXISTS settings_location ON settings (variable, offset)',
+        'CREATE INDEX IF NOT EXISTS settings_backup ON settings (backup_id)'
+    )
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(BACKUP_DIR, self.DB_NAME)
+        self._lock = threading.Lock()
+    
+    def sync(self, backup_files):
+        """按(路径, 文件名, 大小, 修改时间)列表同步索引：解析新增或已修改的备份，移除已删除的备份"""
+        with self._lock, contextlib.closing(self._connect()) as db_conn, db_conn:
+            indexed = {file_name: (backup_id, size, mtime) for backup_id, file_name, size, mtime
+                       in db_conn.execute('SELECT id, file_name, size, mtime FROM backups')}
+            
+            current = set()
+            
+            for file_path, file_name, size, mtime in backup_files:
+                current.add(file_name)
+                
+                indexed_entry = indexed.get(file_name)
+                
+                if indexed_entry is not None and indexed_entry[1:] == (size, mtime):
+                    continue
+                
+                if indexed_entry is not None:
+                    self._drop_backup(db_conn, indexed_entry[0])
+                
+                self._index_backup(db_conn, file_path, file_name, size, mtime)
+            
+            for file_name in set(indexed) - current:
+                self._drop_backup(db_conn, indexed[file_name][0])
+    
+    def search(self, name=None, variable=None, offset=None, limit=1000):
+        """按设置名称（不区分大小写的子串）、变量名和偏移检索，返回匹配项及其所在的备份文件名"""
+        conditions = []
+        arguments = []
+        
+        if name:
+            conditions.append("s.name LIKE ? ESCAPE '\\'")
+            arguments.append('%' + re.sub(r'([%_\\])', r'\\\1', name) + '%')
+        
+        if variable:
+            conditions.append('s.variable = ?')
+            arguments.append(variable)
+        
+        if offset is not None:
+            conditions.append('s.offset = ?')
+            arguments.append(offset)
+        
+        query = ('SELECT b.file_name, s.name, s.variable, s.offset, s.size, s.value, s.option '
+                 'FROM settings s JOIN backups b ON s.backup_id = b.id')
+        
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        
+        query += ' ORDER BY b.mtime DESC, s.variable, s.offset LIMIT ?'
+        arguments.append(limit)
+        
+        with self._lock, contextlib.closing(self._connect()) as db_conn:
+            return [dict(zip(('file', 'name', 'variable', 'offset', 'size', 'value', 'option'), row))
+                    for row in db_conn.execute(query, arguments)]
+    
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        
+        db_conn = sqlite3.connect(self.db_path)
+        
+        for statement in self.SCHEMA:
+            db_conn.execute(statement)
+        
+        return db_conn
+    
+    @staticmethod
+    def _drop_backup(db_conn, backup_id):
+        db_conn.execute('DELETE FROM settings WHERE backup_id = ?', (backup_id,))
+        db_conn.execute('DELETE FROM backups WHERE id = ?', (backup_id,))
+    
+    @staticmethod
+    def _index_backup(db_conn, file_path, file_name, size, mtime):
+        try:
+            settings = [(setting.name, setting.variable, setting.offset, setting.size,
+                         None if setting.value is None else str(setting.value), setting.option)
+                        for setting in UveSettingParse(file_path)]
+        except OSError as e:
+            logging.warning(f"无法解析备份文件 {file_path}: {str(e)}")
+            return
+        
+        backup_id = db_conn.execute('INSERT INTO backups (file_name, size, mtime) VALUES (?, ?, ?)',
+                                    (file_name, size, mtime)).lastrowid
+        
+        db_conn.executemany('INSERT INTO settings (backup_id, name, variable, offset, size, value, option) '
+                            'VALUES (?, ?, ?, ?, ?, ?, ?)', [(backup_id,) + setting for setting in settings])
+
+
+# 微码索引类 - 记录BIOS镜像中携带的微码，按CPUID检索
+class MicrocodeIndex:
+    """将BIOSBackup和BIOSExtract中各镜像携带的微码保存到SQLite索引（CPUID -> 版本），文件大小与修改时间未变时不重新扫描"""
+    
+    DB_NAME = '.microcode_index.sqlite'
+    
+    # 参与索引的镜像扩展名，与界面中的固件文件列表一致
+    IMAGE_EXTS = ('.bin', '.fd', '.rom')
+    
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS images (id INTEGER PRIMARY KEY, path TEXT UNIQUE, size INTEGER, mtime REAL)',
+        'CREATE TABLE IF NOT EXISTS updates (image_id INTEGER, cpuid INTEGER, platform_ids INTEGER, '
+        'revision INTEGER, date TEXT, offset INTEGER, total_size INTEGER, valid INTEGER)',
+        'CREATE INDEX IF NOT EXISTS updates_cpuid ON updates (cpuid, revision)',
+        'CREATE INDEX IF NOT EXISTS updates_image ON updates (image_id)'
+    )
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(BIOS_BACKUP_DIR, self.DB_NAME)
+        self._lock = threading.Lock()
+    
+    def sync(self, image_files):
+        """按(路径, 文件名, 大小, 修改时间)列表同步索引：扫描新增或已修改的镜像，移除已删除的镜像，返回扫描的镜像数"""
+        scanned_count = 0
+        
+        with self._lock, contextlib.closing(self._connect()) as db_conn, db_conn:
+            indexed = {image_path: (image_id, size, mtime) for image_id, image_path, size, mtime
+                       in db_conn.execute('SELECT id, path, size, mtime FROM images')}
+            
+            current = set()
+            
+            for file_path, _, size, mtime in image_files:
+                image_path = os.path.normpath(file_path)
+                current.add(image_path)
+                
+                indexed_entry = indexed.get(image_path)
+                
+                if indexed_entry is not None and indexed_entry[1:] == (size, mtime):
+                    continue
+                
+                if indexed_entry is not None:
+                    self._drop_image(db_conn, indexed_entry[0])
+                
+                self._index_image(db_conn, image_path, size, mtime)
+                scanned_count += 1
+            
+            for image_path in set(indexed) - current:
+                self._drop_image(db_conn, indexed[image_path][0])
+        
+        return scanned_count
+    
+    @classmethod
+    def image_files(cls, file_index):
+        """从文件索引获取EXTRACT_DIR目录树及BIOS_BACKUP_DIR目录中的固件镜像：[(路径, 文件名, 大小, 修改时间)]"""
+        indexed_files = file_index.files(EXTRACT_DIR) + file_index.files(BIOS_BACKUP_DIR, recursive=False)
+        
+        return [indexed_file for indexed_file in indexed_files if indexed_file[1].lower().endswith(cls.IMAGE_EXTS)]
+    
+    def lookup(self, cpuid, min_revision=None, platform_id=None, valid_only=True):
+        """检索携带指定CPUID微码的镜像（含扩展签名表中的CPUID），可限定最低版本和平台ID位，版本从高到低排列"""
+        conditions = ['u.cpuid = ?']
+        arguments = [cpuid]
+        
+        if min_revision is not None:
+            conditions.append('u.revision >= ?')
+            arguments.append(min_revision)
+        
+        if platform_id is not None:
+            conditions.append('(u.platform_ids & ?) != 0')
+            arguments.append(platform_id)
+        
+        if valid_only:
+            conditions.append('u.valid = 1')
+        
+        query = ('SELECT i.path, u.cpuid, u.platform_ids, u.revision, u.date, u.offset, u.total_size, u.valid '
+                 'FROM updates u JOIN images i ON u.image_id = i.id WHERE ' + ' AND '.join(conditions) +
+                 ' ORDER BY u.revision DESC, i.mtime DESC')
+        
+        with self._lock, contextlib.closing(self._connect()) as db_conn:
+            return [dict(zip(('path', 'cpuid', 'platform_ids', 'revision', 'date', 'offset', 'total_size', 'valid'),
+                             row)) for row in db_conn.execute(query, arguments)]
+    
+    def summary(self):
+        """按CPUID汇总索引中的最高版本和携带该CPUID微码的镜像数"""
+        query = ('SELECT cpuid, MAX(revision), COUNT(DISTINCT image_id) FROM updates WHERE valid = 1 '
+                 'GROUP BY cpuid ORDER BY cpuid')
+        
+        with self._lock, contextlib.closing(self._connect()) as db_conn:
+            return [dict(zip(('cpuid', 'revision', 'images'), row)) for row in db_conn.execute(query)]
+    
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        
+        db_conn = sqlite3.connect(self.db_path)
+        
+        for statement in self.SCHEMA:
+            db_conn.execute(statement)
+        
+        return db_conn
+    
+    @staticmethod
+    def _drop_image(db_conn, image_id):
+        db_conn.execute('DELETE FROM updates WHERE image_id = ?', (image_id,))
+        db_conn.execute('DELETE FROM images WHERE id = ?', (image_id,))
+    
+    @staticmethod
+    def _index_image(db_conn, image_path, size, mtime):
+        updates = []
+        
+        try:
+            image_buffer = InsydeTexts.file_to_mmap(image_path)
+            
+            try:
+                for ucode in MicrocodeScan(image_buffer).updates():
+                    # 扩展签名表中的CPUID与主签名共用同一版本
+                    for cpuid, platform_ids in [(ucode['cpuid'], ucode['platform_ids'])] + ucode['extended']:
+                        updates.append((cpuid, platform_ids, ucode['revision'], ucode['date'], ucode['offset'],
+                                        ucode['total_size'], int(ucode['valid'])))
+            finally:
+                if isinstance(image_buffer, mmap.mmap):
+                    image_buffer.close()
+        except (OSError, ValueError) as e:
+            logging.warning(f"无法扫描镜像文件 {image_path}: {str(e)}")
+            return
+        
+        image_id = db_conn.execute('INSERT INTO images (path, size, mtime) VALUES (?, ?, ?)',
+                                   (image_path, size, mtime)).lastrowid
+        
+        db_conn.executemany('INSERT INTO updates (image_id, cpuid, platform_ids, revision, date, offset, total_size, '
+                            'valid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', [(image_id,) + update for update in updates])
+
+
+# H2OUVE备份比较类 - 报告两个备份之间变更、新增和删除的设置项
+class UveSettingDiff:
+    """按变量分组比较两个备份，变量块的内容哈希相同时整块跳过，只对哈希不同的变量逐项比较"""
+    
+    def __init__(self, old_path, new_path):
+        self.old_path = old_path
+        self.new_path = new_path
+        
+        # 比较完成后为哈希相同而跳过的变量数
+        self.skipped_variables = 0
+    
+    def changes(self):
+        """依次产出差异记录，kind为changed、added或removed"""
+        old_blocks = self._variable_blocks(self.old_path)
+        new_blocks = self._variable_blocks(self.new_path)
+        
+        self.skipped_variables = 0
+        
+        for variable in sorted(old_blocks.keys() | new_blocks.keys(), key=str):
+            old_hash, old_settings = old_blocks.get(variable, (None, {}))
+            new_hash, new_settings = new_blocks.get(variable, (None, {}))
+            
+            if old_hash == new_hash:
+                self.skipped_variables += 1
+                continue
+            
+            for setting_key in sorted(old_settings.keys() | new_settings.keys(), key=self._setting_order):
+                old_setting = old_settings.get(setting_key)
+                new_setting = new_settings.get(setting_key)
+                
+                if old_setting is None:
+                    kind = 'added'
+                elif new_setting is None:
+                    kind = 'removed'
+                elif (old_setting.value, old_setting.size) != (new_setting.value, new_setting.size):
+                    kind = 'changed'
+                else:
+                    continue
+                
+                any_setting = new_setting or old_setting
+                
+                yield {
+                    'kind': kind,
+                    'variable': variable or '',
+                    'offset': any_setting.offset if isinstance(any_setting.offset, int) else -1,
+                    'name': any_setting.name or '',
+                    'oldValue': self._display_value(old_setting),
+                    'newValue': self._display_value(new_setting)
+                }
+    
+    @staticmethod
+    def _variable_blocks(file_path):
+        """解析备份并按变量分组，返回 变量 -> (块哈希, {(偏移, 名称): 设置项})"""
+        block_hashes = {}
+        blocks = {}
+        
+        for setting in UveSettingParse(file_path):
+            if setting.variable not in blocks:
+                block_hashes[setting.variable] = hashlib.sha1()
+                blocks[setting.variable] = {}
+            
+            block_hashes[setting.variable].update(repr((setting.name, setting.offset, setting.size,
+                                                        setting.value)).encode('utf-8'))
+            blocks[setting.variable][(setting.offset, setting.name)] = setting
+        
+        return {variable: (block_hashes[variable].digest(), blocks[variable]) for variable in blocks}
+    
+    @staticmethod
+    def _setting_order(setting_key):
+        """按偏移、名称排序，偏移缺失的设置排在最前"""
+        setting_offset, setting_name = setting_key
+        
+        return setting_offset if isinstance(setting_offset, int) else -1, setting_name or ''
+    
+    @staticmethod
+    def _display_value(setting):
+        """选项类设置显示选项名称及其值，其余显示原值"""
+        if setting is None or setting.value is None:
+            return ''
+        
+        value_text = f'0x{setting.value:X}' if isinstance(setting.value, int) else str(setting.value)
+        
+        return f'{setting.option} ({value_text})' if setting.option else value_text
+
+
+# 文件索引类 - 为数据目录的文件列表提供增量更新的内存索引
+class FileIndex:
+    """用os.scandir一次性建立数据目录的文件索引，之后只按发生变化的文件或目录增量更新"""
+    
+    def __init__(self):
+        # 目录路径 -> {文件名: (大小, 修改时间)}
+        self._dirs = {}
+        self._lock = threading.Lock()
+        
+        # 每次索引内容变化时递增，供调用方判断缓存的列表是否过期
+        self.version = 0
+    
+    @staticmethod
+    def _key(in_path):
+        """将路径统一为相对当前目录的规范形式，与各数据目录常量的写法一致"""
+        abs_path = os.path.abspath(in_path)
+        
+        try:
+            return os.path.normpath(os.path.relpath(abs_path))
+        except ValueError:
+            return abs_path
+    
+    def scan_tree(self, dir_path):
+        """递归扫描目录并替换其在索引中的全部内容，返回扫描到的目录列表"""
+        dir_key = self._key(dir_path)
+        
+        scanned = {}
+        pending = [dir_key]
+        
+        while pending:
+            current_dir = pending.pop()
+            dir_files = {}
+            
+            try:
+                with os.scandir(current_dir) as dir_entries:
+                    for dir_entry in dir_entries:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            pending.append(os.path.join(current_dir, dir_entry.name))
+                        elif dir_entry.is_file():
+                            entry_stat = dir_entry.stat()
+                            dir_files[dir_entry.name] = (entry_stat.st_size, entry_stat.st_mtime)
+            except OSError:
+                continue
+            
+            scanned[current_dir] = dir_files
+        
+        with self._lock:
+            self._drop_tree(dir_key)
+            self._dirs.update(scanned)
+            self.version += 1
+        
+        return list(scanned)
+    
+    def rescan_dir(self, dir_path):
+        """只重新扫描单个目录的直接内容，新增子目录递归扫描，消失的子目录从索引中移除"""
+        dir_key = self._key(dir_path)
+        
+        if not os.path.isdir(dir_key):
+            self.remove_tree(dir_key)
+            return []
+        
+        dir_files = {}
+        sub_dirs = set()
+        
+        with os.scandir(dir_key) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    sub_dirs.add(os.path.join(dir_key, dir_entry.name))
+                elif dir_entry.is_file():
+                    entry_stat = dir_entry.stat()
+                    dir_files[dir_entry.name] = (entry_stat.st_size, entry_stat.st_mtime)
+        
+        with self._lock:
+            known_dirs = {known_dir for known_dir in self._dirs if os.path.dirname(known_dir) == dir_key}
+            
+            for gone_dir in known_dirs - sub_dirs:
+                self._drop_tree(gone_dir)
+            
+            self._dirs[dir_key] = dir_files
+            self.version += 1
+        
+        new_dirs = [dir_key]
+        
+        for added_dir in sub_dirs - known_dirs:
+            new_dirs.extend(self.scan_tree(added_dir))
+        
+        return new_dirs
+    
+    def update_file(self, file_path):
+        """文件被创建或修改后更新其索引项"""
+        file_key = self._key(file_path)
+        dir_key = os.path.dirname(file_key)
+        
+        try:
+            file_stat = os.stat(file_key)
+        except OSError:
+            self.remove_file(file_key)
+            return
+        
+        with self._lock:
+            self._dirs.setdefault(dir_key, {})[os.path.basename(file_key)] = (file_stat.st_size, file_stat.st_mtime)
+            self.version += 1
+    
+    def remove_file(self, file_path):
+        """文件被删除后移除其索引项"""
+        file_key = self._key(file_path)
+        
+        with self._lock:
+            self._dirs.get(os.path.dirname(file_key), {}).pop(os.path.basename(file_key), None)
+            self.version += 1
+    
+    def file_info(self, file_path):
+        """返回单个已索引文件的(路径, 文件名, 大小, 修改时间)，未索引时返回None"""
+        file_key = self._key(file_path)
+        
+        with self._lock:
+            file_stat = self._dirs.get(os.path.dirname(file_key), {}).get(os.path.basename(file_key))
+        
+        if file_stat is None:
+            return None
+        
+        return (file_key, os.path.basename(file_key), *file_stat)
+    
+    def rename_file(self, old_path, new_path):
+        """文件被重命名后更新索引项"""
+        self.remove_file(old_path)
+        self.update_file(new_path)
+    
+    def remove_tree(self, dir_path):
+        """目录被删除后移除其及所有子目录的索引项"""
+        with self._lock:
+            self._drop_tree(self._key(dir_path))
+            self.version += 1
+    
+    def files(self, dir_path, recursive=True):
+        """返回目录下已索引的文件：[(路径, 文件名, 大小, 修改时间)]"""
+        dir_key = self._key(dir_path)
+        dir_prefix = dir_key + os.sep
+        
+        with self._lock:
+            return [(os.path.join(indexed_dir, file_name), file_name, file_size, file_mtime)
+                    for indexed_dir, dir_files in self._dirs.items()
+                    if indexed_dir == dir_key or (recursive and indexed_dir.startswith(dir_prefix))
+                    for file_name, (file_size, file_mtime) in dir_files.items()]
+    
+    def _drop_tree(self, dir_key):
+        """移除目录及其子目录的索引项（调用方需持有锁）"""
+        dir_prefix = dir_key + os.sep
+        
+        for indexed_dir in [indexed_dir for indexed_dir in self._dirs
+                            if indexed_dir == dir_key or indexed_dir.startswith(dir_prefix)]:
+            del self._dirs[indexed_dir]
+
+
+# 启动耗时记录类 - 跟踪冷启动各阶段的耗时变化
+class StartupProfiler:
+    """按阶段记录启动耗时并写入JSON文件，未指定输出文件时不做任何记录"""
+    
+    ARG_NAME = '--profile-startup'
+    ENV_NAME = 'INSYDE_STARTUP_PROFILE'
+    DEFAULT_NAME = 'startup_profile.json'
+    
+    def __init__(self, output_path=None, start_time=None):
+        self.output_path = output_path
+        self.start_time = time.perf_counter() if start_time is None else start_time
+        self.phases = []
+    
+    @classmethod
+    def from_args(cls, argv, start_time=None):
+        """由命令行参数--profile-startup[=文件]或环境变量INSYDE_STARTUP_PROFILE启用"""
+        output_path = os.environ.get(cls.ENV_NAME) or None
+        
+        for arg in argv[1:]:
+            if arg == cls.ARG_NAME:
+                output_path = cls.DEFAULT_NAME
+            elif arg.startswith(cls.ARG_NAME + '='):
+                output_path = arg.split('=', 1)[1] or cls.DEFAULT_NAME
+        
+        return cls(output_path=output_path, start_time=start_time)
+    
+    @property
+    def enabled(self):
+        return bool(self.output_path)
+    
+    @contextlib.contextmanager
+    def phase(self, phase_name):
+        """记录with块的耗时"""
+        phase_bgn = time.perf_counter()
+        
+        try:
+            yield
+        finally:
+            self.record(phase_name, phase_bgn)
+    
+    def record(self, phase_name, phase_bgn, phase_end=None):
+        """记录一个阶段，phase_bgn/phase_end为time.perf_counter()的值"""
+        if not self.enabled:
+            return
+        
+        phase_end = time.perf_counter() if phase_end is None else phase_end
+        
+        self.phases.append({
+            'name': phase_name,
+            'start': round(phase_bgn - self.start_time, 6),
+            'duration': round(phase_end - phase_bgn, 6)
+        })
+    
+    def write(self):
+        """写入记录的各阶段耗时，写入失败只记录日志"""
+        if not self.enabled:
+            return
+        
+        profile_data = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'total': round(time.perf_counter() - self.start_time, 6),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'frozen': bool(getattr(sys, 'frozen', False)),
+            'phases': self.phases
+        }
+        
+        try:
+            with open(self.output_path, 'w', encoding='utf-8') as profile_file:
+                json.dump(profile_data, profile_file, ensure_ascii=False, indent=2)
+            
+            logging.info(f"启动耗时已写入: {os.path.abspath(self.output_path)}")
+        except OSError as e:
+            logging.warning(f"无法写入启动耗时文件: {str(e)}")
+
+
+# 以下是原代码，删除了对BIOSUtilities的外部依赖
+def is_admin():
+    """检查是否具有管理员权限"""
+    try:
+        return ctypes.windll.shell32.IsUserAnAdmin() != 0
+    except:
+        return False
+
+def run_as_admin():
+    """以管理员权限重新启动程序"""
+    try:
+        # 获取当前脚本的完整路径
+        script = os.path.abspath(sys.argv[0])
+        params = ' '.join(sys.argv[1:])
+        
+        # 记录日志
+        logging.info(f"尝试以管理员权限重启程序")
+        logging.debug(f"脚本路径: {script}")
+        logging.debug(f"参数: {params}")
+        
+        # 使用ShellExecuteW以管理员权限启动程序
+        logging.debug("调用ShellExecuteW以管理员权限启动程序")
+        ret = ctypes.windll.shell32.ShellExecuteW(
+            None, 
+            "runas", 
+            sys.executable, 
+            f'"{script}" {params}', 
+            None, 
+            1  # SW_SHOWNORMAL
+        )
+        
+        # 检查返回值
+        if ret <= 32:  # 如果返回值小于等于32，表示发生错误
+            error_msg = f"ShellExecuteW返回错误代码: {ret}"
+            logging.error(error_msg)
+        else:
+            logging.info(f"ShellExecuteW调用成功，返回值: {ret}")
+    except Exception as e:
+        error_msg = f"以管理员权限重启时出错: {str(e)}"
+        logging.exception(error_msg)
+
+def get_resource_path(relative_path):
+    """获取资源文件的绝对路径，支持打包后的路径解析"""
+    try:
+        # PyInstaller创建一个临时文件夹并将路径保存在_MEIPASS中
+        base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+        logging.debug(f"资源基础路径: {base_path}")
+        abs_path = os.path.join(base_path, relative_path)
+        logging.debug(f"资源绝对路径: {abs_path}")
+        return abs_path
+    except Exception as e:
+        logging.exception(f"获取资源路径出错: {str(e)}")
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), relative_path)
+
+def get_exe_path(exe_name):
+    """获取可执行文件的绝对路径，考虑打包后的环境；结果由ToolRegistry缓存，找不到时返回当前目录下的默认路径"""
+    return ToolRegistry.shared().path(exe_name)
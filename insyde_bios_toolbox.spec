@@ -39,8 +39,15 @@ dll_files = [
     ('Pmxdll.dll', '.')
 ]
 
+# 收集模块GUID名称索引使用的层CSV
+runtime_files = [
+    ('runtime/KernelLayer.csv', 'runtime'),
+    ('runtime/ChipsetLayer.csv', 'runtime'),
+    ('runtime/PlatformOEMLayer.csv', 'runtime')
+]
+
 # 合并所有数据文件
-datas = qml_files + icon_files + exe_files + dll_files
+datas = qml_files + icon_files + exe_files + dll_files + runtime_files
 
 # 添加BIOSUtilities模块
 biosutils_path = os.path.join(current_dir, "BIOSUtilities-main", "BIOSUtilities-main")
@@ -60,7 +67,7 @@ a = Analysis(
     pathex=[current_dir],
     binaries=[],
     datas=datas,
-    hiddenimports=['PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtCore', 'PyQt5.QtGui'],
+    hiddenimports=['PyQt5.QtQml', 'PyQt5.QtQuick', 'PyQt5.QtCore', 'PyQt5.QtGui', 'insyde_bios_backend', 'py7zr'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
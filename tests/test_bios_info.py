@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""基本解析报告bios_info.txt的编码测试"""
+
+import builtins
+import struct
+import uuid
+
+import insyde_bios_core
+from insyde_bios_core import BiosExtractor
+
+SETUP_GUID = 'EC87D643-EBA4-4BB5-A1E5-3F3E36B20DA9'
+NVRAM_FS_GUID = 'FFF12B8D-7696-4C8B-A985-2747075B4F50'
+
+
+def make_variable(name_data, data, guid=SETUP_GUID):
+    header = struct.pack('<HBBIII', 0x55AA, 0x3F, 0, 0x7, len(name_data), len(data)) + uuid.UUID(guid).bytes_le
+    variable = header + name_data + data
+
+    return variable + b'\xFF' * (-len(variable) % 4)
+
+
+def make_store(variables, size=0x1000):
+    store = b'$VSS' + struct.pack('<IBBHI', size, 0x5A, 0xFE, 0, 0) + b''.join(variables)
+
+    return store + b'\xFF' * (size - len(store))
+
+
+def make_volume(payload, fs_guid=NVRAM_FS_GUID):
+    header_size = 0x48
+    volume_size = header_size + len(payload)
+    volume_size += -volume_size % 0x1000
+
+    header = bytearray(b'\x00' * 16 + uuid.UUID(fs_guid).bytes_le +
+                       struct.pack('<Q4sIHHHBB', volume_size, b'_FVH', 0x4FEFF, header_size, 0, 0, 0, 2) +
+                       struct.pack('<II', volume_size // 0x1000, 0x1000) + b'\x00' * 8)
+    header[0x32:0x34] = struct.pack('<H', -sum(struct.unpack(f'<{header_size // 2}H', header)) & 0xFFFF)
+
+    volume = bytes(header) + payload
+
+    return volume + b'\xFF' * (volume_size - len(volume))
+
+
+def test_report_with_replacement_characters_under_gbk_locale(tmp_path, monkeypatch):
+    # 变量名含单独的UTF-16代理项，解码为U+FFFD，GBK无法编码该字符
+    name_data = 'Setup'.encode('utf-16-le') + b'\x00\xD8' + b'\x00\x00'
+    image = b'\xFF' * 0x1000 + make_volume(make_store([make_variable(name_data, b'\x01\x02')]))
+
+    image_path = tmp_path / 'image.bin'
+    image_path.write_bytes(image)
+
+    # 模拟区域设置编码为GBK的Windows：未指定encoding的open按GBK写入
+    def gbk_open(file, mode='r', *args, encoding=None, **kwargs):
+        if 'b' not in mode and encoding is None:
+            encoding = 'gbk'
+
+        return builtins.open(file, mode, *args, encoding=encoding, **kwargs)
+
+    monkeypatch.setattr(insyde_bios_core, 'open', gbk_open, raising=False)
+    monkeypatch.chdir(tmp_path)
+
+    success, message, _ = BiosExtractor(max_workers=1).parse_bios_file(str(image_path),
+                                                                      extract_path=str(tmp_path / 'out'))
+
+    assert success, message
+
+    bios_info = (tmp_path / 'out' / 'bios_info.txt').read_text(encoding='utf-8')
+
+    assert 'Setup�' in bios_info
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+"""命令行参数与处理模式测试"""
+
+import json
+
+import pytest
+
+import insyde_bios_cli
+
+
+def test_nvram_does_not_consume_input():
+    args = insyde_bios_cli.parse_args(['--nvram', 'img.bin'])
+
+    assert args.nvram and args.nvram_name is None
+    assert args.inputs == ['img.bin']
+
+
+def test_nvram_name():
+    args = insyde_bios_cli.parse_args(['--nvram', '--nvram-name', 'Setup', 'img.bin'])
+
+    assert args.nvram_name == 'Setup'
+    assert args.inputs == ['img.bin']
+
+
+@pytest.mark.parametrize('argv', [
+    ['--inventory', '--nvram', 'img.bin'],
+    ['--inventory', '--find-microcode', '906EA'],
+    ['--nvram-name', 'Setup', 'img.bin'],
+    ['--find-microcode', '906EA', 'img.bin'],
+    [],
+])
+def test_conflicting_modes_rejected(argv):
+    with pytest.raises(SystemExit) as exit_info:
+        insyde_bios_cli.parse_args(argv)
+
+    assert exit_info.value.code == 2
+
+
+def test_nvram_mode_end_to_end(tmp_path, monkeypatch, capsys):
+    # main会切换到-C指定的工作目录，测试结束后恢复
+    monkeypatch.chdir(tmp_path)
+
+    image_path = tmp_path / 'image.bin'
+    image_path.write_bytes(b'\xFF' * 0x1000)
+
+    assert insyde_bios_cli.main(['-j', '1', '-C', str(tmp_path / 'work'), '--nvram', str(image_path)]) == 0
+
+    file_result = json.loads(capsys.readouterr().out)
+
+    assert file_result['success']
+    assert file_result['variables'] == []
+
+
+def test_extract_hashes_file_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    image_path = tmp_path / 'image.bin'
+    image_path.write_bytes(b'\xFF' * 0x1000)
+
+    hashed_paths = []
+    file_key = insyde_bios_cli.ExtractCache.file_key
+
+    def counting_file_key(file_path):
+        hashed_paths.append(file_path)
+        return file_key(file_path)
+
+    monkeypatch.setattr(insyde_bios_cli.ExtractCache, 'file_key', staticmethod(counting_file_key))
+    monkeypatch.setattr(insyde_bios_cli, '_worker_extractor', insyde_bios_cli.BiosExtractor(max_workers=1))
+
+    file_result = insyde_bios_cli.process_file(str(image_path), 'BIOSExtract/image.bin_extracted')
+
+    assert file_result['success'], file_result['message']
+    assert hashed_paths == [str(image_path)]
+
+    # 第二次处理命中提取缓存，同样只计算一次哈希
+    file_result = insyde_bios_cli.process_file(str(image_path), 'BIOSExtract/image.bin_extracted')
+
+    assert '缓存' in file_result['message']
+    assert len(hashed_paths) == 2
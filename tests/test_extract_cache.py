@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""提取缓存的命中、失效、版本校验与索引锁测试"""
+
+import pytest
+
+import insyde_bios_core
+from insyde_bios_core import ExtractCache
+
+
+def make_extract(tmp_path, name='image_extracted'):
+    extract_path = tmp_path / name
+    extract_path.mkdir()
+    (extract_path / 'bios_info.txt').write_text('info', encoding='utf-8')
+
+    return str(extract_path)
+
+
+def test_store_then_lookup_hits(tmp_path):
+    cache = ExtractCache(cache_dir=str(tmp_path))
+    extract_path = make_extract(tmp_path)
+
+    cache.store('key', extract_path)
+
+    cache_entry = cache.lookup('key')
+
+    assert cache_entry['extract_path'] == extract_path
+    assert cache_entry['version'] == ExtractCache.FORMAT_VERSION
+
+
+def test_modified_extract_is_miss(tmp_path):
+    cache = ExtractCache(cache_dir=str(tmp_path))
+    extract_path = make_extract(tmp_path)
+
+    cache.store('key', extract_path)
+    (tmp_path / 'image_extracted' / 'bios_info.txt').write_text('changed info', encoding='utf-8')
+
+    assert cache.lookup('key') is None
+
+
+def test_format_version_mismatch_is_miss(tmp_path, monkeypatch):
+    cache = ExtractCache(cache_dir=str(tmp_path))
+    extract_path = make_extract(tmp_path)
+
+    cache.store('key', extract_path)
+
+    monkeypatch.setattr(ExtractCache, 'FORMAT_VERSION', ExtractCache.FORMAT_VERSION + 1)
+
+    assert cache.lookup('key') is None
+
+    # 版本不匹配的条目已从索引移除
+    assert 'key' not in cache._load_index()
+
+
+def test_entry_without_version_is_miss(tmp_path):
+    cache = ExtractCache(cache_dir=str(tmp_path))
+    extract_path = make_extract(tmp_path)
+
+    cache.store('key', extract_path)
+
+    cache_index = cache._load_index()
+    del cache_index['key']['version']
+    cache._save_index(cache_index)
+
+    assert cache.lookup('key') is None
+
+
+class FakeMsvcrt:
+    """模拟msvcrt.locking：前fail_count次加锁抛出OSError"""
+
+    LK_LOCK = 1
+    LK_UNLCK = 0
+
+    def __init__(self, fail_count):
+        self.fail_count = fail_count
+        self.lock_calls = 0
+        self.unlock_calls = 0
+
+    def locking(self, fileno, mode, nbytes):
+        if mode == self.LK_UNLCK:
+            self.unlock_calls += 1
+            return
+
+        self.lock_calls += 1
+
+        if self.lock_calls <= self.fail_count:
+            raise OSError(36, 'Resource deadlock avoided')
+
+
+def use_fake_msvcrt(monkeypatch, fail_count):
+    fake_msvcrt = FakeMsvcrt(fail_count)
+
+    monkeypatch.setattr(insyde_bios_core, 'msvcrt', fake_msvcrt, raising=False)
+    monkeypatch.setattr(insyde_bios_core.os, 'name', 'nt')
+    monkeypatch.setattr(ExtractCache, 'LOCK_RETRY_DELAY', 0)
+
+    return fake_msvcrt
+
+
+def test_windows_lock_retries_then_succeeds(tmp_path, monkeypatch):
+    fake_msvcrt = use_fake_msvcrt(monkeypatch, fail_count=2)
+
+    with ExtractCache(cache_dir=str(tmp_path))._index_lock():
+        pass
+
+    assert fake_msvcrt.lock_calls == 3
+    assert fake_msvcrt.unlock_calls == 1
+
+
+def test_windows_lock_gives_up_after_retries(tmp_path, monkeypatch):
+    fake_msvcrt = use_fake_msvcrt(monkeypatch, fail_count=ExtractCache.LOCK_RETRIES)
+
+    with pytest.raises(OSError):
+        with ExtractCache(cache_dir=str(tmp_path))._index_lock():
+            pass
+
+    assert fake_msvcrt.lock_calls == ExtractCache.LOCK_RETRIES
+    assert fake_msvcrt.unlock_calls == 0
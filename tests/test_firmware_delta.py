@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+"""固件差异测试：变化范围定位、大小不同的镜像与按顶层固件卷的区域归属"""
+
+import struct
+import uuid
+
+from insyde_bios_core import FirmwareDelta
+
+OUTER_FS_GUID = '8C8CE578-8A3D-4F1C-9935-896185C32DD3'
+INNER_FS_GUID = '5473C07A-3DCB-4DCA-BD6F-1E9689E7349A'
+
+
+def make_volume(payload, size, fs_guid):
+    header = bytearray(b'\x00' * 16 + uuid.UUID(fs_guid).bytes_le +
+                       struct.pack('<Q4sIHHHBB', size, b'_FVH', 0x4FEFF, 0x48, 0, 0, 0, 2) +
+                       struct.pack('<II', size // 0x1000, 0x1000) + b'\x00' * 8)
+    header[0x32:0x34] = struct.pack('<H', -sum(struct.unpack('<36H', header)) & 0xFFFF)
+
+    volume = bytes(header) + payload
+
+    return volume + b'\xFF' * (size - len(volume))
+
+
+def make_images(tmp_path):
+    """旧镜像0x4000字节；新镜像在顶层固件卷内(0x1800)和固件卷之外(0x3100)各改一个字节，并在末尾多出0x10字节"""
+    inner_volume = make_volume(b'', 0x1000, INNER_FS_GUID)
+    old_image = b'\xFF' * 0x1000 + make_volume(inner_volume, 0x2000, OUTER_FS_GUID) + b'\xFF' * 0x1000
+
+    new_image = bytearray(old_image + b'\x00' * 0x10)
+    new_image[0x1800] = 0x00
+    new_image[0x3100] = 0x00
+
+    old_path = tmp_path / 'old.bin'
+    new_path = tmp_path / 'new.bin'
+
+    old_path.write_bytes(old_image)
+    new_path.write_bytes(bytes(new_image))
+
+    return str(old_path), str(new_path)
+
+
+def test_compare_ranges_and_regions(tmp_path):
+    delta = FirmwareDelta(*make_images(tmp_path)).compare()
+
+    assert delta['old_size'] == 0x4000
+    assert delta['new_size'] == 0x4010
+
+    # 变化按块对齐，末尾多出的部分与最后一个变化块合并
+    assert delta['ranges'] == [(0x1000, 0x2000), (0x3000, 0x4010)]
+    assert delta['changed_bytes'] == 0x1000 + 0x1010
+
+    # 嵌套在顶层固件卷中的固件卷不单独统计
+    assert delta['regions'] == [
+        {'name': OUTER_FS_GUID, 'offset': 0x1000, 'size': 0x2000, 'changed_bytes': 0x1000},
+        {'name': FirmwareDelta.OUTSIDE_REGION, 'offset': -1, 'size': -1, 'changed_bytes': 0x1010}
+    ]
+
+
+def test_smaller_blocks_narrow_ranges(tmp_path):
+    delta = FirmwareDelta(*make_images(tmp_path), block_size=0x100).compare()
+
+    assert delta['ranges'] == [(0x1800, 0x1900), (0x3100, 0x3200), (0x4000, 0x4010)]
+    assert delta['changed_bytes'] == 0x100 + 0x100 + 0x10
+    assert [region['changed_bytes'] for region in delta['regions']] == [0x100, 0x110]
+
+
+def test_identical_images(tmp_path):
+    old_path, _ = make_images(tmp_path)
+
+    delta = FirmwareDelta(old_path, old_path).compare()
+
+    assert delta['ranges'] == []
+    assert delta['changed_bytes'] == 0
+    assert delta['regions'] == []
+
+
+def test_merge_ranges():
+    assert FirmwareDelta.merge_ranges([0x0, 0x1000, 0x3000], block_size=0x1000) == [(0x0, 0x2000), (0x3000, 0x4000)]
+    assert FirmwareDelta.merge_ranges([(0x0, 0x10), (0x8, 0x20), (0x20, 0x30), (0x40, 0x50)]) == [
+        (0x0, 0x30), (0x40, 0x50)
+    ]
@@ -0,0 +1,360 @@
+# -*- coding: utf-8 -*-
+
+"""闪存描述符解析、FPT范围地址换算与增量刷写计划测试"""
+
+import struct
+
+import pytest
+
+import insyde_bios_core
+from insyde_bios_core import FlashCancelledError, FlashDescriptor, FlashPlanner, FptSpiDevice, JobResult, \
+    PartialFlashError, SimulatedSpiDevice, TOOL_TIMEOUTS
+
+BIOS_BGN = 0x800000
+FLASH_END = 0x1000000
+
+
+def make_descriptor(bios_bgn=BIOS_BGN, bios_end=FLASH_END, sig_off=0x10, frba=0x40):
+    descriptor = bytearray(b'\xFF' * 0x1000)
+    descriptor[sig_off:sig_off + 4] = FlashDescriptor.SIGNATURE
+    descriptor[sig_off + 4:sig_off + 8] = struct.pack('<I', (frba >> 4) << 16)
+    descriptor[frba:frba + 4] = struct.pack('<I', 0x00000000)
+    descriptor[frba + 4:frba + 8] = struct.pack('<I', ((bios_end - 1) >> 12) << 16 | (bios_bgn >> 12))
+
+    return bytes(descriptor)
+
+
+class RecordingFptSpiDevice(FptSpiDevice):
+    """记录FPT参数、按参数读写内存中闪存的FptSpiDevice，不启动外部进程"""
+
+    def __init__(self, flash, **kwargs):
+        super().__init__('fpt', **kwargs)
+
+        self.flash = flash
+        self.calls = []
+
+    def _run_fpt(self, fpt_args, timeout=None):
+        self.calls.append(fpt_args)
+
+        if '-desc' in fpt_args:
+            address, length = 0, 0x1000
+        else:
+            address, length = int(fpt_args[fpt_args.index('-a') + 1], 0), int(fpt_args[fpt_args.index('-l') + 1], 0)
+
+        if '-d' in fpt_args:
+            with open(fpt_args[fpt_args.index('-d') + 1], 'wb') as out_file:
+                out_file.write(self.flash[address:address + length])
+        else:
+            with open(fpt_args[fpt_args.index('-f') + 1], 'rb') as in_file:
+                self.flash[address:address + length] = in_file.read()
+
+
+@pytest.mark.parametrize('sig_off', [0x10, 0x0])
+def test_descriptor_bios_region(sig_off):
+    assert FlashDescriptor.region(make_descriptor(sig_off=sig_off)) == (BIOS_BGN, FLASH_END)
+
+
+def test_descriptor_invalid_or_unused_region():
+    assert FlashDescriptor.region(b'\xFF' * 0x1000) is None
+
+    # 起始块号大于结束块号表示区域未使用
+    unused = bytearray(make_descriptor())
+    unused[0x44:0x48] = struct.pack('<I', 0x00007FFF)
+
+    assert FlashDescriptor.region(bytes(unused)) is None
+
+
+def test_fpt_ranges_use_absolute_addresses():
+    flash = bytearray(make_descriptor()) + bytearray(b'\xFF' * (FLASH_END - 0x1000))
+    spi_device = RecordingFptSpiDevice(flash)
+
+    spi_device.write_range(0x2000, b'\xA5' * 0x1000)
+
+    assert spi_device.read(0x2000, 0x1000) == b'\xA5' * 0x1000
+    assert flash[BIOS_BGN + 0x2000:BIOS_BGN + 0x3000] == b'\xA5' * 0x1000
+    assert flash[0x2000:0x3000] == b'\xFF' * 0x1000
+
+    # 描述符只在首次按范围访问前读取一次，范围操作不带区域选项
+    assert spi_device.calls[0][-1] == '-desc'
+    assert [fpt_args[fpt_args.index('-a') + 1] for fpt_args in spi_device.calls[1:]] == ['0x802000', '0x802000']
+    assert not any('-bios' in fpt_args for fpt_args in spi_device.calls[1:])
+
+
+def test_fpt_range_outside_bios_region():
+    spi_device = RecordingFptSpiDevice(bytearray(), bios_region=(BIOS_BGN, FLASH_END))
+
+    with pytest.raises(ValueError):
+        spi_device.write_range(FLASH_END - BIOS_BGN, b'\xFF' * 0x1000)
+
+    assert not spi_device.calls
+
+
+def test_fpt_without_descriptor_refuses_ranges():
+    spi_device = RecordingFptSpiDevice(bytearray(b'\xFF' * 0x2000))
+
+    with pytest.raises(RuntimeError):
+        spi_device.write_range(0, b'\x00' * 0x1000)
+
+    # 只读取了描述符，没有写入
+    assert len(spi_device.calls) == 1
+
+
+class FakeJobRunner:
+    """按预设结果返回JobResult的JobRunner"""
+
+    def __init__(self, **result_flags):
+        self.result_flags = result_flags
+        self.timeouts = []
+
+    def run(self, cmd_args, job_name=None, on_line=None, on_progress=None, timeout=None):
+        self.timeouts.append(timeout)
+
+        job_result = JobResult(args=cmd_args)
+        job_result.returncode = -9 if self.result_flags else 0
+
+        for flag_name, flag_value in self.result_flags.items():
+            setattr(job_result, flag_name, flag_value)
+
+        return job_result
+
+
+@pytest.mark.parametrize('result_flags, error_type', [
+    ({'cancelled': True}, FlashCancelledError),
+    ({'timed_out': True}, RuntimeError),
+])
+def test_fpt_cancel_and_timeout_are_failures(monkeypatch, tmp_path, result_flags, error_type):
+    job_runner = FakeJobRunner(**result_flags)
+    monkeypatch.setattr(insyde_bios_core.JobRunner, 'shared', classmethod(lambda cls: job_runner))
+
+    spi_device = FptSpiDevice('fpt', bios_region=(BIOS_BGN, FLASH_END))
+
+    with pytest.raises(error_type):
+        spi_device.read(0, 0x1000)
+
+    with pytest.raises(error_type):
+        spi_device.write_range(0, b'\xFF' * 0x1000)
+
+    # 只有只读的范围读回设置超时，擦写与整体刷写相同不设超时
+    assert job_runner.timeouts == [TOOL_TIMEOUTS['flash_range'], None]
+
+
+class FailingSpiDevice(SimulatedSpiDevice):
+    """第fail_at次范围写入时先擦除再抛出异常，模拟FPT中途失败"""
+
+    def __init__(self, image, fail_at, error=None, fail_write_all=False):
+        super().__init__(image)
+
+        self.fail_at = fail_at
+        self.error = error or RuntimeError('FPT返回代码: 1')
+        self.fail_write_all = fail_write_all
+        self.range_writes = 0
+
+    def write_range(self, address, data):
+        self.range_writes += 1
+
+        if self.range_writes == self.fail_at:
+            self.erase(address, len(data))
+            raise self.error
+
+        super().write_range(address, data)
+
+    def write_all(self, in_path):
+        if self.fail_write_all:
+            raise RuntimeError('整体写入失败')
+
+        super().write_all(in_path)
+
+
+def write_images(tmp_path, current, target):
+    current_path = tmp_path / 'current.bin'
+    target_path = tmp_path / 'target.bin'
+    current_path.write_bytes(current)
+    target_path.write_bytes(target)
+
+    return str(current_path), str(target_path)
+
+
+def changed_image(image, offsets):
+    changed = bytearray(image)
+
+    for offset in offsets:
+        changed[offset] ^= 0xFF
+
+    return bytes(changed)
+
+
+def test_mid_plan_failure_falls_back_to_full_write(tmp_path):
+    current = bytes(range(256)) * 0x100
+    target = changed_image(current, [0x1000, 0x5000, 0x9000])
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    flash_planner = FlashPlanner(current_path, target_path)
+    spi_device = FailingSpiDevice(current, fail_at=2)
+
+    with pytest.raises(PartialFlashError) as error_info:
+        flash_planner.execute(spi_device, flash_planner.plan())
+
+    assert error_info.value.failed_range == (0x5000, 0x6000)
+    assert error_info.value.written_ranges == [(0x1000, 0x2000)]
+    assert error_info.value.recovered
+    assert bytes(spi_device.memory) == target
+
+
+def test_mid_plan_failure_without_recovery_reports_partial_state(tmp_path):
+    current = bytes(range(256)) * 0x100
+    target = changed_image(current, [0x1000, 0x5000])
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    flash_planner = FlashPlanner(current_path, target_path)
+    spi_device = FailingSpiDevice(current, fail_at=2, fail_write_all=True)
+
+    with pytest.raises(PartialFlashError) as error_info:
+        flash_planner.execute(spi_device, flash_planner.plan())
+
+    assert not error_info.value.recovered
+    assert '部分写入' in str(error_info.value)
+    assert spi_device.memory[0x5000:0x6000] == b'\xFF' * 0x1000
+
+
+def test_cancelled_plan_is_not_recovered(tmp_path):
+    current = bytes(range(256)) * 0x100
+    target = changed_image(current, [0x1000])
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    flash_planner = FlashPlanner(current_path, target_path)
+    spi_device = FailingSpiDevice(current, fail_at=1, error=FlashCancelledError('FPT作业已取消'))
+
+    with pytest.raises(PartialFlashError) as error_info:
+        flash_planner.execute(spi_device, flash_planner.plan())
+
+    assert error_info.value.cancelled
+    assert not error_info.value.recovered
+    assert spi_device.range_writes == 1
+
+
+def test_size_mismatch_refused_before_writing(tmp_path):
+    current = b'\x00' * 0x4000
+    current_path, target_path = write_images(tmp_path, current, b'\x01' * 0x4000)
+
+    flash_planner = FlashPlanner(current_path, target_path)
+    spi_device = SimulatedSpiDevice(b'\x00' * 0x8000)
+
+    with pytest.raises(ValueError):
+        flash_planner.execute(spi_device, flash_planner.plan())
+
+    assert not spi_device.operations
+
+
+class NoEraseSpiDevice(SimulatedSpiDevice):
+    """写入范围时漏掉擦除的设备，只能把位从1清为0"""
+
+    def write_range(self, address, data):
+        self.program(address, data)
+        self.operations.append((address, len(data)))
+
+
+def test_simulated_program_only_clears_bits():
+    spi_device = SimulatedSpiDevice(b'\x0F' * 0x1000 + b'\xFF' * 0x1000)
+
+    spi_device.program(0, b'\xF3' * 0x1000)
+
+    assert spi_device.read(0, 0x1000) == b'\x03' * 0x1000
+    assert spi_device.erased_bytes == 0
+
+    spi_device.write_range(0, b'\xF3' * 0x1000)
+
+    assert spi_device.read(0, 0x1000) == b'\xF3' * 0x1000
+    assert spi_device.erased_bytes == 0x1000
+    assert spi_device.written_bytes == 0x2000
+
+
+def test_simulated_erase_requires_alignment():
+    spi_device = SimulatedSpiDevice(b'\x00' * 0x2000)
+
+    with pytest.raises(ValueError):
+        spi_device.erase(0x800, 0x1000)
+
+    with pytest.raises(ValueError):
+        spi_device.write_range(0x1000, b'\x00' * 0x2000)
+
+
+def test_plan_changed_blocks(tmp_path):
+    current = bytes(range(256)) * 0x100
+    target = changed_image(current, [0x0, 0x1FFF, 0x2000, 0x8000, 0xFFFF])
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    assert FlashPlanner(current_path, target_path).plan() == [(0x0, 0x3000), (0x8000, 0x9000), (0xF000, 0x10000)]
+    assert FlashPlanner(current_path, target_path, erase_block=0x10000).plan() == [(0x0, 0x10000)]
+    assert FlashPlanner(current_path, current_path).plan() == []
+
+
+def test_plan_size_mismatch(tmp_path):
+    current_path, target_path = write_images(tmp_path, b'\x00' * 0x2000, b'\x00' * 0x3000)
+
+    assert FlashPlanner(current_path, target_path).plan() is None
+
+
+def test_unsupported_erase_block(tmp_path):
+    with pytest.raises(ValueError):
+        FlashPlanner('current.bin', 'target.bin', erase_block=0x2000)
+
+
+def test_merge_gaps():
+    changed_ranges = [(0x0, 0x1000), (0x2000, 0x3000), (0x5000, 0x6000), (0x6000, 0x7000)]
+
+    assert FlashPlanner.merge_gaps(changed_ranges, 0) == [(0x0, 0x1000), (0x2000, 0x3000), (0x5000, 0x7000)]
+    assert FlashPlanner.merge_gaps(changed_ranges, 0x1000) == [(0x0, 0x3000), (0x5000, 0x7000)]
+    assert FlashPlanner.merge_gaps(changed_ranges, 0x2000) == [(0x0, 0x7000)]
+    assert FlashPlanner.merge_gaps([], 0x1000) == []
+
+
+def test_dry_run_does_not_touch_device(tmp_path):
+    current = bytes(range(256)) * 0x100
+    target = changed_image(current, [0x1000, 0x3000])
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    flash_planner = FlashPlanner(current_path, target_path, merge_gap=0x1000)
+    flash_plan = flash_planner.plan()
+    spi_device = SimulatedSpiDevice(current)
+
+    assert flash_plan == [(0x1000, 0x4000)]
+    assert flash_planner.execute(spi_device, flash_plan, dry_run=True) == 0x3000
+    assert bytes(spi_device.memory) == current
+    assert not spi_device.operations
+
+
+def test_execute_and_verify(tmp_path):
+    current = bytes(range(256)) * 0x100
+    target = changed_image(current, [0x1000, 0x3000, 0xF000])
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    flash_planner = FlashPlanner(current_path, target_path)
+    flash_plan = flash_planner.plan()
+    spi_device = SimulatedSpiDevice(current)
+
+    assert flash_planner.execute(spi_device, flash_plan) == 0x3000
+    assert bytes(spi_device.memory) == target
+    assert spi_device.operations == [(0x1000, 0x1000), (0x3000, 0x1000), (0xF000, 0x1000)]
+    assert spi_device.erased_bytes == 0x3000
+
+    # 再次规划时与目标一致
+    dump_path = str(tmp_path / 'dump.bin')
+    spi_device.dump(dump_path)
+
+    assert FlashPlanner(dump_path, target_path).plan() == []
+
+
+def test_verify_detects_missing_erase(tmp_path):
+    current = b'\x00' * 0x4000
+    target = b'\x00' * 0x1000 + b'\xFF' * 0x1000 + b'\x00' * 0x2000
+    current_path, target_path = write_images(tmp_path, current, target)
+
+    flash_planner = FlashPlanner(current_path, target_path)
+    spi_device = NoEraseSpiDevice(current)
+
+    with pytest.raises(PartialFlashError) as error_info:
+        flash_planner.execute(spi_device, flash_planner.plan(), fallback=False)
+
+    assert error_info.value.failed_range == (0x1000, 0x2000)
+    assert not error_info.value.recovered
+    assert bytes(spi_device.memory) == current
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""模块GUID名称索引：层CSV解析、查找与pickle缓存测试"""
+
+import os
+import uuid
+
+from insyde_bios_core import GuidIndex
+
+VARIABLE_GUID = 'CBD2E4D5-7068-4FF5-B462-9822B4AD8D60'
+PLATFORM_GUID = '2D2358B4-E96C-484D-B2DD-7C2EDFC7D56F'
+
+KERNEL_LAYER = '''Sample Chipset
+Layer,Module,GUID,Description
+MdeModulePkg,,
+Kernel,MdeModulePkg\\Universal\\Variable\\RuntimeDxe\\VariableRuntimeDxe.inf,{variable},Variable services, runtime
+Kernel,MdeModulePkg\\Broken.inf,not-a-guid,Skipped
+'''.format(variable=VARIABLE_GUID)
+
+PLATFORM_LAYER = '''Sample Chipset
+Layer,Module,GUID,Description
+SamplePlatformPkg,,
+Platform,SamplePlatformPkg\\PlatformInitDxe.inf,{platform},
+'''.format(platform=PLATFORM_GUID)
+
+
+def make_runtime(tmp_path):
+    runtime_dir = tmp_path / 'runtime'
+    runtime_dir.mkdir()
+
+    (runtime_dir / 'KernelLayer.csv').write_text(KERNEL_LAYER, encoding='utf-8')
+    (runtime_dir / 'PlatformOEMLayer.csv').write_text(PLATFORM_LAYER, encoding='utf-8')
+
+    return runtime_dir
+
+
+def make_index(tmp_path):
+    return GuidIndex(runtime_dir=str(tmp_path / 'runtime'), cache_path=str(tmp_path / 'cache' / 'guids.pickle'))
+
+
+def test_layer_records(tmp_path):
+    make_runtime(tmp_path)
+
+    guid_index = make_index(tmp_path)
+
+    # 缺少的层文件被跳过，GUID格式无效的行被忽略
+    assert len(guid_index.records) == 2
+
+    guid_record = guid_index.lookup(VARIABLE_GUID)
+
+    assert guid_record.name == 'VariableRuntimeDxe.inf'
+    assert guid_record.package == 'MdeModulePkg'
+    assert guid_record.layer == 'Kernel'
+    assert guid_record.path == 'MdeModulePkg\\Universal\\Variable\\RuntimeDxe\\VariableRuntimeDxe.inf'
+    assert guid_record.description == 'Variable services, runtime'
+
+    assert guid_index.lookup(PLATFORM_GUID).package == 'SamplePlatformPkg'
+    assert guid_index.lookup(PLATFORM_GUID).description == ''
+
+
+def test_lookup_by_string_and_raw_guid(tmp_path):
+    make_runtime(tmp_path)
+
+    guid_index = make_index(tmp_path)
+
+    # 字符串不区分大小写，原始字节为EFI_GUID字节序
+    assert guid_index.name(VARIABLE_GUID.lower()) == 'VariableRuntimeDxe.inf'
+    assert guid_index.name(uuid.UUID(VARIABLE_GUID).bytes_le) == 'VariableRuntimeDxe.inf'
+    assert guid_index.name(uuid.UUID(VARIABLE_GUID).bytes) is None
+
+    assert guid_index.lookup('00000000-0000-0000-0000-000000000000') is None
+    assert guid_index.lookup('not-a-guid') is None
+    assert guid_index.name('not-a-guid', default='Unknown') == 'Unknown'
+
+    assert [guid_record and guid_record.name for guid_record in guid_index.annotate(
+        [PLATFORM_GUID, 'not-a-guid', VARIABLE_GUID])] == ['PlatformInitDxe.inf', None, 'VariableRuntimeDxe.inf']
+
+
+def test_pickle_cache_reused_until_sources_change(tmp_path, monkeypatch):
+    runtime_dir = make_runtime(tmp_path)
+
+    assert make_index(tmp_path).name(PLATFORM_GUID) == 'PlatformInitDxe.inf'
+    assert os.path.isfile(tmp_path / 'cache' / 'guids.pickle')
+
+    parsed_layers = []
+    parse_layer = GuidIndex._parse_layer
+
+    def counting_parse_layer(layer_path):
+        parsed_layers.append(os.path.basename(layer_path))
+        return parse_layer(layer_path)
+
+    monkeypatch.setattr(GuidIndex, '_parse_layer', staticmethod(counting_parse_layer))
+
+    # 源CSV未变化时直接加载缓存
+    assert make_index(tmp_path).name(PLATFORM_GUID) == 'PlatformInitDxe.inf'
+    assert parsed_layers == []
+
+    # 源CSV大小变化后重新解析
+    (runtime_dir / 'PlatformOEMLayer.csv').write_text(PLATFORM_LAYER.replace('PlatformInitDxe', 'PlatformSetupDxe'),
+                                                     encoding='utf-8')
+
+    assert make_index(tmp_path).name(PLATFORM_GUID) == 'PlatformSetupDxe.inf'
+    assert parsed_layers == ['KernelLayer.csv', 'ChipsetLayer.csv', 'PlatformOEMLayer.csv']
+
+
+def test_cache_version_mismatch_reparses(tmp_path, monkeypatch):
+    make_runtime(tmp_path)
+
+    make_index(tmp_path).records
+
+    monkeypatch.setattr(GuidIndex, 'CACHE_VERSION', GuidIndex.CACHE_VERSION + 1)
+    monkeypatch.setattr(GuidIndex, '_parse_layer', staticmethod(lambda layer_path: {}))
+
+    assert make_index(tmp_path).records == {}
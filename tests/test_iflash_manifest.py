@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+"""Insyde iFlash组件提取与完整性清单测试"""
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+from insyde_bios_core import InsydeIfdExtract
+
+BIOS_DATA = bytes((index * 13) & 0xFF for index in range(0x1234))
+EC_DATA = b'EC firmware' * 0x40
+
+
+def make_component(tag, data, padding=0):
+    return b'$_IFLASH' + tag.ljust(8, b'_') + struct.pack('<II', len(data) + padding, len(data)) + data + \
+        b'\xFF' * padding
+
+
+def test_manifest_matches_written_files(tmp_path, monkeypatch):
+    # 缩小分块以覆盖多块写出时的增量哈希
+    monkeypatch.setattr(InsydeIfdExtract, 'INS_IO_CHUNK', 0x100)
+
+    image = b'\x00' * 0x40 + make_component(b'BIOSIMG', BIOS_DATA, padding=0x20) + make_component(b'EC_IMG', EC_DATA)
+
+    image_path = tmp_path / 'update.bin'
+    image_path.write_bytes(image)
+
+    extract_path = tmp_path / 'extracted'
+
+    with InsydeIfdExtract(input_object=str(image_path), extract_path=str(extract_path), use_mmap=True) as extractor:
+        assert extractor.check_format()
+        assert extractor.parse_format()
+
+    with open(extract_path / InsydeIfdExtract.INS_IFL_MANIFEST, 'r', encoding='utf-8') as manifest_file:
+        components = json.load(manifest_file)['components']
+
+    bios_bgn = 0x40 + 0x18
+    ec_bgn = bios_bgn + len(BIOS_DATA) + 0x20 + 0x18
+
+    assert [(component['tag'], component['offset'], component['size'], component['complete'])
+            for component in components] == [
+        ('BIOSIMG', bios_bgn, len(BIOS_DATA), True),
+        ('EC_IMG', ec_bgn, len(EC_DATA), True)
+    ]
+
+    assert components[0]['name'] == f'BIOS-UEFI [0x{bios_bgn:08X}-0x{bios_bgn + len(BIOS_DATA):08X}].bin'
+
+    # 清单中的哈希与写出文件的实际内容一致
+    for component, component_data in zip(components, [BIOS_DATA, EC_DATA]):
+        with open(os.path.join(extract_path, component['name']), 'rb') as component_file:
+            file_data = component_file.read()
+
+        assert file_data == component_data
+        assert component['sha256'] == hashlib.sha256(file_data).hexdigest()
+        assert component['crc32'] == f'{zlib.crc32(file_data):08X}'
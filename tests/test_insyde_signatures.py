@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+
+"""InsydeIfdExtract签名扫描测试：组合模式单次扫描，微码候选仅在需要时扫描"""
+
+import insyde_bios_core
+from insyde_bios_core import InsydeIfdExtract
+
+# 微码头部候选：HeaderVersion、UpdateRevision、Date(2019-03-12)、ProcessorSignature、Checksum、LoaderRevision
+UCODE_CANDIDATE = (b'\x01\x00\x00\x00' + b'\xEA\x00\x00\x00' + b'\x19\x20\x12\x03' + b'\xEA\x06\x09\x00' +
+                   b'\x00' * 4 + b'\x01\x00\x00\x00')
+
+
+class CountingPattern:
+    """记录finditer调用次数的正则包装"""
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.scans = 0
+
+    def finditer(self, input_buffer):
+        self.scans += 1
+        return self.pattern.finditer(input_buffer)
+
+
+def test_microcode_scanned_only_on_demand(monkeypatch):
+    ucode_pattern = CountingPattern(insyde_bios_core.PAT_INTEL_UCODE)
+    monkeypatch.setattr(insyde_bios_core, 'PAT_INTEL_UCODE', ucode_pattern)
+
+    input_buffer = b'\xFF' * 0x100 + UCODE_CANDIDATE + b'\xFF' * 0x100
+    extractor = InsydeIfdExtract(input_object=input_buffer)
+
+    assert not extractor.check_format()
+    assert 'microcode' not in extractor.signatures
+    assert ucode_pattern.scans == 0
+
+    assert extractor.microcode_spans == [(0x100, 0x100 + len(UCODE_CANDIDATE))]
+
+    # 同一缓冲区的微码扫描结果被缓存
+    assert extractor.microcode_spans == [(0x100, 0x100 + len(UCODE_CANDIDATE))]
+    assert ucode_pattern.scans == 1
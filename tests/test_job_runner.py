@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""以tool_emulator代替FPTW64.exe/H2OUVE-W-CONSOLEx64.exe，测试JobRunner的进度解析、取消与超时"""
+
+import os
+import threading
+import time
+
+import pytest
+
+import tool_emulator
+from insyde_bios_core import FlashPlanner, FptSpiDevice, JobRunner
+
+pytestmark = pytest.mark.skipif(os.name == 'nt', reason='包装脚本依赖POSIX的#!解释器行')
+
+FLASH_SIZE = 0x200000
+BIOS_BGN = 0x100000
+
+
+@pytest.fixture
+def tools(tmp_path, monkeypatch):
+    # FptSpiDevice把作业输出写入工作目录下的logs/jobs
+    monkeypatch.chdir(tmp_path)
+
+    monkeypatch.setenv('TOOL_EMULATOR_FLASH', str(tmp_path / 'flash.bin'))
+    monkeypatch.setenv('TOOL_EMULATOR_SIZE', hex(FLASH_SIZE))
+    monkeypatch.setenv('TOOL_EMULATOR_BIOS', hex(BIOS_BGN))
+    monkeypatch.setenv('TOOL_EMULATOR_DELAY', '0')
+
+    return tool_emulator.install_wrappers(str(tmp_path / 'tools'))
+
+
+def test_dispatch_on_program_name():
+    assert tool_emulator.emulated_tool(['C:\\Tools\\FPTW64.exe', '-d', 'out.bin']) == ('fpt', ['-d', 'out.bin'])
+    assert tool_emulator.emulated_tool(['/opt/H2OUVE-W-CONSOLEx64.exe', '-gv', 'a.txt']) == ('h2ouve', ['-gv', 'a.txt'])
+    assert tool_emulator.emulated_tool(['tool_emulator.py', 'fpt', '-bios']) == ('fpt', ['-bios'])
+    assert tool_emulator.emulated_tool(['tool_emulator.py', '-bios'])[0] is None
+
+
+def test_fpt_carriage_return_progress(tools, tmp_path):
+    progress_updates = []
+    output_lines = []
+
+    job_result = JobRunner().run([tools['FPTW64.exe'], '-d', str(tmp_path / 'bios.bin'), '-bios'],
+                                 job_name='dump', on_line=output_lines.append, on_progress=progress_updates.append)
+
+    assert job_result.returncode == 0
+    assert os.path.getsize(tmp_path / 'bios.bin') == FLASH_SIZE - BIOS_BGN
+
+    # 同一行用\r刷新的进度被拆成多行，每个整数百分比只通知一次
+    percents = [progress['percent'] for progress in progress_updates]
+
+    assert {progress['phase'] for progress in progress_updates} == {'read'}
+    assert percents == sorted(percents) and percents[0] == 0 and percents[-1] == 100
+    assert len(percents) == tool_emulator.PROGRESS_STEPS + 1
+    assert progress_updates[-1]['total'] == FLASH_SIZE - BIOS_BGN
+    assert 'FPT Operation Successful.' in output_lines
+
+
+def test_h2ouve_wrapper(tools, tmp_path):
+    job_result = JobRunner().run([tools['H2OUVE-W-CONSOLEx64.exe'], '-gv', str(tmp_path / 'vars.txt')])
+
+    assert job_result.returncode == 0
+    assert 'Setup' in (tmp_path / 'vars.txt').read_text(encoding='utf-8')
+
+
+def test_nonzero_exit(tools, tmp_path, monkeypatch):
+    monkeypatch.setenv('TOOL_EMULATOR_FAIL', '26')
+
+    job_result = JobRunner().run([tools['FPTW64.exe'], '-d', str(tmp_path / 'bios.bin'), '-bios'])
+
+    assert job_result.returncode == 26
+    assert 'Emulated failure.' in job_result.stderr
+
+
+def test_cancel(tools, tmp_path, monkeypatch):
+    monkeypatch.setenv('TOOL_EMULATOR_DELAY', '0.5')
+
+    job_runner = JobRunner()
+    first_line = threading.Event()
+
+    job_future = job_runner.submit([tools['FPTW64.exe'], '-d', str(tmp_path / 'bios.bin'), '-bios'],
+                                   job_name='dump', on_line=lambda line: first_line.set())
+
+    assert first_line.wait(10)
+    assert job_runner.running() == ['dump']
+    assert job_runner.cancel('dump')
+
+    job_result = job_future.result(10)
+
+    assert job_result.cancelled and not job_result.timed_out
+    assert job_result.returncode != 0
+    assert job_runner.running() == []
+    assert not job_runner.cancel('dump')
+
+
+def test_timeout(tools, tmp_path, monkeypatch):
+    monkeypatch.setenv('TOOL_EMULATOR_DELAY', '0.5')
+
+    start_time = time.perf_counter()
+    job_result = JobRunner().run([tools['FPTW64.exe'], '-d', str(tmp_path / 'bios.bin'), '-bios'], timeout=1)
+
+    assert job_result.timed_out and not job_result.cancelled
+    assert job_result.returncode != 0
+    assert time.perf_counter() - start_time < 5
+
+
+def test_delta_flash_through_emulated_fpt(tools, tmp_path):
+    spi_device = FptSpiDevice(tools['FPTW64.exe'])
+
+    current_path = str(tmp_path / 'current.bin')
+    spi_device.dump(current_path)
+
+    target = bytearray(open(current_path, 'rb').read())
+    target[0x3000:0x3010] = b'\x00' * 0x10
+    target_path = tmp_path / 'target.bin'
+    target_path.write_bytes(bytes(target))
+
+    flash_planner = FlashPlanner(current_path, str(target_path))
+    flash_plan = flash_planner.plan()
+
+    assert flash_plan == [(0x3000, 0x4000)]
+    assert flash_planner.execute(spi_device, flash_plan) == 0x1000
+    assert spi_device.bios_region == (BIOS_BGN, FLASH_SIZE)
+
+    # 范围写在BIOS区域基址之后，描述符区域不受影响
+    flash = (tmp_path / 'flash.bin').read_bytes()
+
+    assert flash[BIOS_BGN:] == bytes(target)
+    assert flash[0x10:0x14] == b'\x5A\xA5\xF0\x0F'
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""Intel微码扫描、校验和与CPUID索引测试"""
+
+import os
+import struct
+
+from insyde_bios_core import MicrocodeIndex, MicrocodeScan
+
+
+def dword_sum(data):
+    return sum(struct.unpack(f'<{len(data) // 4}I', data)) & 0xFFFFFFFF
+
+
+def make_ucode(cpuid, revision, date=0x10182018, platform_ids=0x22, extended=(), total_size=0x800, corrupt=False):
+    """构造带正确校验和的微码更新，extended为扩展签名表中的CPUID"""
+    ext_table = b''
+
+    if extended:
+        ext_sigs = b''.join(struct.pack('<3I', ext_cpuid, platform_ids, 0) for ext_cpuid in extended)
+        ext_table = struct.pack('<2I12x', len(extended), 0) + ext_sigs
+        ext_table = ext_table[:4] + struct.pack('<I', -dword_sum(ext_table) & 0xFFFFFFFF) + ext_table[8:]
+
+    data_size = total_size - 0x30 - len(ext_table)
+    data = bytes((index * 7) & 0xFF for index in range(data_size))
+
+    header = struct.pack('<9I12x', 1, revision, date, cpuid, 0, 1, platform_ids, data_size, total_size)
+    ucode = header + data + ext_table
+    ucode = ucode[:0x10] + struct.pack('<I', -dword_sum(ucode) & 0xFFFFFFFF) + ucode[0x14:]
+
+    if corrupt:
+        ucode = ucode[:0x100] + bytes([ucode[0x100] ^ 0x1]) + ucode[0x101:]
+
+    return ucode
+
+
+def test_update_fields_and_checksums():
+    image = (b'\xFF' * 0x100 + make_ucode(0x806EA, 0x9E, extended=[0x806EB]) +
+             make_ucode(0x906EA, 0xB4, date=0x03122019, platform_ids=0x02) +
+             make_ucode(0x906EC, 0xAE, corrupt=True) + b'\xFF' * 0x100)
+
+    updates = MicrocodeScan(image).updates()
+
+    assert [(ucode['offset'], ucode['cpuid'], ucode['revision'], ucode['valid']) for ucode in updates] == [
+        (0x100, 0x806EA, 0x9E, True),
+        (0x900, 0x906EA, 0xB4, True),
+        (0x1100, 0x906EC, 0xAE, False)
+    ]
+
+    first, second, _ = updates
+
+    assert first['date'] == '2018-10-18'
+    assert first['platform_ids'] == 0x22
+    assert first['total_size'] == 0x800
+    assert first['data_size'] == 0x800 - 0x30 - 0x20
+    assert first['extended'] == [(0x806EB, 0x22)]
+
+    assert second['date'] == '2019-03-12'
+    assert second['platform_ids'] == 0x02
+    assert second['extended'] == []
+
+
+def test_extended_table_checksum():
+    ucode = bytearray(make_ucode(0x806EA, 0x9E, extended=[0x806EB, 0x806EC]))
+
+    # 修改扩展签名项并同步修正整体校验和，只有扩展签名表的校验和错误
+    ucode[-0xC] ^= 0x1
+    ucode[0x10:0x14] = struct.pack('<I', (struct.unpack_from('<I', ucode, 0x10)[0] - 0x1) & 0xFFFFFFFF)
+
+    updates = MicrocodeScan(bytes(ucode)).updates()
+
+    assert updates[0]['extended'] == [(0x806EB, 0x22), (0x806ED, 0x22)]
+    assert not updates[0]['valid']
+
+
+def test_invalid_layout_is_skipped():
+    # 总大小不是1 KB的整数倍，或超出缓冲区末尾
+    image = make_ucode(0x806EA, 0x9E, total_size=0x800)
+    bad_size = image[:0x20] + struct.pack('<I', 0x7F0) + image[0x24:]
+
+    assert MicrocodeScan(bad_size).updates() == []
+    assert MicrocodeScan(image[:0x400]).updates() == []
+
+
+def test_dword_sums_without_native_cast(monkeypatch):
+    image = make_ucode(0x806EA, 0x9E) + b'\x12\x34\x56\x78' * 3
+    ranges = [(0, 0x800), (0x800, 0xC), (0x4, 0x10)]
+
+    native_sums = MicrocodeScan.dword_sums(image, ranges)
+
+    monkeypatch.setattr(MicrocodeScan, 'NATIVE_DWORDS', False)
+
+    assert MicrocodeScan.dword_sums(image, ranges) == native_sums
+    assert native_sums == [0, dword_sum(b'\x12\x34\x56\x78' * 3), dword_sum(image[0x4:0x14])]
+
+
+def image_entry(image_path):
+    image_stat = os.stat(image_path)
+
+    return str(image_path), os.path.basename(image_path), image_stat.st_size, image_stat.st_mtime
+
+
+def test_index_lookup_and_incremental_sync(tmp_path):
+    old_path = tmp_path / 'old.bin'
+    new_path = tmp_path / 'new.rom'
+
+    old_path.write_bytes(b'\xFF' * 0x100 + make_ucode(0x806EA, 0x9E, extended=[0x806EB]))
+    new_path.write_bytes(make_ucode(0x806EA, 0xF0, platform_ids=0x80) + make_ucode(0x906EC, 0xAE, corrupt=True))
+
+    microcode_index = MicrocodeIndex(db_path=str(tmp_path / 'index' / 'microcode.sqlite'))
+
+    assert microcode_index.sync([image_entry(old_path), image_entry(new_path)]) == 2
+
+    # 版本从高到低排列
+    assert [(os.path.basename(match['path']), match['revision'], match['offset'])
+            for match in microcode_index.lookup(0x806EA)] == [('new.rom', 0xF0, 0x0), ('old.bin', 0x9E, 0x100)]
+
+    # 扩展签名表中的CPUID与主签名共用版本
+    assert [match['revision'] for match in microcode_index.lookup(0x806EB)] == [0x9E]
+
+    assert [match['revision'] for match in microcode_index.lookup(0x806EA, min_revision=0xA0)] == [0xF0]
+    assert [match['revision'] for match in microcode_index.lookup(0x806EA, platform_id=0x02)] == [0x9E]
+
+    # 校验和错误的微码默认不返回
+    assert microcode_index.lookup(0x906EC) == []
+    assert [match['valid'] for match in microcode_index.lookup(0x906EC, valid_only=False)] == [0]
+
+    assert microcode_index.summary() == [
+        {'cpuid': 0x806EA, 'revision': 0xF0, 'images': 2},
+        {'cpuid': 0x806EB, 'revision': 0x9E, 'images': 1}
+    ]
+
+    # 未变化的镜像不重新扫描，已删除的镜像从索引移除
+    assert microcode_index.sync([image_entry(old_path), image_entry(new_path)]) == 0
+    assert microcode_index.sync([image_entry(new_path)]) == 0
+    assert [match['revision'] for match in microcode_index.lookup(0x806EA)] == [0xF0]
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""UEFI变量存储解析测试：$VSS与以GUID为签名的VSS2存储、变量状态与按名称/GUID查找"""
+
+import struct
+import uuid
+
+from insyde_bios_core import NvramParse
+
+NVRAM_FS_GUID = 'FFF12B8D-7696-4C8B-A985-2747075B4F50'
+FFS2_GUID = '8C8CE578-8A3D-4F1C-9935-896185C32DD3'
+AUTH_STORE_GUID = 'AAF32C78-947B-439A-A180-2E144EC37792'
+
+GLOBAL_GUID = '8BE4DF61-93CA-11D2-AA0D-00E098032B8C'
+SETUP_GUID = 'EC87D643-EBA4-4BB5-A1E5-3F3E36B20DA9'
+DB_GUID = 'D719B2CB-3D3A-4596-A3BC-DAD00E67656F'
+
+# VAR_ADDED、VAR_ADDED & VAR_IN_DELETED_TRANSITION、VAR_ADDED & VAR_DELETED
+STATE_ADDED = 0x3F
+STATE_IN_TRANSITION = 0x3E
+STATE_DELETED = 0x3D
+
+
+def make_variable(name, guid, data, attributes=0x7, state=STATE_ADDED, auth=False):
+    name_data = (name + '\x00').encode('utf-16-le')
+
+    if auth:
+        header = struct.pack('<HBBIQ16sIII', 0x55AA, state, 0, attributes, 0, b'\x00' * 16, 0, len(name_data),
+                             len(data))
+    else:
+        header = struct.pack('<HBBIII', 0x55AA, state, 0, attributes, len(name_data), len(data))
+
+    variable = header + uuid.UUID(guid).bytes_le + name_data + data
+
+    return variable + b'\xFF' * (-len(variable) % 4)
+
+
+def make_store(variables, store_guid=None, size=0x1000):
+    if store_guid:
+        header = uuid.UUID(store_guid).bytes_le + struct.pack('<IBBHI', size, 0x5A, 0xFE, 0, 0)
+    else:
+        header = b'$VSS' + struct.pack('<IBBHI', size, 0x5A, 0xFE, 0, 0)
+
+    store = header + b''.join(variables)
+
+    return store + b'\xFF' * (size - len(store))
+
+
+def make_volume(payload, fs_guid=NVRAM_FS_GUID):
+    header_size = 0x48
+    volume_size = header_size + len(payload)
+    volume_size += -volume_size % 0x1000
+
+    header = bytearray(b'\x00' * 16 + uuid.UUID(fs_guid).bytes_le +
+                       struct.pack('<Q4sIHHHBB', volume_size, b'_FVH', 0x4FEFF, header_size, 0, 0, 0, 2) +
+                       struct.pack('<II', volume_size // 0x1000, 0x1000) + b'\x00' * 8)
+    header[0x32:0x34] = struct.pack('<H', -sum(struct.unpack(f'<{header_size // 2}H', header)) & 0xFFFF)
+
+    volume = bytes(header) + payload
+
+    return volume + b'\xFF' * (volume_size - len(volume))
+
+
+def make_vss_image():
+    variables = [
+        make_variable('Setup', SETUP_GUID, bytes(range(16)), state=STATE_DELETED),
+        make_variable('Setup', SETUP_GUID, bytes(range(16, 32)), state=STATE_IN_TRANSITION),
+        make_variable('Setup', SETUP_GUID, bytes(range(32, 48))),
+        make_variable('BootOrder', GLOBAL_GUID, b'\x01\x00\x02\x00'),
+        make_variable('db', DB_GUID, b'x' * 10, attributes=0x27, auth=True),
+        make_variable('Lang', GLOBAL_GUID, b'eng', attributes=0x6)
+    ]
+
+    return b'\xFF' * 0x1000 + make_volume(make_store(variables)), variables
+
+
+def test_vss_store_and_variable_offsets():
+    image, variables = make_vss_image()
+
+    nvram_parse = NvramParse(image)
+    stores = list(nvram_parse.stores())
+
+    assert [(store_info['offset'], store_info['size'], store_info['format'], store_info['auth'])
+            for store_info in stores] == [(0x1048, 0x1000, 'vss', False)]
+
+    parsed = list(nvram_parse.variables())
+
+    # 已删除的变量默认跳过
+    assert [(variable.name, variable.guid, variable.attributes, variable.data) for variable in parsed] == [
+        ('Setup', SETUP_GUID, 0x7, bytes(range(16, 32))),
+        ('Setup', SETUP_GUID, 0x7, bytes(range(32, 48))),
+        ('BootOrder', GLOBAL_GUID, 0x7, b'\x01\x00\x02\x00'),
+        ('db', DB_GUID, 0x27, b'x' * 10),
+        ('Lang', GLOBAL_GUID, 0x6, b'eng')
+    ]
+
+    # 变量头部按4字节对齐依次排列，带认证属性的变量使用0x3C字节的认证头部
+    var_offsets = [0x1048 + 0x10 + sum(len(variable) for variable in variables[:var_index])
+                   for var_index in range(len(variables))]
+
+    assert [variable.offset for variable in parsed] == var_offsets[1:]
+    assert parsed[2].data_offset == var_offsets[3] + 0x20 + len('BootOrder\x00') * 2
+    assert parsed[3].data_offset == var_offsets[4] + 0x3C + len('db\x00') * 2
+
+    assert [variable.state for variable in nvram_parse.variables(include_deleted=True)][:3] == [
+        STATE_DELETED, STATE_IN_TRANSITION, STATE_ADDED
+    ]
+
+
+def test_find_prefers_added_copy():
+    image, _ = make_vss_image()
+
+    nvram_parse = NvramParse(image)
+
+    # 正在被取代的旧副本不返回
+    assert [variable.data for variable in nvram_parse.find(name='Setup')] == [bytes(range(32, 48))]
+    assert [variable.name for variable in nvram_parse.find(guid=GLOBAL_GUID.lower())] == ['BootOrder', 'Lang']
+    assert nvram_parse.find(name='Lang', guid=SETUP_GUID) == []
+    assert len(nvram_parse.find()) == 4
+
+    guid, name, attributes, data = nvram_parse.find(name='Lang')[0]
+
+    assert (guid, name, attributes, data) == (GLOBAL_GUID, 'Lang', 0x6, b'eng')
+    assert nvram_parse.find(name='Lang')[0].attribute_text() == 'BS+RT'
+    assert nvram_parse.find(name='db')[0].attribute_text() == 'NV+BS+RT+TA'
+
+
+def test_vss2_authenticated_store():
+    variables = [
+        make_variable('PK', GLOBAL_GUID, b'pk' * 8, attributes=0x27, auth=True),
+        make_variable('Timeout', GLOBAL_GUID, b'\x05\x00', auth=True)
+    ]
+    image = make_volume(make_store(variables, store_guid=AUTH_STORE_GUID))
+
+    nvram_parse = NvramParse(image)
+
+    assert [(store_info['offset'], store_info['format'], store_info['auth'], store_info['vars_bgn'])
+            for store_info in nvram_parse.stores()] == [(0x48, 'vss2', True, 0x48 + 0x1C)]
+
+    # 认证存储中不带认证属性的变量同样使用认证头部
+    parsed = list(nvram_parse.variables())
+
+    assert [(variable.name, variable.data) for variable in parsed] == [('PK', b'pk' * 8), ('Timeout', b'\x05\x00')]
+    assert parsed[1].offset == 0x48 + 0x1C + len(variables[0])
+    assert parsed[1].data_offset == parsed[1].offset + 0x3C + len('Timeout\x00') * 2
+
+
+def test_stores_outside_nvram_volumes_ignored():
+    store = make_store([make_variable('Setup', SETUP_GUID, b'\x01')])
+    image = make_volume(store, fs_guid=FFS2_GUID) + b'\xFF' * 0x100 + store
+
+    assert list(NvramParse(image).variables()) == []
+
+
+def test_unformatted_store_ignored():
+    store = bytearray(make_store([make_variable('Setup', SETUP_GUID, b'\x01')]))
+    store[0x8] = 0xFF
+
+    assert list(NvramParse(make_volume(bytes(store))).stores()) == []
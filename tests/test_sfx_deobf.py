@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""iFdPacker 7-Zip SFX解混淆：与逐字节循环左移1位的混淆编码器往返校验"""
+
+import io
+
+import pytest
+
+from insyde_bios_core import BufferReader, InsydeIfdExtract
+
+# iFdPacker的混淆编码：逐字节循环左移1位
+SFX_OBF = bytes(((byte << 1) | (byte >> 7)) & 0xFF for byte in range(0x100))
+
+
+def legacy_deobf(data):
+    """改写前的逐字节解混淆循环"""
+    return bytes(byte // 2 + (128 if byte % 2 else 0) for byte in data)
+
+
+def test_table_inverts_encoder_for_all_bytes():
+    all_bytes = bytes(range(0x100))
+
+    assert all_bytes.translate(SFX_OBF).translate(InsydeIfdExtract.INS_SFX_DEOBF) == all_bytes
+
+
+def test_table_matches_legacy_loop():
+    all_bytes = bytes(range(0x100))
+
+    assert all_bytes.translate(InsydeIfdExtract.INS_SFX_DEOBF) == legacy_deobf(all_bytes)
+
+
+@pytest.mark.parametrize('read_size', [1, 0xFF, 0x100, 0x101, 0x400, -1])
+@pytest.mark.parametrize('data_len', [0, 1, 0xFF, 0x100, 0x101, 0x3FF, 0x400, 0x401, 0x1000])
+def test_reader_round_trip_across_reads(data_len, read_size):
+    plain_data = bytes((index * 31 + index // 7) & 0xFF for index in range(data_len))
+    obf_data = b'SFX stub' + plain_data.translate(SFX_OBF)
+
+    out_data = bytearray()
+
+    with BufferReader(obf_data, offset=8, table=InsydeIfdExtract.INS_SFX_DEOBF) as reader:
+        for read_data in iter(lambda: reader.read(read_size), b''):
+            out_data += read_data
+
+    assert bytes(out_data) == plain_data
+
+
+def test_reader_translates_after_seek():
+    plain_data = bytes(range(0x100)) * 3
+
+    with BufferReader(plain_data.translate(SFX_OBF), table=InsydeIfdExtract.INS_SFX_DEOBF) as reader:
+        reader.seek(0x1F0)
+
+        assert reader.read(0x20) == plain_data[0x1F0:0x210]
+
+        reader.seek(-4, io.SEEK_END)
+
+        assert reader.read() == plain_data[-4:]
+
+
+def test_reader_without_table_copies():
+    plain_data = bytes(range(0x100)) * 3
+
+    with BufferReader(plain_data) as reader:
+        assert reader.read() == plain_data
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""缓冲区只读视图与iFdPacker SFX流式解压测试"""
+
+import io
+import mmap
+import os
+
+import pytest
+
+import insyde_bios_core
+from insyde_bios_core import BufferReader, InsydeIfdExtract, szip_decompress_stream
+
+py7zr = pytest.importorskip('py7zr')
+
+SFX_OBF = bytes(((byte << 1) | (byte >> 7)) & 0xFF for byte in range(256))
+
+
+def make_archive(password=None, payload=b'Insyde BIOS payload' * 64):
+    archive_stream = io.BytesIO()
+
+    with py7zr.SevenZipFile(archive_stream, mode='w', password=password, header_encryption=bool(password)) as archive:
+        archive.writestr(payload, 'bios.bin')
+
+    return archive_stream.getvalue(), payload
+
+
+def test_buffer_reader_reads_and_seeks_from_offset():
+    reader = BufferReader(b'prefix0123456789', offset=6)
+
+    assert reader.read(4) == b'0123'
+    assert reader.tell() == 4
+    assert reader.seek(-2, io.SEEK_END) == 8
+    assert reader.read() == b'89'
+    assert reader.read(1) == b''
+
+    reader.seek(0)
+
+    assert reader.read() == b'0123456789'
+
+    reader.close()
+
+    assert reader.closed
+
+
+def test_buffer_reader_releases_mmap(tmp_path):
+    image_path = tmp_path / 'image.bin'
+    image_path.write_bytes(b'\xFF' * 0x100 + b'data')
+
+    with open(image_path, 'rb') as image_file, mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as image_map:
+        with BufferReader(image_map, offset=0x100) as reader:
+            assert reader.read() == b'data'
+
+    # 视图未释放时mmap.close会抛出BufferError
+    assert image_map.closed
+
+
+def test_stream_decompress_from_buffer_offset(tmp_path):
+    archive_data, payload = make_archive(password='Y`t~i!L@i#t$U%h^s7A*l(f)E-d=y+S_n?i')
+
+    with BufferReader(b'\x00' * 0x40 + archive_data, offset=0x40) as reader:
+        assert szip_decompress_stream(in_stream=reader, out_path=str(tmp_path),
+                                      password='Y`t~i!L@i#t$U%h^s7A*l(f)E-d=y+S_n?i', silent=True)
+
+    assert (tmp_path / 'bios.bin').read_bytes() == payload
+
+
+@pytest.mark.parametrize('obfuscated', [False, True])
+def test_insyde_packer_extract(tmp_path, monkeypatch, obfuscated):
+    archive_data, payload = make_archive(password=InsydeIfdExtract.INS_SFX_PWD)
+
+    if obfuscated:
+        archive_data = archive_data.translate(SFX_OBF)
+
+    monkeypatch.chdir(tmp_path)
+
+    # py7zr在进程内直接读取（解混淆的）归档，不写出临时文件
+    def no_temp_file(*args, **kwargs):
+        raise AssertionError('py7zr路径不应写出临时归档')
+
+    monkeypatch.setattr(insyde_bios_core.tempfile, 'mkstemp', no_temp_file)
+    monkeypatch.setattr(insyde_bios_core, 'SZIP_BACKENDS', insyde_bios_core.SZIP_BACKENDS[:1])
+
+    image = b'MZ' + b'\x00' * 0x20 + b';!@Install@!UTF-8!\r\n;!@InstallEnd@!\r\n' + archive_data
+    extract_path = str(tmp_path / 'out')
+
+    assert InsydeIfdExtract()._insyde_packer_extract(input_buffer=image, extract_path=extract_path) == 0
+    assert open(os.path.join(extract_path, 'bios.bin'), 'rb').read() == payload
+
+
+def test_exe_fallback_reads_deobfuscated_stream(tmp_path, monkeypatch):
+    archive_data, payload = make_archive(password=InsydeIfdExtract.INS_SFX_PWD)
+    copied_archives = []
+
+    # 外部7-Zip需要磁盘上的归档：记录复制出的临时归档内容，代替真正的7z解压
+    def fake_szip_decompress(in_path, out_path, in_name='archive', padding=0, args=None, check=False, silent=False):
+        with open(in_path, 'rb') as in_file:
+            copied_archives.append(in_file.read())
+        return True
+
+    monkeypatch.setattr(insyde_bios_core, 'szip_decompress', fake_szip_decompress)
+
+    with BufferReader(archive_data.translate(SFX_OBF), table=InsydeIfdExtract.INS_SFX_DEOBF) as reader:
+        assert insyde_bios_core._szip_exe_extract(reader, str(tmp_path / 'out'), InsydeIfdExtract.INS_SFX_PWD)
+
+    assert copied_archives == [archive_data]
+
+    # 临时归档在解压后删除
+    assert not list((tmp_path / 'out').glob('*.7z'))
+
+
+def test_backend_failures_are_logged(tmp_path, caplog):
+    archive_data, _ = make_archive(password='right password')
+
+    with BufferReader(archive_data) as reader, caplog.at_level('WARNING'):
+        assert not szip_decompress_stream(in_stream=reader, out_path=str(tmp_path), in_name='SFX',
+                                          password='wrong password', silent=True)
+
+    assert any(record.message.startswith('py7zr解压SFX出错') for record in caplog.records)
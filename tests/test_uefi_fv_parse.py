@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""UEFI固件卷、FFS文件与节遍历测试"""
+
+import struct
+import uuid
+
+from insyde_bios_core import UefiFvParse
+
+FFS2_GUID = '8C8CE578-8A3D-4F1C-9935-896185C32DD3'
+OTHER_FS_GUID = '11111111-2222-3333-4444-555555555555'
+FV_NAME_GUID = 'A881D567-6CB0-4EEE-8435-2E72D33E45B5'
+
+DRIVER_GUID = '3C1DE39F-D207-408A-AACC-731CFB7F1DD7'
+PEIM_GUID = '9B3ADA4F-AE56-4C24-8DEA-F03B7558AE50'
+DELETED_GUID = '00000000-0000-0000-0000-00000000DEAD'
+PAD_GUID = 'FFFFFFFF-FFFF-FFFF-FFFF-FFFFFFFFFFFF'
+
+# 擦除值为0xFF时状态位以清零表示置位：有效文件置位HEADER_CONSTRUCTION、HEADER_VALID和DATA_VALID，已删除文件另置位DELETED
+STATE_VALID = 0xF8
+STATE_DELETED = 0xE8
+
+
+def make_section(sec_type, payload):
+    return (4 + len(payload)).to_bytes(3, 'little') + bytes([sec_type]) + payload
+
+
+def join_sections(*sections):
+    # FFS节相对文件数据起始4字节对齐
+    return b''.join(section + b'\x00' * (-len(section) % 4) for section in sections)
+
+
+def make_ui_section(name):
+    return make_section(0x15, (name + '\x00').encode('utf-16-le'))
+
+
+def make_file(guid, file_type, payload, state=STATE_VALID):
+    return (uuid.UUID(guid).bytes_le + struct.pack('<HBB', 0, file_type, 0) +
+            (0x18 + len(payload)).to_bytes(3, 'little') + bytes([state]) + payload)
+
+
+def make_volume(files, fs_guid=FFS2_GUID, size=0x1000, name_guid=None, checksum=True):
+    header_size = 0x48
+    ext_offset = header_size if name_guid else 0
+
+    header = bytearray(b'\x00' * 16 + uuid.UUID(fs_guid).bytes_le +
+                       struct.pack('<Q4sIHHHBB', size, b'_FVH', 0x4FEFF, header_size, 0, ext_offset, 0, 2) +
+                       struct.pack('<II', size // 0x1000, 0x1000) + b'\x00' * 8)
+
+    if checksum:
+        header[0x32:0x34] = struct.pack('<H', -sum(struct.unpack(f'<{header_size // 2}H', header)) & 0xFFFF)
+
+    body = bytes(header)
+
+    if name_guid:
+        body += uuid.UUID(name_guid).bytes_le + struct.pack('<I', 0x14)
+
+    # FFS文件相对固件卷起始8字节对齐
+    for ffs_file in files:
+        body += b'\xFF' * (-len(body) % 8) + ffs_file
+
+    return body + b'\xFF' * (size - len(body))
+
+
+def make_image():
+    driver = make_file(DRIVER_GUID, 0x07, join_sections(make_section(0x10, b'PE32'), make_ui_section('SampleDxe')))
+    peim = make_file(PEIM_GUID, 0x06, make_section(0x01, struct.pack('<IB', 3, 0) + make_section(0x19, b'raw')))
+    deleted = make_file(DELETED_GUID, 0x07, make_ui_section('Gone'), state=STATE_DELETED)
+    pad = make_file(PAD_GUID, 0xF0, b'\xFF' * 0x28)
+
+    volume = make_volume([driver, peim, deleted, pad], name_guid=FV_NAME_GUID)
+
+    return b'\xFF' * 0x100 + volume, driver, peim, deleted, pad
+
+
+def test_volume_header_fields():
+    image, *_ = make_image()
+
+    fv_parse = UefiFvParse(image)
+    volumes = list(fv_parse.volumes())
+
+    assert len(volumes) == 1
+
+    fv_info = volumes[0]
+
+    assert fv_info['offset'] == 0x100
+    assert fv_info['size'] == 0x1000
+    assert fv_info['fs_guid'] == FFS2_GUID
+    assert fv_info['name_guid'] == FV_NAME_GUID
+    assert fv_info['erase_byte'] == 0xFF
+    assert not fv_info['nv_storage']
+
+    # 文件从扩展头部之后开始
+    assert fv_info['files_bgn'] == 0x100 + 0x48 + 0x14
+
+
+def test_files_names_offsets_and_free_space():
+    image, driver, peim, deleted, pad = make_image()
+
+    fv_parse = UefiFvParse(image)
+    fv_info = next(fv_parse.volumes())
+    ffs_files = list(fv_parse.files(fv_info))
+
+    driver_bgn = 0x100 + 0x60
+    peim_bgn = driver_bgn + len(driver) + (-len(driver) % 8)
+    deleted_bgn = peim_bgn + len(peim) + (-len(peim) % 8)
+    pad_bgn = deleted_bgn + len(deleted) + (-len(deleted) % 8)
+    free_bgn = pad_bgn + len(pad) + (-len(pad) % 8)
+
+    # 已删除的文件和填充文件不产出
+    assert [(ffs_file['guid'], ffs_file['offset'], ffs_file['size']) for ffs_file in ffs_files] == [
+        (DRIVER_GUID, driver_bgn, len(driver)),
+        (PEIM_GUID, peim_bgn, len(peim))
+    ]
+
+    driver_info, peim_info = ffs_files
+
+    assert driver_info['type_name'] == 'DRIVER'
+    assert driver_info['header_size'] == 0x18
+    assert driver_info['name'] == 'SampleDxe'
+    assert not driver_info['compressed']
+
+    assert peim_info['type_name'] == 'PEIM'
+    assert peim_info['name'] is None
+    assert peim_info['compressed']
+
+    # 空闲空间为填充文件的数据部分加上最后一个文件之后的空白区
+    assert fv_info['free_space'] == (len(pad) - 0x18) + (0x100 + 0x1000 - free_bgn)
+
+
+def test_sections_are_four_byte_aligned():
+    pe32 = make_section(0x10, b'PE32\x00')
+    ui = make_ui_section('Aligned')
+
+    image = make_volume([make_file(DRIVER_GUID, 0x07, join_sections(pe32, ui))])
+
+    fv_parse = UefiFvParse(image)
+    ffs_file = next(fv_parse.files(next(fv_parse.volumes())))
+    data_bgn = ffs_file['offset'] + ffs_file['header_size']
+
+    sections = list(fv_parse.sections(data_bgn=data_bgn, data_end=ffs_file['offset'] + ffs_file['size']))
+
+    assert [(sec_info['offset'] - data_bgn, sec_info['size'], sec_info['type']) for sec_info in sections] == [
+        (0, len(pe32), 0x10),
+        (12, len(ui), 0x15)
+    ]
+    assert ffs_file['name'] == 'Aligned'
+
+
+def test_section_payload_methods():
+    lzma_guid = uuid.UUID('EE4E5898-3914-4259-9D6E-DC7BD79403CF').bytes_le
+    unknown_guid = uuid.UUID(OTHER_FS_GUID).bytes_le
+
+    compressed = make_section(0x01, struct.pack('<IB', 4, 1) + b'EFI!')
+    guided = make_section(0x02, lzma_guid + struct.pack('<HH', 0x18, 0x1) + b'LZMA')
+    unknown = make_section(0x02, unknown_guid + struct.pack('<HH', 0x18, 0x1) + b'????')
+
+    image = make_volume([make_file(DRIVER_GUID, 0x07, join_sections(compressed, guided, unknown))])
+
+    fv_parse = UefiFvParse(image)
+    ffs_file = next(fv_parse.files(next(fv_parse.volumes())))
+    data_bgn = ffs_file['offset'] + ffs_file['header_size']
+
+    sections = list(fv_parse.sections(data_bgn=data_bgn, data_end=ffs_file['offset'] + ffs_file['size']))
+    guided_bgn = data_bgn + 0x10
+
+    assert fv_parse.section_payload(sections[0]) == ('efi', data_bgn + 9, data_bgn + len(compressed))
+    assert fv_parse.section_payload(sections[1]) == ('lzma', guided_bgn + 0x18, guided_bgn + len(guided))
+    assert fv_parse.section_payload(sections[2]) is None
+
+
+def test_volume_checksum_validation():
+    # 头部校验和错误时，只有已知文件系统GUID的固件卷仍被接受
+    known = make_volume([], checksum=False)
+    unknown = make_volume([], fs_guid=OTHER_FS_GUID, checksum=False)
+    valid = make_volume([], fs_guid=OTHER_FS_GUID)
+
+    fv_parse = UefiFvParse(known + unknown + valid)
+
+    assert [fv_info['offset'] for fv_info in fv_parse.volumes()] == [0, 0x2000]
+
+
+def test_truncated_volume_is_skipped():
+    image = make_volume([], size=0x2000)[:0x1800]
+
+    assert list(UefiFvParse(image).volumes()) == []
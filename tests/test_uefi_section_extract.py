@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+"""FFS封装节解压、嵌套展开、去重与解压结果缓存测试"""
+
+import hashlib
+import lzma
+import os
+import struct
+import uuid
+
+import insyde_bios_core
+from insyde_bios_core import SectionCache, UefiFvParse, UefiSectionExtract
+
+FFS2_GUID = '8C8CE578-8A3D-4F1C-9935-896185C32DD3'
+LZMA_GUID = 'EE4E5898-3914-4259-9D6E-DC7BD79403CF'
+
+DRIVER_GUID = '3C1DE39F-D207-408A-AACC-731CFB7F1DD7'
+UNNAMED_GUID = '9B3ADA4F-AE56-4C24-8DEA-F03B7558AE50'
+
+INNER_PAYLOAD = b'Inner PE32 image' * 16
+
+
+def make_section(sec_type, payload):
+    return (4 + len(payload)).to_bytes(3, 'little') + bytes([sec_type]) + payload
+
+
+def make_lzma_section(payload):
+    return make_section(0x02, uuid.UUID(LZMA_GUID).bytes_le + struct.pack('<HH', 0x18, 0x1) +
+                        lzma.compress(payload, format=lzma.FORMAT_ALONE))
+
+
+def make_file(guid, payload, name=None):
+    if name is not None:
+        payload += b'\x00' * (-len(payload) % 4) + make_section(0x15, (name + '\x00').encode('utf-16-le'))
+
+    return (uuid.UUID(guid).bytes_le + struct.pack('<HBB', 0, 0x07, 0) +
+            (0x18 + len(payload)).to_bytes(3, 'little') + b'\xF8' + payload)
+
+
+def make_volume(files, size=0x2000):
+    header = bytearray(b'\x00' * 16 + uuid.UUID(FFS2_GUID).bytes_le +
+                       struct.pack('<Q4sIHHHBB', size, b'_FVH', 0x4FEFF, 0x48, 0, 0, 0, 2) +
+                       struct.pack('<II', size // 0x1000, 0x1000) + b'\x00' * 8)
+    header[0x32:0x34] = struct.pack('<H', -sum(struct.unpack('<36H', header)) & 0xFFFF)
+
+    body = bytes(header)
+
+    for ffs_file in files:
+        body += b'\xFF' * (-len(body) % 8) + ffs_file
+
+    return body + b'\xFF' * (size - len(body))
+
+
+def nested_section():
+    """外层LZMA节解压后为内层LZMA节，内层解压后为INNER_PAYLOAD"""
+    inner_section = make_lzma_section(INNER_PAYLOAD)
+
+    return make_lzma_section(inner_section), inner_section
+
+
+def count_lzma_calls(monkeypatch):
+    lzma_calls = []
+    lzma_decompress = insyde_bios_core.SECTION_DECOMPRESSORS['lzma']
+
+    def counting_decompress(in_buffer):
+        lzma_calls.append(len(in_buffer))
+        return lzma_decompress(in_buffer)
+
+    monkeypatch.setitem(insyde_bios_core.SECTION_DECOMPRESSORS, 'lzma', counting_decompress)
+
+    return lzma_calls
+
+
+def test_nested_sections_are_expanded(tmp_path):
+    outer_section, inner_section = nested_section()
+    image = make_volume([make_file(DRIVER_GUID, outer_section, name='SampleDxe')])
+
+    section_results = UefiSectionExtract(str(tmp_path)).extract(UefiFvParse(image))
+
+    assert [(result['label'], result['method'], result['depth'], result['out_size'], result['cached'])
+            for result in section_results] == [
+        ('SampleDxe', 'lzma', 0, len(inner_section), False),
+        ('SampleDxe', 'lzma', 1, len(INNER_PAYLOAD), False)
+    ]
+
+    # 外层节位于固件卷头部和FFS文件头部之后，内层节位于解压结果的起始
+    assert section_results[0]['offset'] == 0x48 + 0x18
+    assert section_results[0]['size'] == len(outer_section)
+    assert section_results[1]['offset'] == 0
+
+    assert os.path.basename(section_results[0]['path']) == '000_SampleDxe_lzma.sec'
+    assert os.path.basename(section_results[1]['path']) == '001_SampleDxe_lzma.sec'
+
+    with open(section_results[0]['path'], 'rb') as out_file:
+        assert out_file.read() == inner_section
+
+    with open(section_results[1]['path'], 'rb') as out_file:
+        assert out_file.read() == INNER_PAYLOAD
+
+
+def test_identical_sections_decompressed_once(tmp_path, monkeypatch):
+    lzma_calls = count_lzma_calls(monkeypatch)
+
+    outer_section, _ = nested_section()
+    image = make_volume([make_file(DRIVER_GUID, outer_section, name='SampleDxe'),
+                         make_file(UNNAMED_GUID, outer_section)])
+
+    section_results = UefiSectionExtract(str(tmp_path)).extract(UefiFvParse(image))
+
+    # 每个节都有结果记录，内容相同的节每轮只解压一次
+    assert len(section_results) == 4
+    assert len(lzma_calls) == 2
+
+    # 没有用户界面节的文件以GUID命名
+    assert [result['label'] for result in section_results if result['depth'] == 0] == ['SampleDxe', UNNAMED_GUID]
+
+
+def test_guid_index_names_unnamed_files(tmp_path):
+    class FakeGuidIndex:
+        def name(self, guid, default=None):
+            return {UNNAMED_GUID: 'NamedByIndex'}.get(guid, default)
+
+    image = make_volume([make_file(UNNAMED_GUID, make_lzma_section(INNER_PAYLOAD))])
+
+    section_results = UefiSectionExtract(str(tmp_path), guid_index=FakeGuidIndex()).extract(UefiFvParse(image))
+
+    assert [result['label'] for result in section_results] == ['NamedByIndex']
+
+
+def test_section_cache_hits_skip_decompression(tmp_path, monkeypatch):
+    lzma_calls = count_lzma_calls(monkeypatch)
+
+    outer_section, _ = nested_section()
+    image = make_volume([make_file(DRIVER_GUID, outer_section, name='SampleDxe')])
+
+    section_cache = SectionCache(cache_dir=str(tmp_path / 'cache'))
+
+    first_results = UefiSectionExtract(str(tmp_path / 'first'), section_cache=section_cache).extract(UefiFvParse(image))
+
+    assert len(lzma_calls) == 2
+    assert not any(result['cached'] for result in first_results)
+
+    # 缓存键为含节头部的压缩节内容的SHA-256
+    assert section_cache.lookup(hashlib.sha256(outer_section).hexdigest()) is not None
+
+    second_results = UefiSectionExtract(str(tmp_path / 'second'), section_cache=section_cache).extract(
+        UefiFvParse(image))
+
+    assert len(lzma_calls) == 2
+    assert all(result['cached'] for result in second_results)
+    assert [result['out_size'] for result in second_results] == [result['out_size'] for result in first_results]
+
+
+def test_failed_decompression_has_no_output(tmp_path):
+    corrupt_section = make_section(0x02, uuid.UUID(LZMA_GUID).bytes_le + struct.pack('<HH', 0x18, 0x1) +
+                                   b'\x5D' + b'\x00' * 0x20)
+    image = make_volume([make_file(DRIVER_GUID, corrupt_section, name='Corrupt')])
+
+    section_results = UefiSectionExtract(str(tmp_path)).extract(UefiFvParse(image))
+
+    assert [(result['label'], result['out_size'], result['path']) for result in section_results] == [
+        ('Corrupt', None, None)
+    ]
+    assert not os.path.exists(tmp_path / UefiSectionExtract.OUT_DIR)
+
+
+def test_section_cache_evicts_least_recently_used(tmp_path):
+    section_cache = SectionCache(cache_dir=str(tmp_path), size_limit=0x200)
+
+    for key_index, section_key in enumerate(['aa' * 32, 'bb' * 32, 'cc' * 32]):
+        section_cache.store(section_key, b'\x00' * 0x100)
+
+        # 依次设置较早的修改时间，aa最旧
+        cache_path = section_cache._cache_path(section_key)
+        os.utime(cache_path, (1000 + key_index, 1000 + key_index))
+
+    assert section_cache.lookup('ff' * 32) is None
+
+    # 读取aa后其修改时间更新为当前时间，淘汰时最旧的变为bb
+    assert section_cache.lookup('aa' * 32) == b'\x00' * 0x100
+
+    section_cache.evict()
+
+    assert section_cache.lookup('aa' * 32) is not None
+    assert section_cache.lookup('bb' * 32) is None
+    assert section_cache.lookup('cc' * 32) is not None
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""H2OUVE备份比较测试：变更、新增、删除的设置项与哈希相同变量的整块跳过"""
+
+from insyde_bios_core import UveSettingDiff
+
+SEPARATOR = '-' * 71
+
+
+def make_setting(name, variable, offset, value, options=None):
+    lines = [SEPARATOR, f'Setting     :  "{name}"', f'Variable    :  {variable}',
+             f'Offset      :  0x{offset:08X} / 0x{offset:04X}', 'Size        :  1']
+
+    if options is None:
+        lines.append(f'Value       :  0x{value:X}')
+    else:
+        for option_index, (option_value, option_name) in enumerate(options):
+            marker = '*' if option_value == value else ' '
+            prefix = 'Options     :' if option_index == 0 else '            '
+
+            lines.append(f'{prefix}{marker}  [0x{option_value:02X}]{option_name}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_backup(tmp_path, file_name, settings):
+    backup_path = tmp_path / file_name
+    backup_path.write_text(''.join(settings), encoding='utf-8')
+
+    return str(backup_path)
+
+
+BOOT_OPTIONS = [(0x0, 'UEFI Boot Type'), (0x1, 'Legacy Boot Type')]
+
+SETUP_SETTINGS = [
+    make_setting('Quiet Boot', 'Setup', 0x1, 0x1, [(0x0, 'Disabled'), (0x1, 'Enabled')]),
+    make_setting('Boot Timeout', 'Setup', 0x2, 0x5)
+]
+
+
+def test_changed_added_and_removed(tmp_path):
+    old_path = write_backup(tmp_path, 'old.txt', SETUP_SETTINGS + [
+        make_setting('Boot Type', 'SystemConfig', 0x5, 0x0, BOOT_OPTIONS),
+        make_setting('Fan Speed', 'SystemConfig', 0x20, 0x10),
+        make_setting('Legacy USB', 'SystemConfig', 0x30, 0x1)
+    ])
+    new_path = write_backup(tmp_path, 'new.txt', SETUP_SETTINGS + [
+        make_setting('Boot Type', 'SystemConfig', 0x5, 0x1, BOOT_OPTIONS),
+        make_setting('Fan Speed', 'SystemConfig', 0x20, 0x10),
+        make_setting('TPM State', 'SystemConfig', 0x10, 0x1),
+        make_setting('Turbo Mode', 'CpuSetup', 0x3, 0x0)
+    ])
+
+    setting_diff = UveSettingDiff(old_path, new_path)
+    changes = list(setting_diff.changes())
+
+    # 变量按名称排列，变量内按偏移排列，未变化的设置不报告
+    assert changes == [
+        {'kind': 'added', 'variable': 'CpuSetup', 'offset': 0x3, 'name': 'Turbo Mode',
+         'oldValue': '', 'newValue': '0x0'},
+        {'kind': 'changed', 'variable': 'SystemConfig', 'offset': 0x5, 'name': 'Boot Type',
+         'oldValue': 'UEFI Boot Type (0x0)', 'newValue': 'Legacy Boot Type (0x1)'},
+        {'kind': 'added', 'variable': 'SystemConfig', 'offset': 0x10, 'name': 'TPM State',
+         'oldValue': '', 'newValue': '0x1'},
+        {'kind': 'removed', 'variable': 'SystemConfig', 'offset': 0x30, 'name': 'Legacy USB',
+         'oldValue': '0x1', 'newValue': ''}
+    ]
+
+    # 内容相同的Setup变量整块跳过
+    assert setting_diff.skipped_variables == 1
+
+
+def test_identical_variables_skip_setting_comparison(tmp_path, monkeypatch):
+    old_path = write_backup(tmp_path, 'old.txt', SETUP_SETTINGS)
+    new_path = write_backup(tmp_path, 'new.txt', SETUP_SETTINGS + [
+        make_setting('Fan Speed', 'SystemConfig', 0x20, 0x10)
+    ])
+
+    compared_keys = []
+    setting_order = UveSettingDiff._setting_order
+
+    def counting_setting_order(setting_key):
+        compared_keys.append(setting_key)
+        return setting_order(setting_key)
+
+    monkeypatch.setattr(UveSettingDiff, '_setting_order', staticmethod(counting_setting_order))
+
+    setting_diff = UveSettingDiff(old_path, new_path)
+
+    assert [change['name'] for change in setting_diff.changes()] == ['Fan Speed']
+    assert setting_diff.skipped_variables == 1
+
+    # 只有哈希不同的变量逐项比较
+    assert compared_keys == [(0x20, 'Fan Speed')]
+
+
+def test_same_backup_has_no_changes(tmp_path):
+    backup_path = write_backup(tmp_path, 'backup.txt', SETUP_SETTINGS + [
+        make_setting('Boot Type', 'SystemConfig', 0x5, 0x1, BOOT_OPTIONS)
+    ])
+
+    setting_diff = UveSettingDiff(backup_path, backup_path)
+
+    assert list(setting_diff.changes()) == []
+    assert setting_diff.skipped_variables == 2
+
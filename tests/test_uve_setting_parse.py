@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""H2OUVE -gv备份解析与设置索引测试"""
+
+import os
+
+import insyde_bios_core
+from insyde_bios_core import UveSettingParse, UveSettingStore
+
+BACKUP_TEXT = '''#************************************************************************************
+Insyde H2OUVE (UEFI Variable Editor) Version 200.00.01.00
+#************************************************************************************
+
+-----------------------------------------------------------------------
+Setting     :  "Boot Type"
+Question ID :  0x00000010 / 0x0010
+Variable    :  0x0003 SystemConfig
+Offset      :  0x00000005 / 0x0005
+Size        :  1
+Options     :  [0x00]UEFI Boot Type
+            *  [0x01]Legacy Boot Type
+-----------------------------------------------------------------------
+Setting Name  :  "Fan_Speed%"
+Variable Name :  SystemConfig
+Variable Offset :  0x0020
+Size        :  2
+Current Value :  0x0BB8
+Setting     :  "Quiet Boot"
+Variable    :  Setup
+Offset      :  0x00000001 / 0x0001
+Size        :  1
+Options     :  *  [0x00]Disabled
+               [0x01]Enabled
+'''
+
+
+def write_backup(tmp_path, file_name='backup.txt', text=BACKUP_TEXT):
+    backup_path = tmp_path / file_name
+    backup_path.write_text(text, encoding='utf-8')
+
+    return str(backup_path)
+
+
+def backup_entry(backup_path):
+    backup_stat = os.stat(backup_path)
+
+    return backup_path, os.path.basename(backup_path), backup_stat.st_size, backup_stat.st_mtime
+
+
+def test_parse_setting_fields(tmp_path):
+    settings = list(UveSettingParse(write_backup(tmp_path)))
+
+    assert [(setting.name, setting.variable, setting.offset, setting.size, setting.value, setting.option)
+            for setting in settings] == [
+        ('Boot Type', 'SystemConfig', 0x5, 1, 0x1, 'Legacy Boot Type'),
+        ('Fan_Speed%', 'SystemConfig', 0x20, 2, 0xBB8, None),
+        ('Quiet Boot', 'Setup', 0x1, 1, 0x0, 'Disabled')
+    ]
+
+    assert settings[0].options == [(0x0, 'UEFI Boot Type'), (0x1, 'Legacy Boot Type')]
+    assert settings[2].options == [(0x0, 'Disabled'), (0x1, 'Enabled')]
+    assert settings[0].key() == ('SystemConfig', 0x5, 'Boot Type')
+
+
+def test_parse_skips_blocks_without_setting(tmp_path):
+    backup_path = write_backup(tmp_path, text='-' * 40 + '\nQuestion ID :  0x0010\n' + '-' * 40 + '\n')
+
+    assert list(UveSettingParse(backup_path)) == []
+
+
+def test_store_search(tmp_path):
+    setting_store = UveSettingStore(db_path=str(tmp_path / 'index' / 'settings.sqlite'))
+    setting_store.sync([backup_entry(write_backup(tmp_path))])
+
+    assert setting_store.search(name='boot type') == [{
+        'file': 'backup.txt',
+        'name': 'Boot Type',
+        'variable': 'SystemConfig',
+        'offset': 0x5,
+        'size': 1,
+        'value': '1',
+        'option': 'Legacy Boot Type'
+    }]
+
+    # %和_按字面匹配
+    assert [match['name'] for match in setting_store.search(name='_Speed%')] == ['Fan_Speed%']
+    assert setting_store.search(name='Fan%Speed') == []
+
+    assert [match['name'] for match in setting_store.search(variable='SystemConfig')] == ['Boot Type', 'Fan_Speed%']
+    assert [match['name'] for match in setting_store.search(variable='SystemConfig', offset=0x20)] == ['Fan_Speed%']
+    assert len(setting_store.search()) == 3
+
+
+def test_store_sync_is_incremental(tmp_path, monkeypatch):
+    setting_store = UveSettingStore(db_path=str(tmp_path / 'settings.sqlite'))
+
+    first_path = write_backup(tmp_path, 'first.txt')
+    second_path = write_backup(tmp_path, 'second.txt')
+
+    setting_store.sync([backup_entry(first_path), backup_entry(second_path)])
+
+    parsed_paths = []
+
+    class CountingParse(UveSettingParse):
+        def settings(self):
+            parsed_paths.append(os.path.basename(self.file_path))
+            return super().settings()
+
+    monkeypatch.setattr(insyde_bios_core, 'UveSettingParse', CountingParse)
+
+    # 大小和修改时间未变的备份不重新解析
+    setting_store.sync([backup_entry(first_path), backup_entry(second_path)])
+
+    assert parsed_paths == []
+
+    write_backup(tmp_path, 'second.txt', text=BACKUP_TEXT.replace('Quiet Boot', 'Fast Boot'))
+
+    # 修改的备份重新解析，已删除的备份从索引移除
+    setting_store.sync([backup_entry(second_path)])
+
+    assert parsed_paths == ['second.txt']
+    assert {match['file'] for match in setting_store.search()} == {'second.txt'}
+    assert [match['name'] for match in setting_store.search(variable='Setup')] == ['Fast Boot']
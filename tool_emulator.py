@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+FPTW64 / H2OUVE-W-CONSOLEx64 输出模拟器
+
+在没有Windows和真实硬件的环境中模拟两个外部工具的命令行参数与输出格式（包括FPT用\r刷新的进度行），
+用于在Linux上调试JobRunner的逐行输出、进度解析、取消与超时。
+
+模拟闪存是带Intel闪存描述符的整个SPI闪存：-desc/-bios选择区域，-a/-l按整个闪存的绝对地址寻址（与区域选项无关）。
+
+按程序名（sys.argv[0]的文件名）选择模拟的工具，文件名以FPT或H2OUVE开头时可直接代替真实工具；
+其他文件名时由第一个参数选择。--install生成名为FPTW64.exe和H2OUVE-W-CONSOLEx64.exe的包装脚本
+（Windows上可用PyInstaller按工具名打包本文件，例如pyinstaller -F -n FPTW64 tool_emulator.py）。
+
+用法:
+    python tool_emulator.py --install 目录
+    目录/FPTW64.exe -d out.bin -bios
+    python tool_emulator.py fpt -d out.bin -bios|-desc
+    python tool_emulator.py fpt -d out.bin -a 0x801000 -l 0x1000
+    python tool_emulator.py fpt -f in.bin -bios
+    python tool_emulator.py fpt -f in.bin -a 0x801000 -l 0x1000
+    python tool_emulator.py h2ouve -gv out.txt
+    python tool_emulator.py h2ouve -sv in.txt
+
+环境变量:
+    TOOL_EMULATOR_FLASH   模拟闪存的镜像文件（默认tool_emulator_flash.bin，不存在时按0xFF创建）
+    TOOL_EMULATOR_SIZE    新建模拟闪存的大小（默认16 MB）
+    TOOL_EMULATOR_BIOS    新建模拟闪存中BIOS区域的起始地址（默认闪存大小的一半，区域一直到闪存末尾）
+    TOOL_EMULATOR_DELAY   每个进度步骤的延时秒数（默认0.02）
+    TOOL_EMULATOR_FAIL    非空时以该退出码失败
+"""
+
+import os
+import struct
+import sys
+import time
+
+FLASH_PATH = os.environ.get('TOOL_EMULATOR_FLASH', 'tool_emulator_flash.bin')
+FLASH_SIZE = int(os.environ.get('TOOL_EMULATOR_SIZE', str(16 * 1024 * 1024)), 0)
+BIOS_BASE = int(os.environ.get('TOOL_EMULATOR_BIOS', str(FLASH_SIZE // 2)), 0)
+STEP_DELAY = float(os.environ.get('TOOL_EMULATOR_DELAY', '0.02'))
+FAIL_CODE = os.environ.get('TOOL_EMULATOR_FAIL', '')
+
+PROGRESS_STEPS = 20
+
+# 包装脚本名 -> 模拟的工具
+TOOL_NAMES = {'FPTW64.exe': 'fpt', 'H2OUVE-W-CONSOLEx64.exe': 'h2ouve'}
+
+DESC_SIGNATURE = b'\x5A\xA5\xF0\x0F'
+DESC_SIZE = 0x1000
+DESC_FRBA = 0x40
+
+
+def option_value(args, name, default=None):
+    """获取命令行选项后的值"""
+    if name in args and args.index(name) + 1 < len(args):
+        return args[args.index(name) + 1]
+    return default
+
+
+def make_descriptor():
+    """生成只包含签名、FLMAP0和区域表的闪存描述符：区域0为描述符本身，区域1为BIOS"""
+    descriptor = bytearray(b'\xFF' * DESC_SIZE)
+    descriptor[0x10:0x14] = DESC_SIGNATURE
+    descriptor[0x14:0x18] = struct.pack('<I', (DESC_FRBA >> 4) << 16)
+
+    for region_index, (region_bgn, region_end) in enumerate([(0, DESC_SIZE), (BIOS_BASE, FLASH_SIZE)]):
+        flreg = ((region_end - 1) >> 12) << 16 | (region_bgn >> 12)
+        descriptor[DESC_FRBA + region_index * 4:DESC_FRBA + region_index * 4 + 4] = struct.pack('<I', flreg)
+
+    return descriptor
+
+
+def bios_region(flash):
+    """从描述符区域表读取BIOS区域的(起始地址, 结束地址)，没有描述符时整个闪存视为BIOS区域"""
+    if flash[0x10:0x14] != DESC_SIGNATURE:
+        return 0, len(flash)
+
+    frba = ((struct.unpack_from('<I', flash, 0x14)[0] >> 16) & 0xFF) << 4
+    flreg = struct.unpack_from('<I', flash, frba + 4)[0]
+
+    return (flreg & 0x7FFF) << 12, (((flreg >> 16) & 0x7FFF) + 1) << 12
+
+
+def load_flash():
+    """读取模拟闪存，不存在时创建"""
+    if not os.path.exists(FLASH_PATH):
+        with open(FLASH_PATH, 'wb') as flash_file:
+            flash_file.write(make_descriptor() + b'\xFF' * (FLASH_SIZE - DESC_SIZE))
+
+    with open(FLASH_PATH, 'rb') as flash_file:
+        return bytearray(flash_file.read())
+
+
+def show_progress(action, address, length):
+    """以FPT的格式输出进度，同一行用\r刷新"""
+    total_kb = max(length // 1024, 1)
+
+    for step in range(PROGRESS_STEPS + 1):
+        done_kb = total_kb * step // PROGRESS_STEPS
+        percent = 100 * step // PROGRESS_STEPS
+        sys.stdout.write(f'\r- {action} [0x{address + length:X}] {done_kb}KB of {total_kb}KB - {percent}% percent complete.')
+        sys.stdout.flush()
+        time.sleep(STEP_DELAY)
+
+    sys.stdout.write('\n')
+
+
+def emulate_fpt(args):
+    print('Intel (R) Flash Programming Tool (emulated)')
+    print('Copyright (C) 2005 - 2019, Intel Corporation. All rights reserved.')
+    print()
+
+    flash = load_flash()
+
+    # -a为整个SPI闪存上的绝对地址；未指定时按区域选项确定范围
+    if '-a' in args:
+        region_bgn, region_end = 0, len(flash)
+    elif '-desc' in args:
+        region_bgn, region_end = 0, DESC_SIZE
+    elif '-bios' in args:
+        region_bgn, region_end = bios_region(flash)
+    else:
+        region_bgn, region_end = 0, len(flash)
+
+    address = int(option_value(args, '-a', str(region_bgn)), 0)
+    length = int(option_value(args, '-l', str(region_end - address)), 0)
+
+    if address + length > len(flash):
+        print('Error 26: The address and length is out of range.', file=sys.stderr)
+        return 26
+
+    if '-d' in args:
+        show_progress('Reading Flash', address, length)
+
+        with open(option_value(args, '-d'), 'wb') as out_file:
+            out_file.write(flash[address:address + length])
+
+        print('\nFPT Operation Successful.')
+        return 0
+
+    if '-f' in args:
+        with open(option_value(args, '-f'), 'rb') as in_file:
+            data = in_file.read(length)
+
+        length = len(data)
+
+        show_progress('Erasing Flash Block', address, length)
+        show_progress('Programming Flash', address, length)
+
+        flash[address:address + length] = data
+
+        with open(FLASH_PATH, 'wb') as flash_file:
+            flash_file.write(flash)
+
+        show_progress('Verifying Flash', address, length)
+
+        print('RESULT: The data is identical.')
+        print('\nFPT Operation Successful.')
+        return 0
+
+    print('Error 3: Invalid parameter.', file=sys.stderr)
+    return 3
+
+
+def emulate_h2ouve(args):
+    print('Insyde H2OUVE (UEFI Variable Editor) Version 200.00.01.00 (emulated)')
+    print('Copyright (c) 2012 - 2018, Insyde Software Corp. All Rights Reserved.')
+    print()
+
+    if '-gv' in args:
+        print('Now parsing Variable Information.')
+        time.sleep(STEP_DELAY * PROGRESS_STEPS)
+        print('Complete parsing Variable Information!!!')
+
+        out_path = option_value(args, '-gv')
+        print(f'Saving Variable Information to file: {out_path}')
+
+        with open(out_path, 'w', encoding='utf-8') as out_file:
+            out_file.write('#' + '*' * 84 + '\n')
+            out_file.write('Insyde H2OUVE (UEFI Variable Editor) Version 200.00.01.00\n')
+            out_file.write('#' + '*' * 84 + '\n\n')
+
+            for index, name in enumerate(['Boot Type', 'Quiet Boot', 'Network Stack', 'Intel Virtualization Technology']):
+                out_file.write('-' * 71 + '\n')
+                out_file.write(f'Setting     :  "{name}"\n')
+                out_file.write(f'Question ID :  0x{index + 0x10:08X} / 0x{index + 0x10:04X}\n')
+                out_file.write('Variable    :  0x0001 Setup\n')
+                out_file.write(f'Offset      :  0x{index:08X} / 0x{index:04X}\n')
+                out_file.write('Size        :  1\n')
+                out_file.write('Options     :  [0x00]Disabled\n')
+                out_file.write('            *  [0x01]Enabled\n')
+        return 0
+
+    if '-sv' in args:
+        print('Now updating Variable Information.')
+
+        for step in range(PROGRESS_STEPS + 1):
+            sys.stdout.write(f'\rUpdating variables... {100 * step // PROGRESS_STEPS}%')
+            sys.stdout.flush()
+            time.sleep(STEP_DELAY)
+
+        print('\nComplete updating Variable Information!!!')
+        return 0
+
+    print('Show help message')
+    return 1
+
+
+def install_wrappers(out_dir):
+    """在目录中生成以真实工具命名的包装脚本，返回{工具文件名: 路径}"""
+    os.makedirs(out_dir, exist_ok=True)
+
+    wrapper_paths = {}
+
+    for tool_name in TOOL_NAMES:
+        wrapper_path = os.path.join(out_dir, tool_name)
+
+        with open(wrapper_path, 'w', encoding='utf-8') as wrapper_file:
+            wrapper_file.write(f'#!{sys.executable}\n')
+            wrapper_file.write('import sys\n')
+            wrapper_file.write(f'sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n')
+            wrapper_file.write('import tool_emulator\n')
+            wrapper_file.write('sys.exit(tool_emulator.main())\n')
+
+        os.chmod(wrapper_path, 0o755)
+        wrapper_paths[tool_name] = wrapper_path
+
+    return wrapper_paths
+
+
+def emulated_tool(argv):
+    """按程序名或第一个参数确定模拟的工具，返回(工具, 工具参数)"""
+    # 同时按反斜杠和斜杠分割，Windows路径在其他系统上也能取到文件名
+    prog_name = argv[0].replace('\\', '/').rsplit('/', 1)[-1].lower()
+
+    if prog_name.startswith('fpt'):
+        return 'fpt', argv[1:]
+
+    if prog_name.startswith('h2ouve'):
+        return 'h2ouve', argv[1:]
+
+    if len(argv) > 1 and argv[1] in ('fpt', 'h2ouve'):
+        return argv[1], argv[2:]
+
+    return None, argv[1:]
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--install':
+        for wrapper_path in install_wrappers(sys.argv[2]).values():
+            print(wrapper_path)
+        return 0
+
+    tool, tool_args = emulated_tool(sys.argv)
+
+    if tool is None:
+        print(__doc__)
+        return 1
+
+    if FAIL_CODE:
+        print('Emulated failure.', file=sys.stderr)
+        return int(FAIL_CODE, 0)
+
+    if tool == 'fpt':
+        return emulate_fpt(tool_args)
+
+    return emulate_h2ouve(tool_args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())